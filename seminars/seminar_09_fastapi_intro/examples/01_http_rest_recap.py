@@ -144,7 +144,26 @@ def print_rest_conventions() -> None:
 
 
 class FakeTask:
-    """Модель задачи для демонстрации REST-операций."""
+    """Модель задачи для демонстрации REST-операций.
+
+    to_dict() кэширует словарь до следующего изменения любого поля
+    (update() или прямое присваивание — через __setattr__): GET /tasks
+    не собирает заново словари неизменённых задач. Плата — память:
+    рядом с задачей живёт её словарь, и даже со __slots__ задача с кэшем
+    занимает больше, чем без него (в 06_benchmarks/asgi_crud.py ~411
+    байт против ~259). Компромисс выгоден, когда список читают чаще,
+    чем меняют.
+
+    Кэш — ради бенчмарка 06_benchmarks/asgi_crud.py: to_dict() отдаёт
+    один и тот же словарь всем вызывающим, поэтому он только для чтения
+    (сериализовать в JSON, напечатать). Изменить задачу — update(),
+    а не запись в словарь: иначе правка молча попадёт во все ответы.
+    """
+
+    __slots__ = ("id", "title", "description", "done", "_dict")
+
+    # Поля, которые клиент может изменить через PATCH
+    EDITABLE = ("title", "description", "done")
 
     def __init__(
         self, task_id: int, title: str, description: str = "", done: bool = False
@@ -153,15 +172,34 @@ class FakeTask:
         self.title = title
         self.description = description
         self.done = done
+        self._dict: dict | None = None
+
+    def __setattr__(self, name: str, value: object) -> None:
+        # Любое изменение поля делает закэшированный словарь устаревшим
+        object.__setattr__(self, name, value)
+        if name != "_dict":
+            object.__setattr__(self, "_dict", None)
+
+    def update(self, **fields: object) -> None:
+        """Изменить поля из EDITABLE (остальные игнорируются)."""
+        for key, value in fields.items():
+            if key in self.EDITABLE:
+                setattr(self, key, value)
 
     def to_dict(self) -> dict:
-        """Сериализовать в словарь (как JSON-ответ API)."""
-        return {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "done": self.done,
-        }
+        """Сериализовать в словарь (как JSON-ответ API).
+
+        Возвращается закэшированный словарь, общий для всех вызовов, —
+        только для чтения.
+        """
+        if self._dict is None:
+            self._dict = {
+                "id": self.id,
+                "title": self.title,
+                "description": self.description,
+                "done": self.done,
+            }
+        return self._dict
 
     def __repr__(self) -> str:
         return f"Task(id={self.id}, title={self.title!r}, done={self.done})"
@@ -200,9 +238,7 @@ class FakeTasksAPI:
         if task_id not in self._tasks:
             return 404, {"detail": f"Task {task_id} not found"}
         task = self._tasks[task_id]
-        for key, value in fields.items():
-            if hasattr(task, key):
-                setattr(task, key, value)
+        task.update(**fields)
         return 200, task.to_dict()
 
     # DELETE /tasks/{id}
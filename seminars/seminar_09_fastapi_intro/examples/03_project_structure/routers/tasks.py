@@ -4,11 +4,21 @@
 Роутер (APIRouter) — способ разбить большое приложение на модули.
 Каждый роутер отвечает за свой ресурс (tasks, users, orders и т.д.)
 и подключается к главному приложению в main.py через app.include_router().
+
+Где лежат задачи, роутер не знает: хранилище приходит через
+Depends(get_task_storage) — см. storage.py.
 """
 
-from fastapi import APIRouter, HTTPException
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from ..models import TaskCreate, TaskResponse, TaskUpdate  # type: ignore[import]
+from ..storage import (  # type: ignore[import]
+    StorageFullError,
+    TaskStorage,
+    create_task_storage,
+)
 
 # ============================================================
 # Создание роутера с общим префиксом и тегом
@@ -19,13 +29,21 @@ from ..models import TaskCreate, TaskResponse, TaskUpdate  # type: ignore[import
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 # ============================================================
-# In-memory хранилище (имитация базы данных)
+# Хранилище задач (Dependency Injection)
 # ============================================================
-# В реальном проекте здесь будет SQLAlchemy Session или другая БД.
-# Для учебного примера используем словарь.
+# Реализация — по TASKS_STORAGE: словарь в памяти (по умолчанию),
+# SQLite или shared memory. Эндпоинты получают её через Depends(),
+# а тесты могут подменить через app.dependency_overrides.
+
+task_storage: TaskStorage = create_task_storage()
+
 
-_tasks_db: dict[int, dict] = {}
-_next_id = 1
+def get_task_storage() -> TaskStorage:
+    """Зависимость: хранилище задач приложения."""
+    return task_storage
+
+
+TaskStorageDep = Annotated[TaskStorage, Depends(get_task_storage)]
 
 
 # ============================================================
@@ -34,70 +52,73 @@ _next_id = 1
 
 
 @router.post("/", response_model=TaskResponse, status_code=201)
-def create_task(task: TaskCreate) -> dict:
+def create_task(task: TaskCreate, storage: TaskStorageDep) -> dict:
     """Создать новую задачу.
 
     Принимает title и description, возвращает созданный объект с id.
+    id выдаёт хранилище — без гонки между потоками и воркерами.
     """
-    global _next_id
-    new_task = {
-        "id": _next_id,
-        "title": task.title,
-        "description": task.description,
-        "done": False,
-    }
-    _tasks_db[_next_id] = new_task
-    _next_id += 1
-    return new_task
+    try:
+        return storage.create(task.title, task.description)
+    except StorageFullError as exc:
+        raise HTTPException(status_code=507, detail=str(exc)) from None
 
 
 @router.get("/", response_model=list[TaskResponse])
-def list_tasks(done: bool | None = None) -> list[dict]:
-    """Получить список всех задач.
+def list_tasks(
+    storage: TaskStorageDep,
+    done: bool | None = None,
+    limit: int = Query(default=100, ge=1, le=1000, description="Размер страницы"),
+    offset: int = Query(default=0, ge=0, description="Сколько задач пропустить"),
+) -> list[dict]:
+    """Получить страницу задач (по возрастанию id).
 
     Опциональный query-параметр `done` фильтрует по статусу:
     - `?done=true`  → только выполненные
     - `?done=false` → только активные
     - (без параметра) → все задачи
+
+    Следующая страница: `?offset=<offset + limit>`. Фильтр по `done`
+    берёт срез индекса — не перебирает все задачи.
     """
-    tasks = list(_tasks_db.values())
-    if done is not None:
-        tasks = [t for t in tasks if t["done"] == done]
-    return tasks
+    return storage.list_tasks(done, limit=limit, offset=offset)
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
-def get_task(task_id: int) -> dict:
+def get_task(task_id: int, storage: TaskStorageDep) -> dict:
     """Получить задачу по ID.
 
     Возвращает 404, если задача не найдена.
     """
-    if task_id not in _tasks_db:
+    task = storage.get(task_id)
+    if task is None:
         raise HTTPException(status_code=404, detail=f"Задача {task_id} не найдена")
-    return _tasks_db[task_id]
+    return task
 
 
 @router.patch("/{task_id}", response_model=TaskResponse)
-def update_task(task_id: int, task_update: TaskUpdate) -> dict:
+def update_task(task_id: int, task_update: TaskUpdate, storage: TaskStorageDep) -> dict:
     """Частично обновить задачу.
 
     Обновляет только переданные поля (PATCH, не PUT).
     """
-    if task_id not in _tasks_db:
+    # Обновляем только те поля, которые клиент явно передал;
+    # null не затирает поле (done=None сломал бы индекс хранилища)
+    update_data = task_update.model_dump(exclude_unset=True, exclude_none=True)
+    try:
+        task = storage.update(task_id, update_data)
+    except StorageFullError as exc:
+        raise HTTPException(status_code=507, detail=str(exc)) from None
+    if task is None:
         raise HTTPException(status_code=404, detail=f"Задача {task_id} не найдена")
-    task = _tasks_db[task_id]
-    # Обновляем только те поля, которые клиент явно передал
-    update_data = task_update.model_dump(exclude_unset=True)
-    task.update(update_data)
     return task
 
 
 @router.delete("/{task_id}", status_code=204)
-def delete_task(task_id: int) -> None:
+def delete_task(task_id: int, storage: TaskStorageDep) -> None:
     """Удалить задачу по ID.
 
     Возвращает 204 No Content при успехе, 404 если не найдена.
     """
-    if task_id not in _tasks_db:
+    if not storage.delete(task_id):
         raise HTTPException(status_code=404, detail=f"Задача {task_id} не найдена")
-    del _tasks_db[task_id]
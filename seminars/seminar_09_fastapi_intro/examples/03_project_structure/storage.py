@@ -0,0 +1,448 @@
+"""
+Семинар 9: Структура FastAPI-проекта — хранилища задач.
+
+Роутер не знает, где лежат задачи: он получает хранилище через
+Depends(get_task_storage). Реализацию выбирает переменная окружения
+TASKS_STORAGE:
+
+- memory (по умолчанию) — словарь в памяти процесса
+- sqlite — файл SQLite в режиме WAL (TASKS_SQLITE_PATH): общий для всех
+  воркеров uvicorn и переживает перезапуск
+- shm — именованный сегмент shared memory (TASKS_SHM_NAME): общий для
+  воркеров на одной машине, без файла БД; только Unix
+
+Почему не `global _next_id; _next_id += 1`: sync-эндпоинты FastAPI
+выполняет в пуле потоков, а чтение и запись счётчика — две операции.
+Два потока между ними получат одинаковый id, и одна задача затрёт
+другую. Здесь id выдаётся под блокировкой (или самой базой).
+
+Запуск с SQLite на двух воркерах (из корня репозитория):
+    TASKS_STORAGE=sqlite uvicorn seminars.seminar_09_fastapi_intro.examples.03_project_structure.main:app --workers 2
+"""
+
+import bisect
+import contextlib
+import itertools
+import json
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+from collections.abc import Iterator
+from typing import Any, Protocol
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+# ============================================================
+# Интерфейс хранилища
+# ============================================================
+
+# Поля задачи, которые можно менять через PATCH
+UPDATABLE_FIELDS = ("title", "description", "done")
+
+
+class StorageFullError(Exception):
+    """В хранилище нет места для задачи (shared memory: слоты кончились)."""
+
+
+class TaskStorage(Protocol):
+    """Интерфейс хранилища задач для роутера.
+
+    Задача — словарь {"id", "title", "description", "done"}. Методы
+    возвращают копии: изменение результата не меняет хранилище.
+    list_tasks отдаёт задачи по возрастанию id: offset пропустить,
+    limit вернуть (None — все).
+    """
+
+    def create(self, title: str, description: str) -> dict[str, Any]: ...
+
+    def get(self, task_id: int) -> dict[str, Any] | None: ...
+
+    def list_tasks(
+        self, done: bool | None = None, limit: int | None = None, offset: int = 0
+    ) -> list[dict[str, Any]]: ...
+
+    def update(
+        self, task_id: int, changes: dict[str, Any]
+    ) -> dict[str, Any] | None: ...
+
+    def delete(self, task_id: int) -> bool: ...
+
+
+# ============================================================
+# In-memory
+# ============================================================
+
+
+class InMemoryTaskStorage:
+    """Задачи в словаре — только для одного процесса.
+
+    Все операции — под threading.Lock: пул потоков sync-эндпоинтов
+    не видит задачу наполовину созданной или изменённой.
+
+    Вторичный индекс по done: для каждого статуса — отсортированный
+    список id. ?done=true не перебирает все задачи, а берёт срез списка:
+    O(limit) вместо O(всех задач). Индекс обновляется при create,
+    update (смена done) и delete — O(log n) поиск плюс сдвиг списка.
+    """
+
+    def __init__(self) -> None:
+        self.tasks: dict[int, dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        # done → id задач с этим статусом, по возрастанию
+        self._by_done: dict[bool, list[int]] = {False: [], True: []}
+
+    def create(self, title: str, description: str) -> dict[str, Any]:
+        with self._lock:
+            task_id = next(self._ids)
+            task = {
+                "id": task_id,
+                "title": title,
+                "description": description,
+                "done": False,
+            }
+            self.tasks[task_id] = task
+            # id растут — новая задача всегда в конце списка
+            self._by_done[False].append(task_id)
+            return dict(task)
+
+    def get(self, task_id: int) -> dict[str, Any] | None:
+        with self._lock:
+            task = self.tasks.get(task_id)
+            return dict(task) if task is not None else None
+
+    def list_tasks(
+        self, done: bool | None = None, limit: int | None = None, offset: int = 0
+    ) -> list[dict[str, Any]]:
+        stop = offset + limit if limit is not None else None
+        with self._lock:
+            if done is None:
+                # Словарь хранит задачи в порядке создания (= по id):
+                # пропускаем offset, копируем только страницу
+                page = itertools.islice(self.tasks.values(), offset, stop)
+                return [dict(task) for task in page]
+            return [dict(self.tasks[i]) for i in self._by_done[done][offset:stop]]
+
+    def update(self, task_id: int, changes: dict[str, Any]) -> dict[str, Any] | None:
+        with self._lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return None
+            was_done = task["done"]
+            task.update(_checked(changes))
+            if task["done"] != was_done:
+                _index_remove(self._by_done[was_done], task_id)
+                bisect.insort(self._by_done[task["done"]], task_id)
+            return dict(task)
+
+    def delete(self, task_id: int) -> bool:
+        with self._lock:
+            task = self.tasks.pop(task_id, None)
+            if task is None:
+                return False
+            _index_remove(self._by_done[task["done"]], task_id)
+            return True
+
+
+def _index_remove(ids: list[int], task_id: int) -> None:
+    """Удалить id из отсортированного списка (бинарный поиск)."""
+    position = bisect.bisect_left(ids, task_id)
+    if position < len(ids) and ids[position] == task_id:
+        del ids[position]
+
+
+# ============================================================
+# SQLite (WAL)
+# ============================================================
+
+TASKS_SQLITE_PATH = os.getenv("TASKS_SQLITE_PATH", "tasks.db")
+# Сколько секунд ждать, пока другой воркер держит блокировку записи
+SQLITE_BUSY_TIMEOUT = 5.0
+
+
+class SqliteTaskStorage:
+    """Задачи в файле SQLite — общие для всех воркеров и процессов.
+
+    WAL (write-ahead log): читатели не ждут писателя, писатели
+    выстраиваются в очередь на блокировке файла. id выдаёт
+    INTEGER PRIMARY KEY AUTOINCREMENT — атомарно и без повторов даже
+    после удаления. У каждого потока своё соединение (sqlite3.Connection
+    нельзя делить между потоками). Нужен SQLite >= 3.35 (RETURNING).
+    """
+
+    def __init__(self, path: str = TASKS_SQLITE_PATH) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " title TEXT NOT NULL,"
+            " description TEXT NOT NULL,"
+            " done INTEGER NOT NULL DEFAULT 0)"
+        )
+        # ?done=...: диапазон индекса (done, id) уже в порядке id
+        self._connect().execute(
+            "CREATE INDEX IF NOT EXISTS ix_tasks_done_id ON tasks (done, id)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None — autocommit: каждый запрос — своя транзакция
+            conn = sqlite3.connect(
+                self.path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None
+            )
+            conn.row_factory = _task_row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # В WAL-режиме NORMAL не теряет целостность, но реже делает fsync
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, title: str, description: str) -> dict[str, Any]:
+        return (
+            self._connect()
+            .execute(
+                "INSERT INTO tasks (title, description) VALUES (?, ?) RETURNING *",
+                (title, description),
+            )
+            .fetchone()
+        )
+
+    def get(self, task_id: int) -> dict[str, Any] | None:
+        return (
+            self._connect()
+            .execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
+            .fetchone()
+        )
+
+    def list_tasks(
+        self, done: bool | None = None, limit: int | None = None, offset: int = 0
+    ) -> list[dict[str, Any]]:
+        # LIMIT -1 — без ограничения (OFFSET в SQLite требует LIMIT)
+        page = (-1 if limit is None else limit, offset)
+        if done is None:
+            return (
+                self._connect()
+                .execute("SELECT * FROM tasks ORDER BY id LIMIT ? OFFSET ?", page)
+                .fetchall()
+            )
+        return (
+            self._connect()
+            .execute(
+                "SELECT * FROM tasks WHERE done = ? ORDER BY id LIMIT ? OFFSET ?",
+                (done, *page),
+            )
+            .fetchall()
+        )
+
+    def update(self, task_id: int, changes: dict[str, Any]) -> dict[str, Any] | None:
+        changes = _checked(changes)
+        if not changes:
+            return self.get(task_id)
+        # Имена колонок — только из UPDATABLE_FIELDS (_checked), значения — параметры
+        assignments = ", ".join(f"{field} = ?" for field in changes)
+        return (
+            self._connect()
+            .execute(
+                f"UPDATE tasks SET {assignments} WHERE id = ? RETURNING *",
+                (*changes.values(), task_id),
+            )
+            .fetchone()
+        )
+
+    def delete(self, task_id: int) -> bool:
+        cursor = self._connect().execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        return cursor.rowcount == 1
+
+
+def _task_row(cursor: sqlite3.Cursor, row: tuple) -> dict[str, Any]:
+    """row_factory: строка таблицы tasks → словарь задачи (done — bool)."""
+    task = {
+        column[0]: value for column, value in zip(cursor.description, row, strict=True)
+    }
+    task["done"] = bool(task["done"])
+    return task
+
+
+# ============================================================
+# Shared memory
+# ============================================================
+
+TASKS_SHM_NAME = os.getenv("TASKS_SHM_NAME", "seminar09_tasks")
+TASKS_SHM_CAPACITY = int(os.getenv("TASKS_SHM_CAPACITY", "10000"))
+# Слот задачи: длина JSON (4 байта) + JSON. title до 200 символов,
+# description до 1000 — в UTF-8 это не больше ~5 КиБ
+SHM_SLOT_SIZE = 8192
+_SHM_HEADER = struct.Struct("<Q")  # последний выданный id
+_SHM_LENGTH = struct.Struct("<I")  # длина JSON в слоте; 0 — слот пуст
+
+
+class SharedMemoryTaskStorage:
+    """Задачи в именованном сегменте shared memory — общие для воркеров.
+
+    Сегмент: [последний id][слот 1][слот 2]... Задача с id=N лежит в
+    N-м слоте — поиск по id без индекса. Удалённые id не выдаются
+    повторно, поэтому всего задач за жизнь сегмента — не больше capacity.
+
+    Каждая операция — под двумя блокировками: threading.Lock (потоки
+    своего процесса) и fcntl.flock на файле <tmp>/<name>.lock (другие
+    процессы; flock не различает потоки одного процесса).
+
+    Сегмент живёт до перезагрузки машины или unlink() — его не удаляет
+    выход воркера.
+    """
+
+    def __init__(
+        self, name: str = TASKS_SHM_NAME, capacity: int = TASKS_SHM_CAPACITY
+    ) -> None:
+        if fcntl is None:
+            raise RuntimeError("shared memory task storage requires a Unix system")
+        # multiprocessing импортируется, только если выбрано это хранилище
+        from multiprocessing import resource_tracker, shared_memory
+
+        self.name = name
+        size = _SHM_HEADER.size + capacity * SHM_SLOT_SIZE
+        try:
+            # Новый сегмент заполнен нулями: последний id = 0, слоты пусты
+            self._shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name)
+        # Иначе resource_tracker удалит сегмент при выходе этого процесса,
+        # хотя им пользуются другие воркеры
+        resource_tracker.unregister(self._shm._name, "shared_memory")  # type: ignore[attr-defined]
+        self.capacity = (self._shm.size - _SHM_HEADER.size) // SHM_SLOT_SIZE
+        self._thread_lock = threading.Lock()
+        lock_path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+        self._lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._thread_lock:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _last_id(self) -> int:
+        return _SHM_HEADER.unpack_from(self._shm.buf, 0)[0]
+
+    def _offset(self, task_id: int) -> int:
+        return _SHM_HEADER.size + (task_id - 1) * SHM_SLOT_SIZE
+
+    def _read(self, task_id: int) -> dict[str, Any] | None:
+        if not 1 <= task_id <= min(self._last_id(), self.capacity):
+            return None
+        offset = self._offset(task_id)
+        (length,) = _SHM_LENGTH.unpack_from(self._shm.buf, offset)
+        if length == 0:
+            return None
+        start = offset + _SHM_LENGTH.size
+        return json.loads(bytes(self._shm.buf[start : start + length]))
+
+    def _write(self, task: dict[str, Any]) -> None:
+        data = json.dumps(task, ensure_ascii=False).encode()
+        if len(data) > SHM_SLOT_SIZE - _SHM_LENGTH.size:
+            raise StorageFullError(f"task {task['id']} does not fit into a slot")
+        offset = self._offset(task["id"])
+        start = offset + _SHM_LENGTH.size
+        self._shm.buf[start : start + len(data)] = data
+        _SHM_LENGTH.pack_into(self._shm.buf, offset, len(data))
+
+    def create(self, title: str, description: str) -> dict[str, Any]:
+        with self._locked():
+            task_id = self._last_id() + 1
+            if task_id > self.capacity:
+                raise StorageFullError(f"all {self.capacity} task slots are used")
+            task = {
+                "id": task_id,
+                "title": title,
+                "description": description,
+                "done": False,
+            }
+            self._write(task)
+            _SHM_HEADER.pack_into(self._shm.buf, 0, task_id)
+        return task
+
+    def get(self, task_id: int) -> dict[str, Any] | None:
+        with self._locked():
+            return self._read(task_id)
+
+    def list_tasks(
+        self, done: bool | None = None, limit: int | None = None, offset: int = 0
+    ) -> list[dict[str, Any]]:
+        stop = offset + limit if limit is not None else None
+        with self._locked():
+            # Индекса нет: перебор слотов, но только до конца страницы
+            tasks = (self._read(i) for i in range(1, self._last_id() + 1))
+            matching = (
+                task
+                for task in tasks
+                if task is not None and (done is None or task["done"] == done)
+            )
+            return list(itertools.islice(matching, offset, stop))
+
+    def update(self, task_id: int, changes: dict[str, Any]) -> dict[str, Any] | None:
+        with self._locked():
+            task = self._read(task_id)
+            if task is None:
+                return None
+            task.update(_checked(changes))
+            self._write(task)
+        return task
+
+    def delete(self, task_id: int) -> bool:
+        with self._locked():
+            if self._read(task_id) is None:
+                return False
+            _SHM_LENGTH.pack_into(self._shm.buf, self._offset(task_id), 0)
+        return True
+
+    def close(self) -> None:
+        """Отключиться от сегмента (сегмент остаётся для других процессов)."""
+        self._shm.close()
+        os.close(self._lock_fd)
+
+    def unlink(self) -> None:
+        """Удалить сегмент совсем (все задачи пропадут)."""
+        # unlink() снимает сегмент с учёта resource_tracker — вернём на учёт,
+        # иначе трекер сообщит о снятии незарегистрированного имени
+        from multiprocessing import resource_tracker
+
+        resource_tracker.register(self._shm._name, "shared_memory")  # type: ignore[attr-defined]
+        self._shm.unlink()
+
+
+# ============================================================
+# Выбор хранилища
+# ============================================================
+
+
+def create_task_storage(kind: str | None = None) -> TaskStorage:
+    """Хранилище по имени: memory, sqlite или shm (по умолчанию TASKS_STORAGE).
+
+    Raises:
+        ValueError: неизвестное имя хранилища
+    """
+    kind = kind or os.getenv("TASKS_STORAGE", "memory")
+    if kind == "memory":
+        return InMemoryTaskStorage()
+    if kind == "sqlite":
+        return SqliteTaskStorage()
+    if kind == "shm":
+        return SharedMemoryTaskStorage()
+    raise ValueError(f"unknown task storage: {kind}")
+
+
+def _checked(changes: dict[str, Any]) -> dict[str, Any]:
+    """Только изменяемые поля задачи (id, например, менять нельзя)."""
+    unknown = set(changes) - set(UPDATABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown task fields: {sorted(unknown)}")
+    return changes
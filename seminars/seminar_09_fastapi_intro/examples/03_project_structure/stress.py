@@ -0,0 +1,150 @@
+"""
+Семинар 9: Структура FastAPI-проекта — нагрузочная проверка хранилищ задач.
+
+Параллельные POST /tasks через приложение (httpx.ASGITransport): sync-
+эндпоинт create_task выполняется в пуле потоков, так что запросы
+действительно конкурируют за хранилище. С --processes > 1 несколько
+процессов (как воркеры uvicorn) пишут в одно хранилище — имеет смысл
+для sqlite и shm.
+
+Проверяется:
+- все выданные id различны (нет двух задач с одним id)
+- GET /tasks возвращает ровно столько задач, сколько создано
+- каждая созданная задача читается по своему id с тем же title
+
+Запуск (из корня репозитория):
+    python -m seminars.seminar_09_fastapi_intro.examples.03_project_structure.stress
+    python -m ...stress --storage sqlite --processes 4
+    python -m ...stress --storage shm --processes 4 --tasks 2000
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+_BASE = "seminars.seminar_09_fastapi_intro.examples.03_project_structure"
+_main = importlib.import_module(f"{_BASE}.main")
+_storage = importlib.import_module(f"{_BASE}.storage")
+_tasks = importlib.import_module(f"{_BASE}.routers.tasks")
+
+
+def open_storage(kind: str, location: str) -> object:
+    """Хранилище для процесса: sqlite — файл, shm — имя сегмента."""
+    if kind == "sqlite":
+        return _storage.SqliteTaskStorage(location)
+    if kind == "shm":
+        return _storage.SharedMemoryTaskStorage(location, capacity=100_000)
+    return _storage.InMemoryTaskStorage()
+
+
+async def create_tasks(
+    storage: object, worker: int, count: int, concurrency: int
+) -> dict[int, str]:
+    """count параллельных POST /tasks; возвращает {id: title}."""
+    app = _main.app
+    app.dependency_overrides[_tasks.get_task_storage] = lambda: storage
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://stress"
+    ) as client:
+
+        async def one(index: int) -> tuple[int, str]:
+            title = f"w{worker}-t{index}"
+            async with semaphore:
+                response = await client.post("/tasks/", json={"title": title})
+            assert response.status_code == 201, response.text
+            return response.json()["id"], title
+
+        created = await asyncio.gather(*(one(i) for i in range(count)))
+    app.dependency_overrides.clear()
+    ids = [task_id for task_id, _ in created]
+    assert len(set(ids)) == len(ids), "одинаковые id внутри процесса"
+    return dict(created)
+
+
+def run_worker(
+    kind: str, location: str, worker: int, count: int, concurrency: int
+) -> dict[int, str]:
+    """Точка входа процесса-воркера (ProcessPoolExecutor)."""
+    storage = open_storage(kind, location)
+    return asyncio.run(create_tasks(storage, worker, count, concurrency))
+
+
+def check(storage: object, created: dict[int, str], expected: int) -> None:
+    """Инварианты после нагрузки; AssertionError — хранилище сломано."""
+    assert len(created) == expected, f"уникальных id {len(created)} из {expected}"
+    listed = storage.list_tasks()
+    assert len(listed) == expected, f"GET /tasks: {len(listed)} из {expected}"
+    for task_id, title in created.items():
+        task = storage.get(task_id)
+        assert task is not None and task["title"] == title, f"задача {task_id}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Параллельные POST /tasks")
+    parser.add_argument(
+        "--storage", choices=("memory", "sqlite", "shm"), default="memory"
+    )
+    parser.add_argument("--tasks", type=int, default=2000, help="задач на процесс")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    if args.storage == "memory" and args.processes > 1:
+        parser.error("memory storage is per process: use sqlite or shm")
+
+    workdir = tempfile.mkdtemp(prefix="tasks-stress-")
+    location = (
+        os.path.join(workdir, "tasks.db")
+        if args.storage == "sqlite"
+        else f"tasks_stress_{os.getpid()}"
+    )
+    storage = open_storage(args.storage, location)
+    started = time.perf_counter()
+    try:
+        if args.processes == 1:
+            created = asyncio.run(
+                create_tasks(storage, 0, args.tasks, args.concurrency)
+            )
+        else:
+            with ProcessPoolExecutor(args.processes) as pool:
+                futures = [
+                    pool.submit(
+                        run_worker,
+                        args.storage,
+                        location,
+                        worker,
+                        args.tasks,
+                        args.concurrency,
+                    )
+                    for worker in range(args.processes)
+                ]
+                created = {}
+                for future in futures:
+                    created.update(future.result())
+        elapsed = time.perf_counter() - started
+        check(storage, created, args.tasks * args.processes)
+    except AssertionError as exc:
+        print(f"FAIL {args.storage}: {exc}")
+        sys.exit(1)
+    finally:
+        if args.storage == "shm":
+            storage.close()
+            storage.unlink()
+
+    total = args.tasks * args.processes
+    print(
+        f"OK {args.storage}: {total} задач, {args.processes} процесс(а), "
+        f"{total / elapsed:.0f} созданий/с"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,19 +7,33 @@
 - Метаданные тегов для группировки эндпоинтов
 - Изменение URL документации
 - Отключение документации для production
+- Предвычисленная OpenAPI-схема: JSON-файл в репозитории, ETag и gzip
 
 Запуск (из корня репозитория):
     python seminars/seminar_09_fastapi_intro/examples/04_app_config.py
 
+Пересобрать схему после изменения маршрутов:
+    python seminars/seminar_09_fastapi_intro/examples/04_app_config.py --write-openapi
+
 Или через uvicorn:
     uvicorn seminars.seminar_09_fastapi_intro.examples.04_app_config:app --reload
     → Swagger UI: http://127.0.0.1:8000/docs
     → ReDoc:      http://127.0.0.1:8000/redoc
 """
 
-from fastapi import FastAPI
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from fastapi import FastAPI, Request, Response
 from fastapi.openapi.utils import get_openapi
 
+logger = logging.getLogger(__name__)
+
 # ============================================================
 # 1. Метаданные тегов
 # ============================================================
@@ -128,11 +142,8 @@ def list_tasks(done: bool | None = None) -> list[dict]:
 # Полезно, когда нужно добавить серверы, security-схемы и т.д.
 
 
-def custom_openapi() -> dict:
-    """Кастомная OpenAPI-схема с дополнительными серверами."""
-    if app.openapi_schema:
-        return app.openapi_schema
-
+def build_openapi_schema() -> dict[str, Any]:
+    """Собрать OpenAPI-схему по маршрутам приложения (обход всех моделей)."""
     openapi_schema = get_openapi(
         title=app.title,
         version=app.version,
@@ -146,8 +157,14 @@ def custom_openapi() -> dict:
         {"url": "http://localhost:8000", "description": "Локальный сервер разработки"},
         {"url": "https://api.example.com", "description": "Production-сервер"},
     ]
+    return openapi_schema
 
-    app.openapi_schema = openapi_schema
+
+def custom_openapi() -> dict:
+    """Кастомная OpenAPI-схема с дополнительными серверами."""
+    if app.openapi_schema:
+        return app.openapi_schema
+    app.openapi_schema = build_openapi_schema()
     return app.openapi_schema
 
 
@@ -155,12 +172,149 @@ app.openapi = custom_openapi  # type: ignore[method-assign]
 
 
 # ============================================================
-# 5. Демонстрационный запуск
+# 5. Предвычисленная схема: файл вместо сборки на первом запросе
+# ============================================================
+# FastAPI собирает схему лениво — на первом GET /openapi.json (или /docs)
+# в каждом новом воркере; в большом приложении это сотни миллисекунд.
+# Схема зависит только от кода, поэтому её собирают заранее командой
+# --write-openapi и кладут в репозиторий рядом с кодом (имя файла —
+# с версией API). При старте воркер только читает файл и заранее
+# считает ETag и gzip-версию ответа.
+
+OPENAPI_ARTIFACT = Path(__file__).with_name("openapi") / f"todo-api-{app.version}.json"
+
+
+class OpenAPIArtifact(NamedTuple):
+    """Готовый ответ GET /openapi.json."""
+
+    schema: dict[str, Any]
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    # Другое кодирование — другие байты, значит и другой сильный ETag
+    # (RFC 9110, 8.8.3): иначе кеш отдал бы gzip клиенту без gzip
+    gzip_etag: str
+
+
+def serialize_openapi(schema: dict[str, Any]) -> bytes:
+    """JSON схемы в том виде, в каком он хранится в файле (с отступами — для diff)."""
+    return json.dumps(schema, ensure_ascii=False, indent=2).encode() + b"\n"
+
+
+def load_openapi_artifact(path: Path = OPENAPI_ARTIFACT) -> OpenAPIArtifact:
+    """Прочитать схему из файла; нет файла — собрать (с предупреждением)."""
+    if path.exists():
+        body = path.read_bytes()
+    else:
+        logger.warning("%s not found: building OpenAPI schema at startup", path.name)
+        body = serialize_openapi(build_openapi_schema())
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    return OpenAPIArtifact(
+        schema=json.loads(body),
+        body=body,
+        # mtime=0 — одинаковые байты в каждом воркере
+        gzip_body=gzip.compress(body, mtime=0),
+        etag=f'"{digest}"',
+        gzip_etag=f'"{digest}-gzip"',
+    )
+
+
+openapi_artifact = load_openapi_artifact()
+# Swagger UI и app.openapi() получают готовую схему без сборки
+app.openapi_schema = openapi_artifact.schema
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Совпадает ли ETag с заголовком If-None-Match (RFC 9110, 13.1.2).
+
+    Заголовок — «*» или список через запятую; сравнение слабое:
+    префикс W/ не учитывается.
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Принимает ли клиент gzip по Accept-Encoding (RFC 9110, 12.5.3).
+
+    Заголовок — список кодировок через запятую с весами ";q=";
+    q=0 означает «нельзя». Явная запись gzip важнее «*».
+    """
+    weights: dict[str, float] = {}
+    for item in (accept_encoding or "").split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0  # непонятный вес — не рискуем
+        weights[coding.lower()] = q
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in weights:
+            return weights[coding] > 0
+    return False
+
+
+def openapi_json(request: Request) -> Response:
+    """GET /openapi.json: готовые байты, 304 по ETag, gzip по Accept-Encoding."""
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        body, etag = openapi_artifact.gzip_body, openapi_artifact.gzip_etag
+        encoding = {"Content-Encoding": "gzip"}
+    else:
+        body, etag, encoding = openapi_artifact.body, openapi_artifact.etag, {}
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",  # кешировать можно, но сверяясь по ETag
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        body, media_type="application/json", headers={**headers, **encoding}
+    )
+
+
+# Стандартный маршрут FastAPI сериализует схему на каждый запрос —
+# заменяем его своим
+app.router.routes = [
+    route
+    for route in app.router.routes
+    if getattr(route, "path", None) != app.openapi_url
+]
+app.add_api_route(app.openapi_url, openapi_json, include_in_schema=False)
+
+
+# ============================================================
+# 6. Демонстрационный запуск
 # ============================================================
 
 
 def main() -> None:
-    """Показать конфигурацию приложения без запуска сервера."""
+    """Показать конфигурацию приложения без запуска сервера.
+
+    --write-openapi — пересобрать файл схемы (после изменения маршрутов).
+    """
+    parser = argparse.ArgumentParser(description="Конфигурация FastAPI")
+    parser.add_argument(
+        "--write-openapi",
+        action="store_true",
+        help=f"записать схему в openapi/{OPENAPI_ARTIFACT.name}",
+    )
+    if parser.parse_args().write_openapi:
+        OPENAPI_ARTIFACT.parent.mkdir(exist_ok=True)
+        OPENAPI_ARTIFACT.write_bytes(serialize_openapi(build_openapi_schema()))
+        print(f"Записано: {OPENAPI_ARTIFACT}")
+        return
+
     print("=" * 60)
     print("СЕМИНАР 9: КОНФИГУРАЦИЯ FASTAPI + SWAGGER UI")
     print("=" * 60)
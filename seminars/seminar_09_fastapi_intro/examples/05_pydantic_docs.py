@@ -9,6 +9,7 @@
 - status_code — правильные HTTP-коды для каждой операции
 - summary, description на эндпоинтах — документация в Swagger UI
 - HTTPException с кастомными деталями
+- Строгий разбор тела из сырых байтов: model_validate_json(strict=True)
 
 Запуск (из корня репозитория):
     python seminars/seminar_09_fastapi_intro/examples/05_pydantic_docs.py
@@ -18,10 +19,16 @@
     → Swagger UI: http://127.0.0.1:8000/docs
 """
 
+import bisect
+import itertools
 import json
+import threading
+from collections.abc import Awaitable, Callable
+from typing import Annotated, Any, TypeVar
 
-from fastapi import FastAPI, HTTPException, Query
-from pydantic import BaseModel, Field, field_validator
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError, field_validator
 
 # ============================================================
 # 1. Pydantic-модели: разделение по назначению
@@ -106,7 +113,70 @@ class TaskResponse(BaseModel):
 
 
 # ============================================================
-# 2. Приложение FastAPI
+# 2. Быстрый путь для тела запроса
+# ============================================================
+# Обычный параметр `task: TaskCreate` FastAPI разбирает в два шага:
+# json.loads(body) → промежуточный dict → валидация dict в модель.
+# model_validate_json делает то же за один проход по сырым байтам
+# (парсер JSON внутри pydantic-core, без dict), strict=True отключает
+# приведение типов: "1" не станет 1, а 1 — True.
+
+# Та же зависимость есть в Notes API семинара 10 (02_async_db/body.py):
+# примеры семинаров самодостаточны и запускаются по отдельности.
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def strict_json_body(model: type[ModelT]) -> Callable[[Request], Awaitable[ModelT]]:
+    """Зависимость: тело запроса → model.
+
+    Ошибка валидации — тот же 422, что и у обычного параметра-тела
+    (loc начинается с "body").
+    """
+
+    async def parse(request: Request) -> ModelT:
+        body = await request.body()
+        try:
+            return model.model_validate_json(body, strict=True)
+        except ValidationError as exc:
+            errors = [
+                {**error, "loc": ("body", *error["loc"])}
+                for error in exc.errors(include_url=False)
+            ]
+            raise RequestValidationError(errors, body=body) from exc
+
+    return parse
+
+
+def json_body_schema(model: type[BaseModel]) -> dict[str, Any]:
+    """openapi_extra для маршрута со strict_json_body.
+
+    Тело читается в зависимости, и FastAPI не знает его схему —
+    requestBody описываем сами. Модель должна быть плоской: ссылки
+    "#/$defs/..." вложенных моделей в операции не разрешатся.
+
+    Raises:
+        ValueError: в модели есть вложенные модели или перечисления
+    """
+    schema = model.model_json_schema()
+    if "$defs" in schema:
+        raise ValueError(
+            f"{model.__name__} has nested models ({', '.join(schema['$defs'])}): "
+            "json_body_schema supports flat models only"
+        )
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}},
+        }
+    }
+
+
+StrictTaskCreate = Annotated[TaskCreate, Depends(strict_json_body(TaskCreate))]
+
+
+# ============================================================
+# 3. Приложение FastAPI
 # ============================================================
 
 app = FastAPI(
@@ -119,9 +189,25 @@ app = FastAPI(
 _db: dict[int, dict] = {}
 _next_id = 1
 
+# Вторичный индекс по done: статус → id задач по возрастанию.
+# ?done=true берёт срез списка, а не перебирает весь _db
+_done_index: dict[bool, list[int]] = {False: [], True: []}
+# sync-эндпоинты выполняются в пуле потоков: _db, _next_id и индекс
+# меняются только под блокировкой, иначе два запроса получат один id
+# или сдвинут список индекса друг у друга
+_lock = threading.Lock()
+
+
+def _unindex(task: dict) -> None:
+    """Убрать задачу из индекса по done (бинарный поиск по id)."""
+    ids = _done_index[task["done"]]
+    position = bisect.bisect_left(ids, task["id"])
+    if position < len(ids) and ids[position] == task["id"]:
+        del ids[position]
+
 
 # ============================================================
-# 3. Документированные эндпоинты
+# 4. Документированные эндпоинты
 # ============================================================
 
 
@@ -136,20 +222,24 @@ _next_id = 1
 **Правила:**
 - `title` обязателен и не может быть пустым
 - `done` всегда `false` для новой задачи (клиент не управляет этим полем)
+- типы строгие: `title` и `description` — только строки
 """,
     tags=["tasks"],
+    openapi_extra=json_body_schema(TaskCreate),
 )
-def create_task(task: TaskCreate) -> dict:
+def create_task(task: StrictTaskCreate) -> dict:
     """Создать новую задачу."""
     global _next_id
-    new_task = {
-        "id": _next_id,
-        "title": task.title,
-        "description": task.description,
-        "done": False,
-    }
-    _db[_next_id] = new_task
-    _next_id += 1
+    with _lock:
+        new_task = {
+            "id": _next_id,
+            "title": task.title,
+            "description": task.description,
+            "done": False,
+        }
+        _db[_next_id] = new_task
+        _done_index[False].append(_next_id)  # id растут — всегда в конец
+        _next_id += 1
     return new_task
 
 
@@ -165,17 +255,23 @@ def list_tasks(
     limit: int = Query(
         default=100, ge=1, le=1000, description="Максимальное количество задач"
     ),
+    offset: int = Query(default=0, ge=0, description="Сколько задач пропустить"),
 ) -> list[dict]:
     """Получить все задачи.
 
     - `done=true` → только выполненные
     - `done=false` → только активные
     - `limit` — максимальное количество задач в ответе (1–1000)
+    - `offset` — сколько задач пропустить (следующая страница)
+
+    Копируется только страница: с фильтром — срез индекса по done,
+    без фильтра — задачи _db начиная с offset (словарь хранит их
+    в порядке создания).
     """
-    tasks = list(_db.values())
-    if done is not None:
-        tasks = [t for t in tasks if t["done"] == done]
-    return tasks[:limit]
+    with _lock:
+        if done is not None:
+            return [_db[i] for i in _done_index[done][offset : offset + limit]]
+        return list(itertools.islice(_db.values(), offset, offset + limit))
 
 
 @app.get(
@@ -217,13 +313,18 @@ def update_task(task_id: int, task_update: TaskUpdate) -> dict:
     Передайте только те поля, которые нужно изменить.
     Непереданные поля останутся без изменений.
     """
-    if task_id not in _db:
-        raise HTTPException(status_code=404, detail=f"Задача {task_id} не найдена")
-    task = _db[task_id]
-    # exclude_unset=True → обновляем только явно переданные поля
-    updates = task_update.model_dump(exclude_unset=True)
-    task.update(updates)
-    return task
+    # exclude_unset=True → обновляем только явно переданные поля;
+    # exclude_none=True → null не затирает поле (и не ломает индекс по done)
+    updates = task_update.model_dump(exclude_unset=True, exclude_none=True)
+    with _lock:
+        task = _db.get(task_id)
+        if task is None:
+            raise HTTPException(status_code=404, detail=f"Задача {task_id} не найдена")
+        if "done" in updates and updates["done"] != task["done"]:
+            _unindex(task)
+            bisect.insort(_done_index[updates["done"]], task_id)
+        task.update(updates)
+        return task
 
 
 @app.delete(
@@ -240,13 +341,15 @@ def delete_task(task_id: int) -> None:
 
     Возвращает 204 No Content при успехе (тело ответа отсутствует).
     """
-    if task_id not in _db:
-        raise HTTPException(status_code=404, detail=f"Задача {task_id} не найдена")
-    del _db[task_id]
+    with _lock:
+        task = _db.pop(task_id, None)
+        if task is None:
+            raise HTTPException(status_code=404, detail=f"Задача {task_id} не найдена")
+        _unindex(task)
 
 
 # ============================================================
-# 4. Демонстрация валидации Pydantic без сервера
+# 5. Демонстрация валидации Pydantic без сервера
 # ============================================================
 
 
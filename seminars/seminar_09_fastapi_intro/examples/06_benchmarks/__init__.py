@@ -0,0 +1 @@
+# Бенчмарки примеров семинара 9: python -m seminars.seminar_09_fastapi_intro.examples.06_benchmarks.<имя>
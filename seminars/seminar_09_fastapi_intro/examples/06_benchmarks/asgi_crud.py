@@ -0,0 +1,293 @@
+"""Бенчмарк: один CRUD-сценарий через ASGI — где тратится время запроса.
+
+Сценарий: --tasks POST, --lists GET /tasks, GET/PATCH каждой задачи,
+ещё --lists GET /tasks, DELETE каждой. Все приложения вызываются
+в процессе через httpx.ASGITransport (без сети и uvicorn):
+- fake (plain)  — FakeTasksAPI из 01_http_rest_recap.py со старым FakeTask
+                  (__dict__, новый dict на каждый to_dict) за голым ASGI
+- fake (slots)  — то же с текущим FakeTask (__slots__, кэш to_dict)
+- s09 router    — 03_project_structure: FastAPI + Pydantic, задачи в памяти
+- s12 db        — семинар 12: FastAPI + SQLAlchemy, SQLite во временном файле
+
+fake — нижняя граница: только httpx и json. Разница s09 − fake —
+цена фреймворка (маршрутизация, зависимости, валидация, сериализация),
+s12 − s09 — цена ORM и базы. Отдельно — сценарий прямыми вызовами
+FakeTasksAPI, без ASGI: здесь виден эффект __slots__ и кэша.
+
+Запуск (из корня репозитория):
+    python -m seminars.seminar_09_fastapi_intro.examples.06_benchmarks.asgi_crud
+    python -m ...asgi_crud --tasks 500 --lists 20
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, MutableMapping
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+# Семинар 12 импортирует свой пакет как `app`; база — временный SQLite-файл,
+# DATABASE_URL нужен до импорта app.database
+sys.path.insert(
+    0,
+    str(
+        Path(__file__).resolve().parents[3]
+        / "seminar_12_fastapi_containerization"
+        / "examples"
+    ),
+)
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='asgi-crud-')}/tasks.db"
+)
+
+_recap = importlib.import_module(
+    "seminars.seminar_09_fastapi_intro.examples.01_http_rest_recap"
+)
+_s09 = importlib.import_module(
+    "seminars.seminar_09_fastapi_intro.examples.03_project_structure.main"
+)
+_s12 = importlib.import_module("app.main")
+_s12_db = importlib.import_module("app.database")
+
+Scope = MutableMapping[str, Any]
+ASGIApp = Callable[
+    [Scope, Callable[[], Awaitable[Scope]], Callable[[Scope], Awaitable[None]]],
+    Awaitable[None],
+]
+OPERATIONS = ("POST", "GET list", "GET", "PATCH", "DELETE")
+
+# ============================================================
+# 1. FakeTasksAPI до оптимизации и голый ASGI-адаптер
+# ============================================================
+
+
+class PlainTask:
+    """FakeTask до оптимизации: __dict__ и новый словарь на каждый to_dict()."""
+
+    def __init__(
+        self, task_id: int, title: str, description: str = "", done: bool = False
+    ) -> None:
+        self.id = task_id
+        self.title = title
+        self.description = description
+        self.done = done
+
+    def update(self, **fields: object) -> None:
+        for key, value in fields.items():
+            if key in _recap.FakeTask.EDITABLE:
+                setattr(self, key, value)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "done": self.done,
+        }
+
+
+class PlainTasksAPI(_recap.FakeTasksAPI):
+    """FakeTasksAPI, который хранит PlainTask."""
+
+    def create(self, title: str, description: str = "") -> tuple[int, dict]:
+        task = PlainTask(self._next_id, title, description)
+        self._tasks[self._next_id] = task  # type: ignore[assignment]
+        self._next_id += 1
+        return 201, task.to_dict()
+
+
+def fake_asgi_app(api: Any) -> ASGIApp:
+    """Минимальное ASGI-приложение над FakeTasksAPI: разбор пути и JSON."""
+
+    async def app(
+        scope: Scope,
+        receive: Callable[[], Awaitable[Scope]],
+        send: Callable[[Scope], Awaitable[None]],
+    ) -> None:
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        payload = json.loads(body) if body else {}
+        method, parts = scope["method"], scope["path"].strip("/").split("/")
+        if len(parts) == 1:
+            status, result = (
+                api.create(**payload) if method == "POST" else api.list_all()
+            )
+        elif method == "GET":
+            status, result = api.get(int(parts[1]))
+        elif method == "PATCH":
+            status, result = api.update(int(parts[1]), **payload)
+        else:
+            status, result = api.delete(int(parts[1]))
+        content = b"" if status == 204 else json.dumps(result).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(content)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": content})
+
+    return app
+
+
+# ============================================================
+# 2. Сценарий через ASGI
+# ============================================================
+
+
+async def run_scenario(
+    app: ASGIApp, collection: str, done_field: str, tasks: int, lists: int
+) -> dict[str, float]:
+    """Один проход сценария; возвращает мкс на запрос по операциям."""
+    elapsed: dict[str, float] = defaultdict(float)
+    counts: dict[str, int] = defaultdict(int)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def call(operation: str, method: str, url: str, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            elapsed[operation] += time.perf_counter() - started
+            counts[operation] += 1
+            assert response.status_code < 300, response.text
+            return response
+
+        ids = []
+        for index in range(tasks):
+            body = {"title": f"Задача {index}", "description": "x" * 100}
+            response = await call("POST", "POST", collection, json=body)
+            ids.append(response.json()["id"])
+        for phase in range(2):
+            for _ in range(lists):
+                response = await call(
+                    "GET list", "GET", collection, params={"limit": tasks}
+                )
+                assert len(response.json()) == tasks
+            if phase == 0:
+                for task_id in ids:
+                    await call("GET", "GET", f"/tasks/{task_id}")
+                    await call(
+                        "PATCH", "PATCH", f"/tasks/{task_id}", json={done_field: True}
+                    )
+        for task_id in ids:
+            await call("DELETE", "DELETE", f"/tasks/{task_id}")
+    return {op: elapsed[op] / counts[op] * 1e6 for op in OPERATIONS}
+
+
+def asgi_targets() -> list[tuple[str, Callable[[], ASGIApp], str, str]]:
+    """(имя, фабрика приложения, путь коллекции, поле done в PATCH)."""
+    _s12_db.Base.metadata.create_all(_s12_db.engine)
+    return [
+        ("fake (plain)", lambda: fake_asgi_app(PlainTasksAPI()), "/tasks", "done"),
+        (
+            "fake (slots)",
+            lambda: fake_asgi_app(_recap.FakeTasksAPI()),
+            "/tasks",
+            "done",
+        ),
+        ("s09 router", lambda: _s09.app, "/tasks/", "done"),
+        ("s12 db", lambda: _s12.app, "/tasks", "is_done"),
+    ]
+
+
+async def bench_asgi(tasks: int, lists: int, rounds: int) -> None:
+    """Таблица мкс/запрос: лучший из rounds проходов для каждой операции."""
+    print(f"{'приложение':<14}" + "".join(f"{op:>10}" for op in OPERATIONS))
+    for name, factory, collection, done_field in asgi_targets():
+        best: dict[str, float] = {}
+        for _ in range(rounds):
+            timings = await run_scenario(
+                factory(), collection, done_field, tasks, lists
+            )
+            best = {
+                op: min(best.get(op, timings[op]), timings[op]) for op in OPERATIONS
+            }
+        print(f"{name:<14}" + "".join(f"{best[op]:>10.0f}" for op in OPERATIONS))
+    print("(мкс на запрос)")
+
+
+# ============================================================
+# 3. Тот же сценарий прямыми вызовами FakeTasksAPI
+# ============================================================
+
+
+def direct_scenario(api: Any, tasks: int, lists: int) -> None:
+    """CRUD-сценарий без ASGI: только хранилище и to_dict."""
+    ids = [api.create(f"Задача {i}", "x" * 100)[1]["id"] for i in range(tasks)]
+    for _ in range(lists):
+        api.list_all()
+    for task_id in ids:
+        api.get(task_id)
+        api.update(task_id, done=True)
+    for _ in range(lists):
+        api.list_all()
+    for task_id in ids:
+        api.delete(task_id)
+
+
+def bench_direct(tasks: int, lists: int, rounds: int) -> None:
+    """Время сценария и память на задачу: PlainTask против FakeTask."""
+    print(
+        f"\n{'прямые вызовы':<14} {'сценарий, мс':>13} {'GET list, мкс':>14} {'байт/задача':>12}"
+    )
+    for name, factory in (("plain", PlainTasksAPI), ("slots", _recap.FakeTasksAPI)):
+        scenario = min(
+            _timed(lambda f=factory: direct_scenario(f(), tasks, lists))
+            for _ in range(rounds)
+        )
+        api = factory()
+        for i in range(tasks):
+            api.create(f"Задача {i}", "x" * 100)
+        api.list_all()  # прогрев кэша to_dict
+        listing = min(_timed(api.list_all) for _ in range(rounds * 10))
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        fresh = factory()
+        for i in range(tasks):
+            fresh.create(f"Задача {i}", "")
+        per_task = (tracemalloc.get_traced_memory()[0] - before) / tasks
+        tracemalloc.stop()
+        print(
+            f"{name:<14} {scenario * 1e3:>13.2f} {listing * 1e6:>14.1f} {per_task:>12.0f}"
+        )
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--lists", type=int, default=10, help="GET /tasks на фазу")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    asyncio.run(bench_asgi(args.tasks, args.lists, args.rounds))
+    bench_direct(args.tasks, args.lists, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
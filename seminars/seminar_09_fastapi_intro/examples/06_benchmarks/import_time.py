@@ -0,0 +1,168 @@
+"""Бенчмарк: время импорта приложений FastAPI семинаров 9–12 (холодный старт).
+
+Каждая точка входа импортируется в новом процессе с `python -X importtime`
+(так же стартует воркер uvicorn). Для каждого приложения печатается:
+- импорт — сумма cumulative модулей верхнего уровня из -X importtime,
+  без модулей, которые загружает и пустой интерпретатор (site и т.п.)
+- процесс — время `python -c "import <main>"` минус пустой `python -c pass`
+- модулей — сколько модулей загружено (не шумит, в отличие от времени)
+- пакеты — сумма собственного времени модулей по пакетам верхнего уровня
+- кто тянет — сторонние и стандартные модули, которые импортирует
+  непосредственно код семинара, с полным (cumulative) временем:
+  кандидаты на ленивый импорт
+
+Время — лучший из --repeat запусков: на загруженной машине медиана
+скачет на десятки миллисекунд.
+
+Запуск (из корня репозитория):
+    python -m seminars.seminar_09_fastapi_intro.examples.06_benchmarks.import_time
+    python -m ...import_time --app s11 --top 15
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import NamedTuple
+
+SEMINARS = Path(__file__).resolve().parents[3]
+ROOT = SEMINARS.parent
+
+# имя → (модуль точки входа, каталог запуска)
+ENTRY_POINTS = {
+    "s09": (
+        "seminars.seminar_09_fastapi_intro.examples.03_project_structure.main",
+        ROOT,
+    ),
+    "s10": (
+        "seminars.seminar_10_fastapi_data_handling.examples.02_async_db.main",
+        ROOT,
+    ),
+    "s11": (
+        "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.main",
+        ROOT,
+    ),
+    "s12": ("app.main", SEMINARS / "seminar_12_fastapi_containerization" / "examples"),
+}
+FIRST_PARTY = ("seminars", "app")
+
+
+class ImportRecord(NamedTuple):
+    """Строка вывода -X importtime."""
+
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+    parent: str | None
+
+
+def run_python(code: str, cwd: Path, importtime: bool = False) -> tuple[float, str]:
+    """Выполнить code в новом интерпретаторе; (секунды, stderr)."""
+    flags = ["-X", "importtime"] if importtime else []
+    env = {**os.environ, "PYTHONPATH": str(cwd)}
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - started, result.stderr
+
+
+def parse_importtime(stderr: str) -> list[ImportRecord]:
+    """Разобрать вывод -X importtime; родитель — модуль уровнем выше.
+
+    Модуль печатается после своих зависимостей, поэтому родителя
+    ищем, читая вывод снизу вверх.
+    """
+    lines = [
+        line
+        for line in stderr.splitlines()
+        if line.startswith("import time:") and "|" in line and "[us]" not in line
+    ]
+    records = []
+    stack: list[str] = []
+    for line in reversed(lines):
+        self_us, cumulative_us, raw_name = line[len("import time:") :].split("|")
+        name = raw_name.rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        del stack[depth:]
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        records.append(
+            ImportRecord(name, depth, int(self_us), int(cumulative_us), parent)
+        )
+    return records
+
+
+def is_first_party(name: str) -> bool:
+    return name.split(".")[0] in FIRST_PARTY
+
+
+def report(label: str, repeat: int, top: int) -> None:
+    """Холодный старт и главные источники времени импорта для приложения."""
+    module, cwd = ENTRY_POINTS[label]
+    # __import__, а не importlib.import_module: -X importtime учитывает
+    # только импорт через C-реализацию (оператор import и __import__)
+    code = f"__import__({module!r})"
+    startup = {r.name for r in parse_importtime(run_python("pass", cwd, True)[1])}
+    baseline = min(run_python("pass", cwd)[0] for _ in range(repeat))
+    process = min(run_python(code, cwd)[0] for _ in range(repeat)) - baseline
+    imports = []
+    for _ in range(repeat):
+        records = [
+            r
+            for r in parse_importtime(run_python(code, cwd, importtime=True)[1])
+            if r.name not in startup
+        ]
+        imports.append(sum(r.cumulative_us for r in records if r.depth == 0))
+
+    by_package: Counter[str] = Counter()
+    for record in records:
+        by_package[record.name.split(".")[0]] += record.self_us
+    pulled = sorted(
+        (
+            r
+            for r in records
+            if r.parent and is_first_party(r.parent) and not is_first_party(r.name)
+        ),
+        key=lambda r: r.cumulative_us,
+        reverse=True,
+    )
+
+    print(f"== {label}: {module}")
+    print(
+        f"импорт: {min(imports) / 1e3:.0f} мс, процесс: {process * 1e3:.0f} мс "
+        f"(лучший из {repeat}), модулей: {len(records)}"
+    )
+    print(f"  {'пакет':<28} {'self, мс':>9}")
+    for package, self_us in by_package.most_common(top):
+        print(f"  {package:<28} {self_us / 1e3:>9.1f}")
+    print(f"  {'кто тянет':<28} {'cumul., мс':>10}  импортирует")
+    for record in pulled[:top]:
+        parent = record.parent.rsplit(".", 1)[-1] if record.parent else ""
+        print(f"  {record.name:<28} {record.cumulative_us / 1e3:>10.1f}  {parent}")
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", choices=sorted(ENTRY_POINTS), action="append")
+    parser.add_argument("--repeat", type=int, default=5, help="запусков на замер")
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    for label in args.app or ENTRY_POINTS:
+        report(label, args.repeat, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Бенчмарк: валидация и сериализация Pydantic-схем семинаров 9–12.
+
+Для каждой схемы (BaseModel / SQLModel без table=True) строится тело
+запроса со строками длины --sizes (в пределах min_length/max_length поля)
+и замеряется, мкс на вызов:
+- loads+dict   — json.loads(raw) → model_validate(dict): так тело разбирает FastAPI
+- json         — model_validate_json(raw): один проход по байтам
+- json strict  — model_validate_json(raw, strict=True): strict_json_body
+- dumps(dump)  — json.dumps(model_dump(mode="json"))
+- dump_json    — model_dump_json()
+
+Затем POST /tasks (TaskCreate из 05_pydantic_docs.py) через
+httpx.ASGITransport: обычный параметр-тело против strict_json_body.
+
+Запуск (из корня репозитория):
+    python -m seminars.seminar_09_fastapi_intro.examples.06_benchmarks.pydantic_models
+    python -m ...pydantic_models --sizes 16,4096 --number 2000
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import sys
+import time
+import timeit
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from types import UnionType
+from typing import Any, Union, get_args, get_origin
+
+import httpx
+from annotated_types import MaxLen, MinLen
+from fastapi import FastAPI
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+
+# Семинар 12 импортирует свой пакет как `app` (запуск из его examples/)
+sys.path.insert(
+    0,
+    str(
+        Path(__file__).resolve().parents[3]
+        / "seminar_12_fastapi_containerization"
+        / "examples"
+    ),
+)
+
+SCHEMA_MODULES = {
+    "s09": "seminars.seminar_09_fastapi_intro.examples.05_pydantic_docs",
+    "s09.structure": "seminars.seminar_09_fastapi_intro.examples.03_project_structure.models",
+    "s10": "seminars.seminar_10_fastapi_data_handling.examples.02_async_db.models",
+    "s11": "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.models",
+    "s12": "app.main",
+}
+
+_docs = importlib.import_module(SCHEMA_MODULES["s09"])
+
+
+def collect_schemas() -> list[tuple[str, type[BaseModel]]]:
+    """Схемы, объявленные в модулях SCHEMA_MODULES (без таблиц SQLModel)."""
+    schemas = []
+    for label, path in SCHEMA_MODULES.items():
+        module = importlib.import_module(path)
+        for obj in vars(module).values():
+            if (
+                isinstance(obj, type)
+                and issubclass(obj, BaseModel)
+                and obj.__module__ == module.__name__
+                and not obj.model_config.get("table")
+            ):
+                schemas.append((f"{label}.{obj.__name__}", obj))
+    return schemas
+
+
+def sample_value(field: FieldInfo, size: int) -> Any:
+    """Значение поля для тела запроса; строки — длины size в рамках ограничений."""
+    annotation = field.annotation
+    if get_origin(annotation) in (Union, UnionType):
+        annotation = next(a for a in get_args(annotation) if a is not type(None))
+    if annotation is str:
+        low = max(
+            (m.min_length for m in field.metadata if isinstance(m, MinLen)), default=0
+        )
+        high = min(
+            (m.max_length for m in field.metadata if isinstance(m, MaxLen)),
+            default=size,
+        )
+        return "x" * max(low, min(size, high))
+    if annotation is bool:
+        return True
+    if annotation is int:
+        return 1
+    if annotation is datetime:
+        return datetime(2026, 1, 1, tzinfo=timezone.utc).isoformat()
+    raise TypeError(f"нет образца для {annotation!r}")
+
+
+def sample_payload(model: type[BaseModel], size: int) -> dict[str, Any]:
+    """Тело запроса со всеми полями схемы."""
+    return {
+        name: sample_value(field, size) for name, field in model.model_fields.items()
+    }
+
+
+def per_call_us(fn: Callable[[], object], number: int) -> float:
+    """Среднее время одного вызова, мкс (лучший из трёх повторов)."""
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+
+def bench_schemas(sizes: list[int], number: int) -> None:
+    """Таблица validate/serialize для каждой схемы и размера строк."""
+    header = (
+        f"{'схема':<30} {'байт':>6} {'loads+dict':>11} {'json':>8} "
+        f"{'strict':>8} {'выигрыш':>8} {'dumps(dump)':>12} {'dump_json':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, model in collect_schemas():
+        seen: set[bytes] = set()
+        for size in sizes:
+            raw = json.dumps(sample_payload(model, size)).encode()
+            if raw in seen:  # поля упёрлись в max_length — тот же payload
+                continue
+            seen.add(raw)
+            instance = model.model_validate_json(raw, strict=True)
+            loads = per_call_us(
+                lambda m=model, r=raw: m.model_validate(json.loads(r)), number
+            )
+            lax = per_call_us(lambda m=model, r=raw: m.model_validate_json(r), number)
+            strict = per_call_us(
+                lambda m=model, r=raw: m.model_validate_json(r, strict=True), number
+            )
+            dumps = per_call_us(
+                lambda i=instance: json.dumps(i.model_dump(mode="json")), number
+            )
+            dump_json = per_call_us(instance.model_dump_json, number)
+            print(
+                f"{name:<30} {len(raw):>6} {loads:>11.2f} {lax:>8.2f} "
+                f"{strict:>8.2f} {loads / strict:>7.2f}x {dumps:>12.2f} {dump_json:>10.2f}"
+            )
+
+
+def build_app(strict: bool) -> FastAPI:
+    """POST /tasks с телом TaskCreate: параметр-тело или strict_json_body."""
+    app = FastAPI()
+    if strict:
+
+        @app.post("/tasks", openapi_extra=_docs.json_body_schema(_docs.TaskCreate))
+        async def create_strict(task: _docs.StrictTaskCreate) -> dict[str, int]:
+            return {"title": len(task.title)}
+
+    else:
+
+        @app.post("/tasks")
+        async def create_body(task: _docs.TaskCreate) -> dict[str, int]:
+            return {"title": len(task.title)}
+
+    return app
+
+
+async def requests_per_second(app: FastAPI, raw: bytes, requests: int) -> float:
+    """requests последовательных POST /tasks с телом raw."""
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Content-Type": "application/json"}
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = await client.post("/tasks", content=raw, headers=headers)
+            assert response.status_code == 200, response.text
+        return requests / (time.perf_counter() - started)
+
+
+async def bench_requests(sizes: list[int], requests: int) -> None:
+    """POST /tasks через ASGITransport: запросов/с для обоих вариантов.
+
+    Варианты чередуются три раунда, берётся лучший результат каждого.
+    """
+    apps = (build_app(strict=False), build_app(strict=True))
+    print(f"\n{'POST /tasks, байт':<18} {'параметр':>10} {'strict':>10} {'выигрыш':>8}")
+    payloads = dict.fromkeys(
+        json.dumps(sample_payload(_docs.TaskCreate, size)).encode() for size in sizes
+    )
+    for raw in payloads:
+        rates = [0.0, 0.0]
+        for _ in range(3):
+            for index, app in enumerate(apps):
+                rate = await requests_per_second(app, raw, requests)
+                rates[index] = max(rates[index], rate)
+        print(
+            f"{len(raw):<18} {rates[0]:>10.0f} {rates[1]:>10.0f} "
+            f"{rates[1] / rates[0]:>7.2f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="16,1024,65536", help="длины строк")
+    parser.add_argument("--number", type=int, default=2_000, help="вызовов на замер")
+    parser.add_argument("--requests", type=int, default=1_000)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    bench_schemas(sizes, args.number)
+    asyncio.run(bench_requests(sizes, args.requests))
+
+
+if __name__ == "__main__":
+    main()
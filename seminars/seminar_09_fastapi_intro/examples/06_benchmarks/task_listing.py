@@ -0,0 +1,93 @@
+"""Бенчмарк: GET /tasks?done=... — перебор всех задач vs индекс по done.
+
+На --tasks задачах (по умолчанию 1 000 000, выполнена каждая --done-every)
+сравниваются два способа получить страницу:
+- перебор — как было: list(_tasks_db.values()), фильтр, затем срез
+- индекс  — InMemoryTaskStorage.list_tasks: срез списка id по статусу
+
+Запросы: первая и глубокая страница с фильтром и без, плюс стоимость
+обновления индекса при смене done (PATCH).
+
+Запуск (из корня репозитория):
+    python -m seminars.seminar_09_fastapi_intro.examples.06_benchmarks.task_listing
+    python -m ...task_listing --tasks 100000
+"""
+
+import argparse
+import importlib
+import time
+import timeit
+from typing import Any
+
+_storage = importlib.import_module(
+    "seminars.seminar_09_fastapi_intro.examples.03_project_structure.storage"
+)
+
+PAGE = 100
+
+
+def full_scan(
+    tasks: dict[int, dict[str, Any]], done: bool | None, limit: int, offset: int
+) -> list[dict[str, Any]]:
+    """Прежняя реализация list_tasks: копия всех задач, фильтр, срез."""
+    result = list(tasks.values())
+    if done is not None:
+        result = [t for t in result if t["done"] == done]
+    return result[offset : offset + limit]
+
+
+def per_call_ms(fn: Any, number: int) -> float:
+    """Среднее время одного вызова, мс."""
+    return timeit.timeit(fn, number=number) / number * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--done-every", type=int, default=10)
+    parser.add_argument("--number", type=int, default=5, help="вызовов на замер")
+    args = parser.parse_args()
+
+    storage = _storage.InMemoryTaskStorage()
+    started = time.perf_counter()
+    for i in range(args.tasks):
+        storage.create(f"task {i}", "")
+    for task_id in range(1, args.tasks + 1, args.done_every):
+        storage.update(task_id, {"done": True})
+    print(f"{args.tasks} задач созданы за {time.perf_counter() - started:.1f} с\n")
+
+    done_total = len(range(1, args.tasks + 1, args.done_every))
+    queries = [
+        ("done=true, стр. 1", True, 0),
+        ("done=true, последняя", True, max(done_total - PAGE, 0)),
+        ("done=false, стр. 1", False, 0),
+        ("без фильтра, стр. 1", None, 0),
+        ("без фильтра, середина", None, args.tasks // 2),
+    ]
+    print(f"{'запрос':<24} {'перебор, мс':>12} {'индекс, мс':>11} {'ускорение':>10}")
+    for name, done, offset in queries:
+        expected = full_scan(storage.tasks, done, PAGE, offset)
+        assert storage.list_tasks(done, PAGE, offset) == expected
+        scan = per_call_ms(
+            lambda d=done, o=offset: full_scan(storage.tasks, d, PAGE, o),
+            args.number,
+        )
+        index = per_call_ms(
+            lambda d=done, o=offset: storage.list_tasks(d, PAGE, o), args.number
+        )
+        print(f"{name:<24} {scan:>12.2f} {index:>11.3f} {scan / index:>9.0f}x")
+
+    # Цена индекса: смена done переносит id между списками
+    middle = args.tasks // 2
+    toggle = per_call_ms(
+        lambda: (
+            storage.update(middle, {"done": True}),
+            storage.update(middle, {"done": False}),
+        ),
+        1000,
+    )
+    print(f"\nPATCH done (с обновлением индекса): {toggle / 2 * 1000:.1f} мкс")
+
+
+if __name__ == "__main__":
+    main()
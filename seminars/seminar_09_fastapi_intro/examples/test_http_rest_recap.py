@@ -0,0 +1,28 @@
+"""
+Тесты FakeTask из 01_http_rest_recap.py: кэш to_dict().
+"""
+
+import importlib
+
+_recap = importlib.import_module(
+    "seminars.seminar_09_fastapi_intro.examples.01_http_rest_recap"
+)
+
+
+def test_to_dict_cached_until_change() -> None:
+    """Без изменений — тот же словарь; update() пересобирает его."""
+    task = _recap.FakeTask(1, "Купить продукты")
+    cached = task.to_dict()
+    assert task.to_dict() is cached
+
+    task.update(title="Купить хлеб")
+    assert task.to_dict() is not cached
+    assert task.to_dict()["title"] == "Купить хлеб"
+
+
+def test_direct_assignment_invalidates_cache() -> None:
+    """Присваивание поля мимо update() тоже сбрасывает кэш."""
+    task = _recap.FakeTask(1, "Купить продукты")
+    task.to_dict()
+    task.done = True
+    assert task.to_dict()["done"] is True
@@ -0,0 +1,100 @@
+"""
+Тесты предвычисленной OpenAPI-схемы из 04_app_config.py.
+
+Файл openapi/todo-api-<версия>.json собирается командой
+    python seminars/seminar_09_fastapi_intro/examples/04_app_config.py --write-openapi
+Если маршруты или модели изменились, а файл — нет, test_artifact_matches_routes
+падает: сервер отдавал бы устаревшую схему.
+"""
+
+import gzip
+import importlib
+
+from fastapi.testclient import TestClient
+
+_config = importlib.import_module(
+    "seminars.seminar_09_fastapi_intro.examples.04_app_config"
+)
+
+
+def test_artifact_matches_routes() -> None:
+    """Файл схемы совпадает со схемой, собранной по текущим маршрутам."""
+    assert _config.OPENAPI_ARTIFACT.exists(), (
+        "запустите 04_app_config.py --write-openapi"
+    )
+    built = _config.build_openapi_schema()
+    stored = _config.load_openapi_artifact().schema
+    assert stored == built, "схема устарела: запустите 04_app_config.py --write-openapi"
+
+
+def test_etag_revalidation() -> None:
+    """Повторный запрос с If-None-Match получает 304 без тела."""
+    client = TestClient(_config.app)
+    response = client.get("/openapi.json")
+    assert response.status_code == 200
+    assert response.json()["info"]["version"] == _config.app.version
+
+    cached = client.get(
+        "/openapi.json", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_gzip_body_precomputed() -> None:
+    """С Accept-Encoding: gzip отдаётся заранее сжатое тело."""
+    client = TestClient(_config.app)
+    response = client.get(
+        "/openapi.json", headers={"Accept-Encoding": "gzip"}, follow_redirects=False
+    )
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert _config.openapi_artifact.body == gzip.decompress(
+        _config.openapi_artifact.gzip_body
+    )
+    assert response.json() == _config.openapi_artifact.schema
+
+
+def test_gzip_variant_has_own_etag() -> None:
+    """gzip и несжатое тело — разные представления с разными ETag."""
+    client = TestClient(_config.app)
+    plain = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["ETag"] == _config.openapi_artifact.etag
+    assert gzipped.headers["ETag"] == _config.openapi_artifact.gzip_etag
+    assert plain.headers["ETag"] != gzipped.headers["ETag"]
+
+    # q=0 — явный отказ от gzip, даже при «*»
+    for refused in ("gzip;q=0", "br, gzip; q=0.0", "*, gzip;q=0"):
+        response = client.get("/openapi.json", headers={"Accept-Encoding": refused})
+        assert "Content-Encoding" not in response.headers, refused
+        assert response.headers["ETag"] == _config.openapi_artifact.etag
+    assert _config.accepts_gzip("deflate, gzip;q=0.5")
+    assert _config.accepts_gzip("*")
+    assert not _config.accepts_gzip("identity")
+    assert not _config.accepts_gzip(None)
+
+    # ETag несжатого тела не подтверждает кешированную gzip-версию
+    stale = client.get(
+        "/openapi.json",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["ETag"]},
+    )
+    assert stale.status_code == 200
+
+
+def test_if_none_match_parsing() -> None:
+    """Список ETag, слабые валидаторы W/ и «*»."""
+    etag = _config.openapi_artifact.etag
+    assert _config.etag_matches(f'"other", {etag}', etag)
+    assert _config.etag_matches(f"W/{etag}", etag)
+    assert _config.etag_matches("*", etag)
+    assert not _config.etag_matches('"other"', etag)
+    assert not _config.etag_matches(None, etag)
+
+    client = TestClient(_config.app)
+    cached = client.get(
+        "/openapi.json",
+        headers={"Accept-Encoding": "identity", "If-None-Match": f'"x", W/{etag}'},
+    )
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
@@ -0,0 +1,62 @@
+"""
+Тесты приложения из 05_pydantic_docs.py: индекс по done и его блокировка.
+"""
+
+import importlib
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+_docs = importlib.import_module(
+    "seminars.seminar_09_fastapi_intro.examples.05_pydantic_docs"
+)
+
+TASKS = 200
+
+
+@pytest.fixture
+def client() -> Iterator[TestClient]:
+    """Клиент с пустым хранилищем задач."""
+    _docs._db.clear()
+    _docs._done_index[False].clear()
+    _docs._done_index[True].clear()
+    _docs._next_id = 1
+    with TestClient(_docs.app) as client:
+        yield client
+    _docs._db.clear()
+
+
+def test_done_index_consistent_under_concurrency(client: TestClient) -> None:
+    """Параллельные create/PATCH done/DELETE не портят индекс."""
+    with ThreadPoolExecutor(16) as pool:
+        ids = list(
+            pool.map(
+                lambda i: client.post("/tasks", json={"title": f"t{i}"}).json()["id"],
+                range(TASKS),
+            )
+        )
+        assert len(set(ids)) == TASKS
+
+        list(
+            pool.map(
+                lambda i: client.patch(f"/tasks/{i}", json={"done": i % 2 == 0}),
+                ids,
+            )
+        )
+        list(pool.map(lambda i: client.delete(f"/tasks/{i}"), ids[::3]))
+
+    for done in (False, True):
+        assert _docs._done_index[done] == sorted(
+            task_id for task_id, task in _docs._db.items() if task["done"] is done
+        )
+    listed = client.get("/tasks", params={"done": True, "limit": 1000}).json()
+    assert all(task["done"] for task in listed)
+
+
+def test_unindex_missing_id_keeps_neighbours(client: TestClient) -> None:
+    """Удаление отсутствующего id не задевает соседний id в индексе."""
+    _docs._done_index[False].extend([1, 3])
+    _docs._unindex({"id": 2, "done": False})
+    assert _docs._done_index[False] == [1, 3]
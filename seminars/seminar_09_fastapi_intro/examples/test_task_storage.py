@@ -0,0 +1,44 @@
+"""
+Тесты хранилищ задач из 03_project_structure под параллельной нагрузкой.
+
+Те же сценарий и инварианты, что у stress.py, но в масштабе pytest:
+параллельные POST /tasks через sync-эндпоинт (пул потоков) должны
+получить различные id, и каждая задача читается по своему id.
+"""
+
+import asyncio
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+_stress = importlib.import_module(
+    "seminars.seminar_09_fastapi_intro.examples.03_project_structure.stress"
+)
+
+TASKS = 300
+CONCURRENCY = 32
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_concurrent_creates_get_unique_ids(kind: str, tmp_path: Path) -> None:
+    """Параллельные POST /tasks в одном процессе — без повторных id."""
+    storage = _stress.open_storage(kind, str(tmp_path / "tasks.db"))
+    created = asyncio.run(_stress.create_tasks(storage, 0, TASKS, CONCURRENCY))
+    _stress.check(storage, created, TASKS)
+
+
+def test_sqlite_shared_between_processes(tmp_path: Path) -> None:
+    """Два процесса (как воркеры uvicorn) пишут в один файл SQLite."""
+    location = str(tmp_path / "tasks.db")
+    storage = _stress.open_storage("sqlite", location)
+    with ProcessPoolExecutor(2) as pool:
+        futures = [
+            pool.submit(_stress.run_worker, "sqlite", location, worker, TASKS, 16)
+            for worker in range(2)
+        ]
+        created: dict[int, str] = {}
+        for future in futures:
+            created.update(future.result())
+    _stress.check(storage, created, 2 * TASKS)
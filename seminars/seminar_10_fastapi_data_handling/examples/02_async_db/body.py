@@ -0,0 +1,72 @@
+"""
+Семинар 10, Блок 3: Строгий разбор тела запроса из сырых байтов.
+
+Содержит:
+- strict_json_body — зависимость: тело → модель через
+  model_validate_json(strict=True)
+- json_body_schema — openapi_extra с requestBody для Swagger UI
+
+Копия — в 05_pydantic_docs.py семинара 9; обе проверяет TestStrictBody
+в 05_testing/test_notes_api.py.
+
+Обычный параметр `note_in: NoteCreate` FastAPI разбирает в два шага:
+json.loads(body) → промежуточный dict → валидация dict в модель.
+model_validate_json проходит по байтам один раз (парсер JSON внутри
+pydantic-core), strict=True отключает приведение типов. Замер:
+seminars/seminar_09_fastapi_intro/examples/06_benchmarks/pydantic_models.py
+"""
+
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def strict_json_body(model: type[ModelT]) -> Callable[[Request], Awaitable[ModelT]]:
+    """Зависимость: тело запроса → model.
+
+    Ошибка валидации — тот же 422, что и у обычного параметра-тела
+    (loc начинается с "body").
+    """
+
+    async def parse(request: Request) -> ModelT:
+        body = await request.body()
+        try:
+            return model.model_validate_json(body, strict=True)
+        except ValidationError as exc:
+            errors = [
+                {**error, "loc": ("body", *error["loc"])}
+                for error in exc.errors(include_url=False)
+            ]
+            raise RequestValidationError(errors, body=body) from exc
+
+    return parse
+
+
+def json_body_schema(model: type[BaseModel]) -> dict[str, Any]:
+    """openapi_extra для маршрута со strict_json_body.
+
+    Тело читается в зависимости, и FastAPI не знает его схему —
+    requestBody описываем сами. Схема встраивается в операцию, поэтому
+    модель должна быть плоской: ссылки "#/$defs/..." вложенных моделей
+    считались бы от корня документа OpenAPI, где $defs нет.
+
+    Raises:
+        ValueError: в модели есть вложенные модели или перечисления
+    """
+    schema = model.model_json_schema()
+    if "$defs" in schema:
+        raise ValueError(
+            f"{model.__name__} has nested models ({', '.join(schema['$defs'])}): "
+            "json_body_schema supports flat models only"
+        )
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}},
+        }
+    }
@@ -0,0 +1,75 @@
+"""
+Семинар 10: Прозрачное сжатие содержимого заметок в БД.
+
+Содержит:
+- encode_content / decode_content — формат хранения (маркер + данные)
+- CompressedText — TypeDecorator: str в Python ↔ bytes в БД
+
+Большие тексты хорошо сжимаются (zlib даёт 3–10× на обычном тексте),
+а таблица и I/O растут в основном за счёт таких заметок. Короткие тексты
+хранятся как есть: для них заголовок zlib больше выигрыша.
+
+Формат значения в колонке (LargeBinary / bytea):
+    b"\x00" + UTF-8        — без сжатия (меньше порога или не сжалось)
+    b"\x01" + zlib(UTF-8)  — сжато
+
+zlib — из стандартной библиотеки любой поддерживаемой версии Python
+(zstd появился в stdlib только в 3.14).
+"""
+
+import os
+import zlib
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.engine import Dialect
+from sqlalchemy.types import TypeDecorator
+
+# Порог сжатия в байтах UTF-8. Меньше — хранить без сжатия.
+CONTENT_COMPRESS_MIN_BYTES: int = int(os.getenv("CONTENT_COMPRESS_MIN_BYTES", "1024"))
+# Уровень zlib: 6 — стандартный компромисс скорость / степень сжатия
+CONTENT_COMPRESS_LEVEL = 6
+
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+
+
+def encode_content(text: str, min_bytes: int = CONTENT_COMPRESS_MIN_BYTES) -> bytes:
+    """Закодировать текст для хранения: сжать, если он длиннее порога."""
+    raw = text.encode()
+    if len(raw) >= min_bytes:
+        packed = zlib.compress(raw, CONTENT_COMPRESS_LEVEL)
+        if len(packed) < len(raw):
+            return _ZLIB + packed
+    return _RAW + raw
+
+
+def decode_content(value: bytes) -> str:
+    """Раскодировать значение из БД обратно в текст."""
+    marker, payload = value[:1], value[1:]
+    if marker == _ZLIB:
+        return zlib.decompress(payload).decode()
+    if marker == _RAW:
+        return payload.decode()
+    raise ValueError(f"Неизвестный формат содержимого: маркер {marker!r}")
+
+
+class CompressedText(TypeDecorator[str]):
+    """Текстовая колонка, которая хранится в БД в сжатом виде.
+
+    Для кода приложения поле остаётся обычной строкой: сжатие при записи
+    и распаковка при чтении выполняются SQLAlchemy автоматически.
+
+    Пример:
+        content: str = Field(default="", sa_type=CompressedText)
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: str | None, dialect: Dialect) -> bytes | None:
+        """Python → БД: сжать строку."""
+        return None if value is None else encode_content(value)
+
+    def process_result_value(self, value: bytes | None, dialect: Dialect) -> str | None:
+        """БД → Python: распаковать строку."""
+        return None if value is None else decode_content(bytes(value))
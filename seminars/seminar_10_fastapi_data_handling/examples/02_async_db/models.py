@@ -8,8 +8,11 @@
 
 from datetime import datetime, timezone
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
+from .compression import CompressedText  # type: ignore[import]
+
 
 class NoteBase(SQLModel):
     """Общие поля: используются в таблице и Pydantic-схемах."""
@@ -23,8 +26,19 @@ class Note(NoteBase, table=True):
 
     Поля id и created_at генерируются базой данных автоматически.
     table=True → SQLModel создаёт реальную таблицу через SQLAlchemy.
+
+    Составной индекс (created_at, id) нужен для keyset-пагинации в GET /notes:
+    WHERE (created_at, id) > (:c, :i) ORDER BY created_at, id LIMIT :n
+    читает ровно n строк по индексу вместо OFFSET-перебора.
     """
 
+    __table_args__ = (Index("ix_note_created_at_id", "created_at", "id"),)
+
+    # В таблице content хранится сжатым (см. compression.py);
+    # в Python и в API это по-прежнему обычная строка.
+    content: str = Field(
+        default="", sa_type=CompressedText, description="Содержимое заметки"
+    )
     id: int | None = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -0,0 +1,111 @@
+"""
+Семинар 10, Блок 3: Keyset-пагинация и оценка количества заметок.
+
+Содержит:
+- encode_cursor / decode_cursor — непрозрачный курсор по (created_at, id)
+- keyset_statement — SELECT следующей страницы без OFFSET
+- estimate_total — быстрая оценка числа строк через pg_class.reltuples
+- exact_total — точный COUNT(*) (только по явному запросу клиента)
+
+Почему не OFFSET: `OFFSET 100000 LIMIT 100` заставляет БД прочитать и
+выбросить 100 000 строк. Keyset-запрос продолжает с последней увиденной
+пары (created_at, id) и идёт по индексу ix_note_created_at_id.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+from sqlalchemy import func, text, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+from .models import Note  # type: ignore[import]
+
+# ============================================================
+# 1. Курсор: base64url("<created_at ISO>|<id>")
+# ============================================================
+
+
+def encode_cursor(note: Note) -> str:
+    """Закодировать позицию последней заметки страницы в курсор.
+
+    Args:
+        note: последняя заметка текущей страницы
+
+    Returns:
+        строка для query-параметра `cursor` следующего запроса
+    """
+    raw = f"{note.created_at.isoformat()}|{note.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Раскодировать курсор в пару (created_at, id).
+
+    Raises:
+        ValueError: курсор повреждён или создан не этим API
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, note_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(note_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"Некорректный курсор: {cursor!r}") from exc
+
+
+# ============================================================
+# 2. Запрос страницы
+# ============================================================
+
+
+def keyset_statement(
+    limit: int | None, after: tuple[datetime, int] | None = None
+) -> SelectOfScalar[Note]:
+    """Построить SELECT страницы, упорядоченной по (created_at, id).
+
+    Args:
+        limit: максимальный размер страницы; None → без LIMIT (для экспорта)
+        after: позиция из курсора; None → первая страница
+    """
+    statement = select(Note).order_by(Note.created_at, Note.id)  # type: ignore[arg-type]
+    if limit is not None:
+        statement = statement.limit(limit)
+    if after is not None:
+        # Row value comparison: (a, b) > (x, y) — PostgreSQL и SQLite ≥ 3.15
+        statement = statement.where(tuple_(Note.created_at, Note.id) > after)
+    return statement
+
+
+# ============================================================
+# 3. Общее количество: оценка и точный подсчёт
+# ============================================================
+
+
+async def exact_total(session: AsyncSession) -> int:
+    """Точный SELECT COUNT(*) — полный проход по таблице на больших данных."""
+    result = await session.exec(select(func.count()).select_from(Note))
+    return int(result.one())
+
+
+async def estimate_total(session: AsyncSession) -> int:
+    """Оценить число заметок без полного прохода по таблице.
+
+    PostgreSQL хранит приблизительное число строк в pg_class.reltuples
+    (обновляется VACUUM / ANALYZE / autovacuum) — чтение занимает O(1).
+    Для других СУБД (SQLite в локальной разработке) и для ещё ни разу
+    не проанализированной таблицы (reltuples = -1) делаем точный COUNT(*).
+    """
+    if session.bind is None or session.bind.dialect.name != "postgresql":
+        return await exact_total(session)
+
+    result = await session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:t)"),
+        {"t": Note.__tablename__},
+    )
+    estimate = result.scalar_one_or_none()
+    if estimate is None or estimate < 0:
+        return await exact_total(session)
+    return int(estimate)
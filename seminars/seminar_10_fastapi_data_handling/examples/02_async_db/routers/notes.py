@@ -4,14 +4,59 @@
 Роутер для заметок. Все операции асинхронные.
 """
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import select
-
-from ..db import SessionDep  # type: ignore[import]
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.sql.expression import SelectOfScalar
+
+from ..body import json_body_schema, strict_json_body  # type: ignore[import]
+from ..db import (  # type: ignore[import]
+    AsyncSessionLocal,
+    ReadSessionDep,
+    SessionDep,
+    read_engine_for,
+)
 from ..models import Note, NoteCreate, NoteResponse, NoteUpdate  # type: ignore[import]
+from ..pagination import (  # type: ignore[import]
+    decode_cursor,
+    encode_cursor,
+    estimate_total,
+    exact_total,
+    keyset_statement,
+)
+from ..uow import (  # type: ignore[import]
+    delete_note_returning,
+    insert_note,
+    unit_of_work,
+    update_note_returning,
+)
 
+# Запись (POST / PATCH / DELETE) → SessionDep (primary).
+# Чтение (GET) → ReadSessionDep (реплика, если настроена).
 router = APIRouter(prefix="/notes", tags=["notes"])
 
+# Сколько строк за раз забирать из курсора БД при потоковом экспорте.
+# Пиковая память ≈ STREAM_BATCH_SIZE заметок, а не весь результат.
+STREAM_BATCH_SIZE = 1000
+
+# Тело POST /notes: model_validate_json(strict=True) прямо из байтов
+# вместо json.loads + валидации dict (см. body.py)
+StrictNoteCreate = Annotated[NoteCreate, Depends(strict_json_body(NoteCreate))]
+
+
+def _parse_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    """Курсор из query-параметра → (created_at, id) или 400."""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
 
 # ============================================================
 # CREATE: POST /notes → 201
@@ -23,17 +68,16 @@ router = APIRouter(prefix="/notes", tags=["notes"])
     response_model=NoteResponse,
     status_code=201,
     summary="Создать заметку",
+    openapi_extra=json_body_schema(NoteCreate),
 )
-async def create_note(note_in: NoteCreate, session: SessionDep) -> Note:
+async def create_note(note_in: StrictNoteCreate, session: SessionDep) -> Note:
     """Создать новую заметку и сохранить в PostgreSQL.
 
     Возвращает созданную заметку с id и created_at.
     """
-    note = Note(**note_in.model_dump())
-    session.add(note)
-    await session.commit()
-    await session.refresh(note)  # подгрузить id и created_at из БД
-    return note
+    async with unit_of_work(session):
+        # INSERT ... RETURNING id — отдельный refresh() не нужен
+        return await insert_note(session, note_in)
 
 
 # ============================================================
@@ -47,15 +91,86 @@ async def create_note(note_in: NoteCreate, session: SessionDep) -> Note:
     summary="Список заметок",
 )
 async def list_notes(
-    session: SessionDep, offset: int = 0, limit: int = 100
+    session: ReadSessionDep,
+    response: Response,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    total: Literal["estimate", "exact"] | None = None,
 ) -> list[Note]:
-    """Получить список всех заметок с пагинацией.
+    """Получить список заметок, упорядоченных по (created_at, id).
 
-    - `offset` — пропустить N первых записей
+    - `cursor` — продолжить после последней заметки предыдущей страницы
+      (значение из заголовка `X-Next-Cursor`); работает по индексу без OFFSET
+    - `offset` — пропустить N первых записей (медленно на больших таблицах)
     - `limit` — максимальное количество в ответе
+    - `total=estimate` — заголовок `X-Total-Estimate` из статистики PostgreSQL
+    - `total=exact` — заголовок `X-Total-Count` через точный COUNT(*)
     """
-    result = await session.exec(select(Note).offset(offset).limit(limit))
-    return list(result.all())
+    statement = keyset_statement(limit, _parse_cursor(cursor))
+    if offset:
+        statement = statement.offset(offset)
+    result = await session.exec(statement)
+    notes = list(result.all())
+
+    # Полная страница → возможно, есть следующая: отдаём курсор на неё
+    if notes and len(notes) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(notes[-1])
+    if total == "estimate":
+        response.headers["X-Total-Estimate"] = str(await estimate_total(session))
+    elif total == "exact":
+        response.headers["X-Total-Count"] = str(await exact_total(session))
+    return notes
+
+
+# ============================================================
+# EXPORT: GET /notes/export → 200 (NDJSON-поток)
+# ============================================================
+
+
+async def _iter_notes_ndjson(
+    engine: AsyncEngine, statement: SelectOfScalar[Note]
+) -> AsyncIterator[bytes]:
+    """Построчно отдавать заметки в формате NDJSON (одна JSON-строка на заметку).
+
+    Сессия открывается внутри генератора, а не через Depends(get_session):
+    генератор работает уже после выхода из эндпоинта, и сессия должна
+    жить ровно столько, сколько идёт передача ответа.
+
+    stream_scalars + yield_per читают результат порциями через серверный
+    курсор — в памяти одновременно не больше STREAM_BATCH_SIZE объектов.
+    """
+    async with AsyncSessionLocal(bind=engine) as session:
+        result = await session.stream_scalars(
+            statement.execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for batch in result.partitions():
+            yield b"".join(
+                NoteResponse.model_validate(note).model_dump_json().encode() + b"\n"
+                for note in batch
+            )
+
+
+@router.get(
+    "/export",
+    summary="Экспорт заметок потоком (NDJSON)",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def export_notes(
+    request: Request, cursor: str | None = None, limit: int | None = None
+) -> StreamingResponse:
+    """Выгрузить заметки потоком, не собирая их в список.
+
+    Формат — NDJSON: каждая строка — отдельный JSON-объект NoteResponse.
+    Порядок (created_at, id) совпадает с GET /notes, поэтому прерванную
+    выгрузку можно продолжить с курсора последней полученной заметки.
+    """
+    statement = keyset_statement(limit, _parse_cursor(cursor))
+    return StreamingResponse(
+        _iter_notes_ndjson(read_engine_for(request), statement),
+        media_type="application/x-ndjson",
+    )
 
 
 # ============================================================
@@ -69,7 +184,7 @@ async def list_notes(
     summary="Получить заметку по ID",
     responses={404: {"description": "Заметка не найдена"}},
 )
-async def get_note(note_id: int, session: SessionDep) -> Note:
+async def get_note(note_id: int, session: ReadSessionDep) -> Note:
     """Получить заметку по ID.
 
     Возвращает 404 если заметка не существует.
@@ -100,18 +215,14 @@ async def update_note(
 
     Передайте только поля, которые нужно изменить.
     """
-    note = await session.get(Note, note_id)
+    # exclude_unset=True → обновляем только переданные поля
+    update_data = note_update.model_dump(exclude_unset=True)
+    async with unit_of_work(session):
+        note = await update_note_returning(session, note_id, update_data)
     if note is None:
         raise HTTPException(
             status_code=404, detail=f"Заметка с id={note_id} не найдена"
         )
-    # exclude_unset=True → обновляем только переданные поля
-    update_data = note_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(note, field, value)
-    session.add(note)
-    await session.commit()
-    await session.refresh(note)
     return note
 
 
@@ -131,10 +242,9 @@ async def delete_note(note_id: int, session: SessionDep) -> None:
 
     Возвращает 204 No Content при успехе.
     """
-    note = await session.get(Note, note_id)
-    if note is None:
+    async with unit_of_work(session):
+        deleted = await delete_note_returning(session, note_id)
+    if not deleted:
         raise HTTPException(
             status_code=404, detail=f"Заметка с id={note_id} не найдена"
         )
-    await session.delete(note)
-    await session.commit()
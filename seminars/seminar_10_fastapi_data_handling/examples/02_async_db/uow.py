@@ -0,0 +1,88 @@
+"""
+Семинар 10, Блок 3: Unit of Work — запись заметок за минимум round-trip'ов.
+
+Содержит:
+- unit_of_work — одна транзакция на всю операцию (commit / rollback)
+- insert_note — INSERT ... RETURNING без повторного SELECT (refresh)
+- update_note_returning — UPDATE ... RETURNING вместо get → commit → refresh
+- delete_note_returning — DELETE ... RETURNING вместо get → delete → commit
+
+Сравнение PATCH /notes/{id}:
+    было:  SELECT, UPDATE, SELECT (refresh)  — 3 запроса + COMMIT
+    стало: UPDATE ... RETURNING              — 1 запрос  + COMMIT
+
+RETURNING поддерживают PostgreSQL и SQLite ≥ 3.35.
+"""
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from sqlalchemy import delete, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .models import Note, NoteCreate  # type: ignore[import]
+
+
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """Выполнить блок в одной транзакции.
+
+    Успешный выход → COMMIT, исключение → ROLLBACK.
+    Сессия та же, что пришла из Depends(get_session): FastAPI кеширует
+    зависимость, поэтому все шаги запроса используют одно соединение.
+
+    Пример:
+        async with unit_of_work(session):
+            note = await update_note_returning(session, note_id, values)
+    """
+    async with session.begin():
+        yield session
+
+
+async def insert_note(session: AsyncSession, note_in: NoteCreate) -> Note:
+    """Вставить заметку; id возвращается тем же INSERT через RETURNING.
+
+    created_at заполняется в Python (default_factory), поэтому после
+    flush() объект полностью заполнен и refresh() не нужен.
+    """
+    note = Note(**note_in.model_dump())
+    session.add(note)
+    await session.flush()
+    return note
+
+
+async def update_note_returning(
+    session: AsyncSession, note_id: int, values: dict[str, Any]
+) -> Note | None:
+    """Обновить поля заметки одним UPDATE ... RETURNING.
+
+    Args:
+        values: изменяемые поля (model_dump(exclude_unset=True))
+
+    Returns:
+        обновлённую заметку или None, если заметки нет
+    """
+    if not values:
+        # Нечего обновлять — достаточно одного SELECT
+        return await session.get(Note, note_id)
+    statement = (
+        update(Note)
+        .where(Note.id == note_id)  # type: ignore[arg-type]
+        .values(**values)
+        .returning(Note)
+        .execution_options(populate_existing=True)
+    )
+    result = await session.exec(statement)
+    return result.scalar_one_or_none()
+
+
+async def delete_note_returning(session: AsyncSession, note_id: int) -> bool:
+    """Удалить заметку одним DELETE ... RETURNING id.
+
+    Returns:
+        True если заметка была удалена, False если её не было
+    """
+    statement = delete(Note).where(Note.id == note_id).returning(Note.id)  # type: ignore[arg-type]
+    result = await session.exec(statement)
+    return result.scalar_one_or_none() is not None
@@ -32,10 +32,18 @@ sys.path.insert(0, str(_demo_dir))
 # ВАЖНО: импортировать все модели до использования target_metadata.
 # Alembic использует SQLModel.metadata для autogenerate.
 import models  # type: ignore[import]  # noqa: E402, F401 — нужен для регистрации таблиц в метаданных
+from online_migrations import PROGRESS_TABLE  # type: ignore[import]  # noqa: E402
 from sqlmodel import SQLModel  # noqa: E402
 
 target_metadata = SQLModel.metadata
 
+
+def include_name(name: str | None, type_: str, parent_names: object) -> bool:
+    """Служебная таблица прогресса backfill не описана в моделях —
+    autogenerate не должен предлагать её удалить."""
+    return not (type_ == "table" and name == PROGRESS_TABLE)
+
+
 # ============================================================
 # Конфигурация Alembic
 # ============================================================
@@ -80,7 +88,14 @@ def run_migrations_offline() -> None:
 # ============================================================
 def do_run_migrations(connection: Connection) -> None:
     """Выполнить миграции в контексте синхронного соединения."""
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        # Каждая ревизия — в своей транзакции: долгий backfill не держит
+        # блокировки всех предыдущих ревизий (см. online_migrations.py)
+        transaction_per_migration=True,
+    )
     with context.begin_transaction():
         context.run_migrations()
 
@@ -0,0 +1,143 @@
+"""compress note.content (text -> bytea), online batched backfill
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import sqlalchemy as sa
+from alembic import op
+from compressed_text import decode_content, encode_content  # type: ignore[import]
+from online_migrations import (  # type: ignore[import]
+    backfill_in_batches,
+    forget_backfill,
+)
+from sqlalchemy.engine import Connection
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: str | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Сколько строк переписывать за одну транзакцию
+BATCH_SIZE = 1000
+
+
+def _rewriter(
+    source: str, target: str, convert: Callable[[Any], Any]
+) -> Callable[[Connection, int, int], int]:
+    """Обработчик порции для backfill_in_batches: source → convert → target.
+
+    Повторный запуск безопасен: результат зависит только от source.
+    """
+    note = sa.table(
+        "note",
+        sa.column("id", sa.Integer),
+        sa.column(source),
+        sa.column(target),
+    )
+    update = (
+        note.update()
+        .where(note.c.id == sa.bindparam("_id"))
+        .values({target: sa.bindparam("_value")})
+    )
+
+    def run(conn: Connection, lower: int, upper: int) -> int:
+        rows = conn.execute(
+            sa.select(note.c.id, note.c[source]).where(
+                note.c.id > lower, note.c.id <= upper
+            )
+        ).all()
+        if rows:
+            conn.execute(
+                update, [{"_id": row[0], "_value": convert(row[1])} for row in rows]
+            )
+        return len(rows)
+
+    return run
+
+
+def _add_column_once(column: sa.Column[Any]) -> None:
+    """Добавить колонку, если её ещё нет (ревизия могла прерваться в backfill)."""
+    if op.get_context().as_sql:  # --sql: схемы БД не видно
+        op.add_column("note", column)
+        return
+    existing = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("note")}
+    if column.name not in existing:
+        op.add_column("note", column)
+
+
+def _note_table_for_sql(
+    content_type: sa.types.TypeEngine[Any], extra: sa.Column[Any]
+) -> sa.Table | None:
+    """Полное описание note для batch_alter_table в режиме --sql.
+
+    На SQLite batch-режим пересоздаёт таблицу и берёт её структуру
+    рефлексией — без соединения с БД (--sql, dry-run) описание
+    передаётся через copy_from. При выполнении на живой БД — None:
+    структура читается из БД.
+    """
+    if not op.get_context().as_sql:
+        return None
+    return sa.Table(
+        "note",
+        sa.MetaData(),
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column("content", content_type, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        extra,
+        sa.Index("ix_note_created_at_id", "created_at", "id"),
+    )
+
+
+def upgrade() -> None:
+    _add_column_once(sa.Column("content_z", sa.LargeBinary(), nullable=True))
+    backfill_in_batches(
+        "0003_compress_note_content",
+        "note",
+        _rewriter("content", "content_z", encode_content),
+        batch_size=BATCH_SIZE,
+    )
+    # batch_alter_table: на SQLite пересоздаёт таблицу, на PostgreSQL — ALTER
+    copy_from = _note_table_for_sql(
+        sa.String(), sa.Column("content_z", sa.LargeBinary(), nullable=True)
+    )
+    with op.batch_alter_table("note", copy_from=copy_from) as batch:
+        batch.drop_column("content")
+        batch.alter_column(
+            "content_z",
+            new_column_name="content",
+            existing_type=sa.LargeBinary(),
+            nullable=False,
+        )
+    forget_backfill("0003_compress_note_content")
+
+
+def downgrade() -> None:
+    _add_column_once(sa.Column("content_text", sa.String(), nullable=True))
+    backfill_in_batches(
+        "0003_decompress_note_content",
+        "note",
+        _rewriter(
+            "content", "content_text", lambda value: decode_content(bytes(value))
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    copy_from = _note_table_for_sql(
+        sa.LargeBinary(), sa.Column("content_text", sa.String(), nullable=True)
+    )
+    with op.batch_alter_table("note", copy_from=copy_from) as batch:
+        batch.drop_column("content")
+        batch.alter_column(
+            "content_text",
+            new_column_name="content",
+            existing_type=sa.String(),
+            nullable=False,
+        )
+    forget_backfill("0003_decompress_note_content")
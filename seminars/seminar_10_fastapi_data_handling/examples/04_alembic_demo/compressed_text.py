@@ -0,0 +1,38 @@
+"""
+Семинар 10, Блок 4: Сжатие Note.content для Alembic-проекта.
+
+Реализация одна — 02_async_db/compression.py: обе версии приложения
+работают с одной таблицей note и обязаны писать один формат. Этот модуль
+только загружает её и реэкспортирует. Модуль импортируется из models.py
+и из миграции 0003, в том числе когда alembic/env.py добавил в sys.path
+лишь эту директорию, — поэтому загрузка по пути к файлу, а не import пакета
+(имя 02_async_db начинается с цифры и вне корня репозитория недоступно).
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+_MODULE_NAME = "notes_compression"
+_SOURCE = Path(__file__).resolve().parent.parent / "02_async_db" / "compression.py"
+
+
+def _load() -> object:
+    """Загрузить compression.py один раз на процесс (кеш в sys.modules)."""
+    if _MODULE_NAME in sys.modules:
+        return sys.modules[_MODULE_NAME]
+    spec = importlib.util.spec_from_file_location(_MODULE_NAME, _SOURCE)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[_MODULE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_compression = _load()
+
+CompressedText = _compression.CompressedText  # type: ignore[attr-defined]
+decode_content = _compression.decode_content  # type: ignore[attr-defined]
+encode_content = _compression.encode_content  # type: ignore[attr-defined]
+
+__all__ = ["CompressedText", "decode_content", "encode_content"]
@@ -5,33 +5,38 @@
     # 1. Запустить PostgreSQL:
     #    docker compose up -d
     #
-    # 2. Сгенерировать первую миграцию:
+    # 2. Применить миграции (0001 — note, 0002 — keyset-индекс, 0003 — сжатие):
     #    cd seminars/seminar_10_fastapi_data_handling/examples/04_alembic_demo
-    #    alembic revision --autogenerate -m "create notes table"
-    #
-    # 3. Применить миграцию:
     #    alembic upgrade head
     #
+    # 3. После изменения models.py — сгенерировать новую миграцию:
+    #    alembic revision --autogenerate -m "describe change"
+    #
     # 4. Запустить сервер:
     #    cd <корень репозитория>
     #    uvicorn seminars.seminar_10_fastapi_data_handling.examples.04_alembic_demo.main:app --reload
 """
 
-from collections.abc import AsyncGenerator
+import json
+from collections.abc import AsyncGenerator, AsyncIterator
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlmodel import select
 
-from .db import async_engine  # type: ignore[import]
+from .db import (  # type: ignore[import]
+    AsyncSessionLocal,
+    SessionDep,
+    async_engine,
+    instrument_session,
+)
 from .models import Note  # type: ignore[import]
 
-AsyncSessionLocal = async_sessionmaker(
-    bind=async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+# Максимальный размер страницы GET /notes
+MAX_PAGE_SIZE = 100
+# Размер порции при потоковой выгрузке GET /notes/export
+EXPORT_CHUNK_SIZE = 500
 
 
 @asynccontextmanager
@@ -42,12 +47,6 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     await async_engine.dispose()
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    """Зависимость FastAPI для получения сессии."""
-    async with AsyncSessionLocal() as session:
-        yield session
-
-
 app = FastAPI(
     title="Notes API (Alembic)",
     description="Notes API с миграциями через Alembic.",
@@ -56,21 +55,73 @@ app = FastAPI(
 )
 
 
+def _note_to_dict(note: Note) -> dict:
+    """Заметка → словарь ответа (без created_at)."""
+    return {"id": note.id, "title": note.title, "content": note.content}
+
+
 @app.get("/notes", response_model=list[dict])
-async def list_notes() -> list[dict]:
-    """Получить все заметки."""
-    async with AsyncSessionLocal() as session:
-        result = await session.exec(select(Note))  # type: ignore[call-overload]
-        return [
-            {"id": n.id, "title": n.title, "content": n.content} for n in result.all()
-        ]
+async def list_notes(
+    session: SessionDep,
+    limit: int = Query(default=20, ge=1, le=MAX_PAGE_SIZE),
+    after_id: int = 0,
+) -> list[dict]:
+    """Получить страницу заметок, упорядоченных по id.
+
+    - `limit` — размер страницы (не больше MAX_PAGE_SIZE)
+    - `after_id` — id последней заметки предыдущей страницы (keyset)
+    """
+    statement = (
+        select(Note)
+        .where(Note.id > after_id)  # type: ignore[operator]
+        .order_by(Note.id)  # type: ignore[arg-type]
+        .limit(limit)
+    )
+    result = await session.exec(statement)
+    return [_note_to_dict(n) for n in result.all()]
+
+
+@app.get("/notes/export", response_class=StreamingResponse)
+async def export_notes() -> StreamingResponse:
+    """Выгрузить все заметки потоком NDJSON.
+
+    Заметки читаются порциями по EXPORT_CHUNK_SIZE (keyset по id), так что
+    каждый запрос ограничен LIMIT, а в памяти держится одна порция.
+
+    Сессия открывается внутри генератора, а не через SessionDep: генератор
+    работает уже после выхода из эндпоинта, а FastAPI до 0.118 закрывает
+    yield-зависимости раньше, чем отправлен поток. Счётчик запросов
+    и защита от SELECT без LIMIT подключаются так же, как в get_session.
+    """
+
+    async def chunks() -> AsyncIterator[bytes]:
+        async with AsyncSessionLocal() as session:
+            instrument_session(session)
+            after_id = 0
+            while True:
+                result = await session.exec(
+                    select(Note)
+                    .where(Note.id > after_id)  # type: ignore[operator]
+                    .order_by(Note.id)  # type: ignore[arg-type]
+                    .limit(EXPORT_CHUNK_SIZE)
+                )
+                notes = result.all()
+                if not notes:
+                    return
+                yield b"".join(
+                    json.dumps(_note_to_dict(n), ensure_ascii=False).encode() + b"\n"
+                    for n in notes
+                )
+                after_id = notes[-1].id  # type: ignore[assignment]
+                session.expunge_all()  # отпустить уже отправленные объекты
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
 
 
 @app.get("/notes/{note_id}", response_model=dict)
-async def get_note(note_id: int) -> dict:
+async def get_note(note_id: int, session: SessionDep) -> dict:
     """Получить заметку по ID."""
-    async with AsyncSessionLocal() as session:
-        note = await session.get(Note, note_id)
-        if note is None:
-            raise HTTPException(status_code=404, detail="Заметка не найдена")
-        return {"id": note.id, "title": note.title, "content": note.content}
+    note = await session.get(Note, note_id)
+    if note is None:
+        raise HTTPException(status_code=404, detail="Заметка не найдена")
+    return _note_to_dict(note)
@@ -6,13 +6,26 @@
 
 from datetime import datetime, timezone
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
+try:
+    from .compressed_text import CompressedText  # type: ignore[import]
+except ImportError:
+    # alembic/env.py импортирует models как модуль верхнего уровня
+    from compressed_text import CompressedText  # type: ignore[import,no-redef]
+
 
 class Note(SQLModel, table=True):
-    """Таблица notes. Alembic отслеживает изменения в этой модели."""
+    """Таблица notes. Alembic отслеживает изменения в этой модели.
+
+    Индекс (created_at, id) создаётся миграцией 0002 — для keyset-пагинации.
+    """
+
+    __table_args__ = (Index("ix_note_created_at_id", "created_at", "id"),)
 
     id: int | None = Field(default=None, primary_key=True)
     title: str = Field(min_length=1, max_length=200)
-    content: str = Field(default="")
+    # Хранится сжатым (bytea), миграция 0003 переписала старые строки
+    content: str = Field(default="", sa_type=CompressedText)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
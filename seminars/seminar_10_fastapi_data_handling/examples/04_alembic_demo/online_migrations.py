@@ -0,0 +1,236 @@
+"""
+Онлайн-миграции данных поверх Alembic (без долгих блокировок таблиц).
+
+Содержит:
+- backfill_in_batches / forget_backfill — пакетный backfill: keyset
+  по первичному ключу, COMMIT после каждой порции, прогресс в таблице
+  data_migration_progress, пауза между порциями
+- create_index_concurrently / drop_index_concurrently — построение и
+  удаление индекса без блокировки записи (PostgreSQL, вне транзакции)
+
+Зачем: Alembic выполняет ревизию в транзакции. UPDATE большой таблицы
+в ней держит блокировки строк до конца миграции, а обычный CREATE INDEX
+блокирует запись в таблицу на всё время построения индекса.
+
+Пример ревизии:
+
+    from online_migrations import (
+        backfill_in_batches,
+        create_index_concurrently,
+        forget_backfill,
+    )
+
+    def upgrade() -> None:
+        backfill_in_batches(
+            "0042_fill_note_title",
+            "note",
+            "UPDATE note SET title = 'Без названия' "
+            "WHERE id > :lower AND id <= :upper AND title = ''",
+        )
+        create_index_concurrently("ix_note_title", "note", ["title"])
+        forget_backfill("0042_fill_note_title")
+
+Правила:
+- обе функции сначала фиксируют (COMMIT) всё, что ревизия сделала до них;
+  DDL перед ними должна переживать повторный запуск ревизии
+  (например, проверять, что колонка ещё не добавлена);
+- первичный ключ таблицы — целочисленный;
+- forget_backfill в конце ревизии удаляет запись о прогрессе вместе
+  с коммитом ревизии — после downgrade backfill снова выполнится целиком.
+"""
+
+import logging
+import time
+from collections.abc import Callable, Sequence
+from datetime import datetime, timezone
+from typing import Any
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger("alembic.online")
+
+# ============================================================
+# Таблица прогресса
+# ============================================================
+# Одна строка на backfill: докуда дошли и сколько строк обработали.
+# После сбоя повторный `alembic upgrade head` продолжит с last_pk.
+PROGRESS_TABLE = "data_migration_progress"
+
+progress_table = sa.Table(
+    PROGRESS_TABLE,
+    sa.MetaData(),
+    sa.Column("name", sa.String(200), primary_key=True),
+    sa.Column("last_pk", sa.BigInteger(), nullable=False),
+    sa.Column("rows_done", sa.BigInteger(), nullable=False),
+    sa.Column("finished", sa.Boolean(), nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+)
+
+# Обработчик порции: (соединение, нижняя граница (не включая), верхняя
+# граница (включая)) → число изменённых строк
+ChunkFn = Callable[[Connection, int, int], int]
+
+
+def sql_chunk(statement: str) -> ChunkFn:
+    """Обработчик порции из SQL с параметрами :lower и :upper.
+
+    SQL должен ограничивать строки условием `pk > :lower AND pk <= :upper`.
+    """
+    clause = sa.text(statement)
+
+    def run(conn: Connection, lower: int, upper: int) -> int:
+        return conn.execute(clause, {"lower": lower, "upper": upper}).rowcount
+
+    return run
+
+
+def _save_progress(
+    conn: Connection, name: str, last_pk: int, rows_done: int, finished: bool
+) -> None:
+    """Записать прогресс backfill (UPDATE, а при отсутствии строки — INSERT)."""
+    values = {
+        "last_pk": last_pk,
+        "rows_done": rows_done,
+        "finished": finished,
+        "updated_at": datetime.now(timezone.utc),
+    }
+    updated = conn.execute(
+        progress_table.update().where(progress_table.c.name == name).values(**values)
+    )
+    if updated.rowcount == 0:
+        conn.execute(progress_table.insert().values(name=name, **values))
+
+
+# ============================================================
+# Пакетный backfill
+# ============================================================
+
+
+def backfill_in_batches(
+    name: str,
+    table: str,
+    chunk: str | ChunkFn,
+    *,
+    pk: str = "id",
+    batch_size: int = 1000,
+    pause: float = 0.0,
+) -> int:
+    """Обработать таблицу порциями по batch_size строк, COMMIT после каждой.
+
+    Порция — диапазон первичного ключа (lower, upper], найденный keyset-
+    запросом по индексу PK. Изменения порции и запись прогресса выполняются
+    в одной транзакции: после сбоя ни одна порция не применится дважды.
+
+    Args:
+        name: уникальное имя backfill (ключ в data_migration_progress)
+        table: имя таблицы
+        chunk: SQL с :lower / :upper или функция (conn, lower, upper) → rows
+        pk: имя целочисленного первичного ключа
+        batch_size: строк в порции — чем меньше, тем короче блокировки
+        pause: пауза между порциями в секундах (нагрузка на БД и реплики)
+
+    Returns:
+        общее число обработанных строк
+    """
+    if op.get_context().as_sql:
+        # --sql / dry-run: порции зависят от данных, в SQL — только отметка
+        op.execute(f"-- backfill_in_batches: {name} ON {table} ({batch_size}/commit)")
+        return 0
+    run_chunk = sql_chunk(chunk) if isinstance(chunk, str) else chunk
+    keys = sa.table(table, sa.column(pk)).c[pk]
+
+    # autocommit_block фиксирует транзакцию ревизии и снимает её блокировки;
+    # порции выполняются в отдельном соединении со своими транзакциями.
+    with op.get_context().autocommit_block(), op.get_bind().engine.connect() as conn:
+        with conn.begin():
+            progress_table.create(conn, checkfirst=True)
+            state = conn.execute(
+                sa.select(progress_table).where(progress_table.c.name == name)
+            ).first()
+            if state is not None and state.finished:
+                logger.info("%s: уже выполнен (%d строк)", name, state.rows_done)
+                return int(state.rows_done)
+            if state is not None:
+                last_pk, rows_done = int(state.last_pk), int(state.rows_done)
+            else:
+                first = conn.execute(sa.select(sa.func.min(keys))).scalar()
+                if first is None:
+                    return 0
+                last_pk, rows_done = int(first) - 1, 0
+
+        while True:
+            with conn.begin():
+                window = (
+                    sa.select(keys)
+                    .where(keys > last_pk)
+                    .order_by(keys)
+                    .limit(batch_size)
+                    .subquery()
+                )
+                upper = conn.execute(sa.select(sa.func.max(window.c[pk]))).scalar()
+                if upper is None:
+                    _save_progress(conn, name, last_pk, rows_done, finished=True)
+                    break
+                rows_done += run_chunk(conn, last_pk, int(upper))
+                last_pk = int(upper)
+                _save_progress(conn, name, last_pk, rows_done, finished=False)
+            logger.info("%s: %d строк, %s ≤ %d", name, rows_done, pk, last_pk)
+            if pause:
+                time.sleep(pause)
+
+    logger.info("%s: готово, %d строк", name, rows_done)
+    return rows_done
+
+
+def forget_backfill(name: str) -> None:
+    """Удалить запись о прогрессе backfill (в транзакции ревизии)."""
+    if op.get_context().as_sql:
+        return
+    conn = op.get_bind()
+    if sa.inspect(conn).has_table(PROGRESS_TABLE):
+        conn.execute(progress_table.delete().where(progress_table.c.name == name))
+
+
+# ============================================================
+# Индексы без блокировки записи
+# ============================================================
+
+
+def create_index_concurrently(
+    index_name: str, table: str, columns: Sequence[str], **kwargs: Any
+) -> None:
+    """CREATE INDEX CONCURRENTLY (PostgreSQL) вне транзакции ревизии.
+
+    PostgreSQL запрещает CONCURRENTLY внутри транзакции, поэтому индекс
+    строится в autocommit_block. Если построение прервалось, остаётся
+    INVALID-индекс: удалите его drop_index_concurrently и запустите снова.
+    На других СУБД — обычный CREATE INDEX.
+    """
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index(index_name, table, list(columns), **kwargs)
+        return
+    with op.get_context().autocommit_block():
+        op.create_index(
+            index_name,
+            table,
+            list(columns),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+            **kwargs,
+        )
+
+
+def drop_index_concurrently(index_name: str, table: str) -> None:
+    """DROP INDEX CONCURRENTLY (PostgreSQL) вне транзакции ревизии."""
+    if op.get_bind().dialect.name != "postgresql":
+        op.drop_index(index_name, table_name=table)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            index_name,
+            table_name=table,
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,101 @@
+"""Конфигурация pytest для тестов Notes API (02_async_db).
+
+Тесты не требуют PostgreSQL: primary и реплика — два SQLite-файла
+во временной директории (драйвер aiosqlite).
+"""
+
+import importlib
+from collections.abc import Callable, Generator, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlmodel import SQLModel
+
+# Загружаем Notes API через importlib (имя папки начинается с цифры)
+_BASE = "seminars.seminar_10_fastapi_data_handling.examples.02_async_db"
+_main = importlib.import_module(f"{_BASE}.main")
+db = importlib.import_module(f"{_BASE}.db")
+
+app = _main.app
+
+
+def _create_schema(path: Path) -> None:
+    """Создать таблицы в SQLite-файле синхронным движком."""
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def make_router(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Callable[..., Any]:
+    """Фабрика EngineRouter на SQLite-файлах, подменяющая db.engine_router.
+
+    Пример:
+        router = make_router(replicas=1, read_your_writes_seconds=0)
+    """
+
+    def factory(replicas: int = 1, **kwargs: float) -> Any:
+        primary = tmp_path / "primary.db"
+        replica_paths = [tmp_path / f"replica{i}.db" for i in range(replicas)]
+        for path in [primary, *replica_paths]:
+            _create_schema(path)
+        router = db.EngineRouter(
+            f"sqlite+aiosqlite:///{primary}",
+            [f"sqlite+aiosqlite:///{path}" for path in replica_paths],
+            echo=False,
+            **kwargs,
+        )
+        monkeypatch.setattr(db, "engine_router", router)
+        return router
+
+    return factory
+
+
+@pytest.fixture
+def client(make_router: Callable[..., Any]) -> Generator[TestClient, None, None]:
+    """TestClient поверх primary + одной реплики (без read-your-writes).
+
+    `with TestClient(app)` запускает lifespan: create_all и dispose движков.
+    """
+    make_router(replicas=1, read_your_writes_seconds=0)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def assert_num_queries() -> Callable[[int], AbstractContextManager[list[str]]]:
+    """Проверка числа SQL-запросов внутри блока (как assertNumQueries в Django).
+
+    Считаются выполненные statement'ы на всех движках db.engine_router
+    (primary и реплики); BEGIN / COMMIT драйвера не учитываются.
+
+    Пример:
+        with assert_num_queries(1):
+            client.patch("/notes/1", json={"title": "Новый"})
+    """
+
+    @contextmanager
+    def checker(expected: int) -> Iterator[list[str]]:
+        statements: list[str] = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engines = [engine.sync_engine for engine in db.engine_router.engines()]
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", on_execute)
+        try:
+            yield statements
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", on_execute)
+        assert len(statements) == expected, (
+            f"Ожидалось {expected} SQL-запросов, выполнено {len(statements)}:\n"
+            + "\n".join(statements)
+        )
+
+    return checker
@@ -0,0 +1,303 @@
+"""Тесты Notes API: маршрутизация чтения на реплики.
+
+Запуск:
+    pytest seminars/seminar_10_fastapi_data_handling/examples/05_testing/ -v
+"""
+
+import asyncio
+import importlib
+import sqlite3
+from collections.abc import Callable
+from pathlib import Path
+from typing import Annotated, Any
+
+import pytest
+from fastapi import Depends, FastAPI, Response
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy.exc import OperationalError
+
+# Загружаем Notes API через importlib (имя папки начинается с цифры)
+_BASE = "seminars.seminar_10_fastapi_data_handling.examples.02_async_db"
+app = importlib.import_module(f"{_BASE}.main").app
+db = importlib.import_module(f"{_BASE}.db")
+compression = importlib.import_module(f"{_BASE}.compression")
+body = importlib.import_module(f"{_BASE}.body")
+# Копия strict_json_body в примере семинара 9 — проверяется теми же тестами
+tasks_docs = importlib.import_module(
+    "seminars.seminar_09_fastapi_intro.examples.05_pydantic_docs"
+)
+
+# ============================================================
+# Тесты маршрутизации primary / реплики
+# ============================================================
+
+
+class TestReadReplicaRouting:
+    """Запись идёт на primary, чтение — на реплики."""
+
+    def test_write_goes_to_primary_read_to_replica(self, client: TestClient) -> None:
+        """Реплика ещё «не догнала» primary — чтение заметки не видит."""
+        created = client.post("/notes/", json={"title": "Только на primary"})
+        assert created.status_code == 201
+
+        assert client.get("/notes/").json() == []
+        assert client.get(f"/notes/{created.json()['id']}").status_code == 404
+
+    def test_read_sees_replica_data(self, client: TestClient) -> None:
+        """Данные, «доехавшие» до реплики, видны через GET."""
+        replica_path = db.engine_router.replicas[0].url.database
+        with sqlite3.connect(replica_path) as conn:
+            conn.execute(
+                "INSERT INTO note (title, content, created_at) VALUES (?, ?, ?)",
+                ("С реплики", compression.encode_content(""), "2026-01-01 00:00:00"),
+            )
+
+        titles = [note["title"] for note in client.get("/notes/").json()]
+        assert titles == ["С реплики"]
+
+    def test_read_your_writes_window(self, make_router: Callable[..., Any]) -> None:
+        """В окне после записи чтения клиента идут на primary."""
+        make_router(replicas=1, read_your_writes_seconds=60)
+        with TestClient(app) as client:
+            created = client.post("/notes/", json={"title": "Своя запись"})
+            assert db.LAST_WRITE_COOKIE in client.cookies
+
+            response = client.get(f"/notes/{created.json()['id']}")
+            assert response.status_code == 200
+
+            # Другой клиент (без cookie) читает с реплики
+            client.cookies.clear()
+            assert client.get("/notes/").json() == []
+
+    def test_failed_write_sets_no_cookie(self, make_router: Callable[..., Any]) -> None:
+        """Неудачная запись не переводит чтения клиента на primary."""
+        make_router(replicas=1, read_your_writes_seconds=60)
+        with TestClient(app) as client:
+            assert client.post("/notes/", json={"title": ""}).status_code == 422
+            assert client.patch("/notes/999", json={"title": "x"}).status_code == 404
+            assert client.delete("/notes/999").status_code == 404
+            assert db.LAST_WRITE_COOKIE not in client.cookies
+
+            client.post("/notes/", json={"title": "Успешная запись"})
+            assert db.LAST_WRITE_COOKIE in client.cookies
+
+    def test_cookie_set_on_commit(self, make_router: Callable[..., Any]) -> None:
+        """get_session ставит cookie по COMMIT, а не при открытии сессии."""
+        make_router(replicas=1, read_your_writes_seconds=60)
+
+        async def scenario(commit: bool) -> Response:
+            response = Response()
+            sessions = db.get_session(response)
+            session = await anext(sessions)
+            if commit:
+                await session.commit()
+            await sessions.aclose()
+            return response
+
+        assert "set-cookie" not in asyncio.run(scenario(commit=False)).headers
+        cookie = asyncio.run(scenario(commit=True)).headers["set-cookie"]
+        assert cookie.startswith(db.LAST_WRITE_COOKIE)
+
+
+class TestEngineRouter:
+    """Выбор реплики: round-robin и исключение недоступных."""
+
+    def test_round_robin(self, make_router: Callable[..., Any]) -> None:
+        router = make_router(replicas=2)
+        picks = [router.for_read() for _ in range(4)]
+        assert picks == [*router.replicas, *router.replicas]
+
+    def test_unhealthy_replica_is_skipped(
+        self, make_router: Callable[..., Any]
+    ) -> None:
+        router = make_router(replicas=2)
+        router.mark_unhealthy(router.replicas[0])
+        assert {router.for_read() for _ in range(3)} == {router.replicas[1]}
+
+        router.mark_unhealthy(router.replicas[1])
+        assert router.for_read() is router.primary
+
+    def test_unhealthy_replica_returns_after_retry(
+        self, make_router: Callable[..., Any]
+    ) -> None:
+        router = make_router(replicas=1, retry_after=0)
+        router.mark_unhealthy(router.replicas[0])
+        assert router.for_read() is router.replicas[0]
+
+    def test_connect_error_marks_replica_down(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Реплика, к которой нельзя подключиться, исключается из выбора."""
+        router = db.EngineRouter(
+            f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}",
+            [f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"],
+            echo=False,
+            read_your_writes_seconds=0,
+        )
+        monkeypatch.setattr(db, "engine_router", router)
+        with TestClient(app) as client, pytest.raises(OperationalError):
+            client.get("/notes/")
+
+        assert router.healthy_replicas() == []
+        assert router.for_read() is router.primary
+
+
+# ============================================================
+# Число SQL-запросов на эндпоинт
+# ============================================================
+
+
+class TestQueryCount:
+    """Каждый эндпоинт укладывается в фиксированное число запросов."""
+
+    def test_create_is_single_insert(
+        self, client: TestClient, assert_num_queries: Callable[..., Any]
+    ) -> None:
+        with assert_num_queries(1) as statements:
+            response = client.post("/notes/", json={"title": "Одна вставка"})
+        assert response.status_code == 201
+        assert response.json()["id"] is not None
+        assert statements[0].startswith("INSERT")
+
+    def test_update_is_single_update_returning(
+        self, client: TestClient, assert_num_queries: Callable[..., Any]
+    ) -> None:
+        note_id = client.post("/notes/", json={"title": "Старый"}).json()["id"]
+
+        with assert_num_queries(1) as statements:
+            response = client.patch(f"/notes/{note_id}", json={"title": "Новый"})
+        assert response.status_code == 200
+        assert response.json()["title"] == "Новый"
+        assert "RETURNING" in statements[0]
+
+    def test_update_missing_note(
+        self, client: TestClient, assert_num_queries: Callable[..., Any]
+    ) -> None:
+        with assert_num_queries(1):
+            response = client.patch("/notes/999", json={"title": "Нет такой"})
+        assert response.status_code == 404
+
+    def test_delete_is_single_statement(
+        self, client: TestClient, assert_num_queries: Callable[..., Any]
+    ) -> None:
+        note_id = client.post("/notes/", json={"title": "Удалить"}).json()["id"]
+
+        with assert_num_queries(1):
+            assert client.delete(f"/notes/{note_id}").status_code == 204
+        with assert_num_queries(1):
+            assert client.delete(f"/notes/{note_id}").status_code == 404
+
+    def test_list_and_get(
+        self, client: TestClient, assert_num_queries: Callable[..., Any]
+    ) -> None:
+        with assert_num_queries(1):
+            client.get("/notes/")
+        with assert_num_queries(2):
+            client.get("/notes/", params={"total": "exact"})
+        with assert_num_queries(1):
+            client.get("/notes/1")
+
+
+# ============================================================
+# Сжатие содержимого и ответов
+# ============================================================
+
+
+class TestCompression:
+    """Большие заметки хранятся сжатыми и отдаются с gzip."""
+
+    def test_small_content_stored_raw(self) -> None:
+        stored = compression.encode_content("короткий текст")
+        assert stored.startswith(b"\x00")
+        assert compression.decode_content(stored) == "короткий текст"
+
+    def test_large_content_compressed_in_db(
+        self, make_router: Callable[..., Any]
+    ) -> None:
+        router = make_router(replicas=0)
+        content = "Повторяющийся абзац заметки. " * 500
+        with TestClient(app) as client:
+            note_id = client.post(
+                "/notes/", json={"title": "Большая", "content": content}
+            ).json()["id"]
+            assert client.get(f"/notes/{note_id}").json()["content"] == content
+
+        with sqlite3.connect(router.primary.url.database) as conn:
+            (stored,) = conn.execute(
+                "SELECT content FROM note WHERE id = ?", (note_id,)
+            ).fetchone()
+        assert stored.startswith(b"\x01")
+        assert len(stored) < len(content.encode()) / 10
+
+    def test_large_response_is_gzipped(self, client: TestClient) -> None:
+        content = "x" * 5000
+        response = client.post(
+            "/notes/",
+            json={"title": "gzip", "content": content},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["content"] == content
+
+
+# ============================================================
+# Строгий разбор тела POST /notes
+# ============================================================
+
+
+class TestStrictBody:
+    """POST /notes валидирует сырые байты через model_validate_json(strict=True)."""
+
+    def test_wrong_type_is_422_with_body_loc(self, client: TestClient) -> None:
+        response = client.post("/notes/", json={"title": 123})
+        assert response.status_code == 422
+        error = response.json()["detail"][0]
+        assert error["loc"] == ["body", "title"]
+        assert error["type"] == "string_type"
+
+    def test_invalid_json_is_422(self, client: TestClient) -> None:
+        response = client.post(
+            "/notes/", content=b"{title", headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["type"] == "json_invalid"
+
+    def test_request_body_in_openapi(self, client: TestClient) -> None:
+        operation = client.get("/openapi.json").json()["paths"]["/notes/"]["post"]
+        schema = operation["requestBody"]["content"]["application/json"]["schema"]
+        assert schema["required"] == ["title"]
+
+    @pytest.mark.parametrize("module", [body, tasks_docs], ids=["s10", "s09"])
+    def test_strict_body_rejects_coercion(self, module: Any) -> None:
+        """Обе копии strict_json_body: без приведения типов, loc от "body"."""
+
+        class Counter(BaseModel):
+            count: int
+
+        counters = FastAPI()
+
+        @counters.post("/counters")
+        async def create(
+            counter: Annotated[Counter, Depends(module.strict_json_body(Counter))],
+        ) -> Counter:
+            return counter
+
+        with TestClient(counters) as client:
+            assert client.post("/counters", json={"count": 1}).json() == {"count": 1}
+            response = client.post("/counters", json={"count": "1"})
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", "count"]
+
+    @pytest.mark.parametrize("module", [body, tasks_docs], ids=["s10", "s09"])
+    def test_nested_model_schema_rejected(self, module: Any) -> None:
+        """Вложенная модель дала бы в requestBody ссылку на несуществующий $defs."""
+
+        class Tag(BaseModel):
+            name: str
+
+        class Tagged(BaseModel):
+            tags: list[Tag]
+
+        with pytest.raises(ValueError, match="Tag"):
+            module.json_body_schema(Tagged)
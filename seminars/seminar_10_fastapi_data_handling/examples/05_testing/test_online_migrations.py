@@ -0,0 +1,190 @@
+"""Тесты онлайн-миграций из 04_alembic_demo/online_migrations.py на SQLite.
+
+Функции вызываются так же, как из ревизии: внутри MigrationContext
+и Operations.context (это и есть `op` в файлах versions/).
+
+Запуск:
+    pytest seminars/seminar_10_fastapi_data_handling/examples/05_testing/test_online_migrations.py -v
+"""
+
+import importlib
+import os
+import subprocess
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy.engine import Connection, Engine
+
+online = importlib.import_module(
+    "seminars.seminar_10_fastapi_data_handling.examples.04_alembic_demo.online_migrations"
+)
+
+DEMO_DIR = Path(online.__file__).resolve().parent
+ROWS = 10
+BATCH = 3
+NAME = "0099_bump_item_value"
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Iterator[Engine]:
+    """SQLite-файл с таблицей item(id, value): ROWS строк, value = 0."""
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    with engine.begin() as conn:
+        conn.execute(sa.text("CREATE TABLE item (id INTEGER PRIMARY KEY, value INT)"))
+        conn.execute(
+            sa.text("INSERT INTO item (id, value) VALUES (:id, 0)"),
+            [{"id": i} for i in range(1, ROWS + 1)],
+        )
+    yield engine
+    engine.dispose()
+
+
+@contextmanager
+def revision(engine: Engine) -> Iterator[None]:
+    """Окружение ревизии: транзакция миграции и `op`, как в alembic upgrade.
+
+    transactional_ddl=True — как на PostgreSQL: ревизия выполняется
+    в транзакции, которая фиксируется при выходе из блока.
+    """
+    with engine.connect() as conn:
+        context = MigrationContext.configure(conn, opts={"transactional_ddl": True})
+        with context.begin_transaction(), Operations.context(context):
+            yield
+
+
+def _values(engine: Engine) -> list[int]:
+    with engine.connect() as conn:
+        return list(
+            conn.execute(sa.text("SELECT value FROM item ORDER BY id")).scalars()
+        )
+
+
+def _progress(engine: Engine) -> sa.Row | None:
+    with engine.connect() as conn:
+        return conn.execute(
+            sa.select(online.progress_table).where(online.progress_table.c.name == NAME)
+        ).first()
+
+
+def _bump(conn: Connection, lower: int, upper: int) -> int:
+    return conn.execute(
+        sa.text("UPDATE item SET value = value + 1 WHERE id > :lower AND id <= :upper"),
+        {"lower": lower, "upper": upper},
+    ).rowcount
+
+
+class TestBackfillInBatches:
+    """Порции с COMMIT, прогресс в data_migration_progress, продолжение после сбоя."""
+
+    def test_processes_every_row_once(self, engine: Engine) -> None:
+        with revision(engine):
+            done = online.backfill_in_batches(NAME, "item", _bump, batch_size=BATCH)
+
+        assert done == ROWS
+        assert _values(engine) == [1] * ROWS
+        progress = _progress(engine)
+        assert progress is not None
+        assert progress.finished
+        assert progress.last_pk == ROWS
+
+    def test_resume_after_failure(self, engine: Engine) -> None:
+        """Сбой на второй порции: первая зафиксирована, повтор начинает со второй."""
+        calls = 0
+
+        def failing(conn: Connection, lower: int, upper: int) -> int:
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                raise RuntimeError("обрыв соединения")
+            return _bump(conn, lower, upper)
+
+        with pytest.raises(RuntimeError), revision(engine):
+            online.backfill_in_batches(NAME, "item", failing, batch_size=BATCH)
+
+        assert _values(engine) == [1] * BATCH + [0] * (ROWS - BATCH)
+        progress = _progress(engine)
+        assert progress is not None
+        assert (progress.last_pk, progress.rows_done, progress.finished) == (
+            BATCH,
+            BATCH,
+            False,
+        )
+
+        with revision(engine):
+            done = online.backfill_in_batches(NAME, "item", _bump, batch_size=BATCH)
+        assert done == ROWS
+        assert _values(engine) == [1] * ROWS  # ни одна порция не применена дважды
+
+    def test_finished_backfill_is_skipped(self, engine: Engine) -> None:
+        with revision(engine):
+            online.backfill_in_batches(NAME, "item", _bump, batch_size=BATCH)
+        with revision(engine):
+            done = online.backfill_in_batches(NAME, "item", _bump, batch_size=BATCH)
+
+        assert done == ROWS
+        assert _values(engine) == [1] * ROWS
+
+    def test_sql_chunk(self, engine: Engine) -> None:
+        """chunk как SQL с :lower / :upper."""
+        with revision(engine):
+            online.backfill_in_batches(
+                NAME,
+                "item",
+                "UPDATE item SET value = 7 WHERE id > :lower AND id <= :upper",
+                batch_size=BATCH,
+            )
+        assert _values(engine) == [7] * ROWS
+
+
+class TestForgetBackfill:
+    """forget_backfill удаляет прогресс вместе с коммитом ревизии."""
+
+    def test_forget_allows_rerun(self, engine: Engine) -> None:
+        with revision(engine):
+            online.backfill_in_batches(NAME, "item", _bump, batch_size=BATCH)
+            online.forget_backfill(NAME)
+        assert _progress(engine) is None
+
+        # После downgrade и повторного upgrade backfill выполняется заново
+        with revision(engine):
+            done = online.backfill_in_batches(NAME, "item", _bump, batch_size=BATCH)
+        assert done == ROWS
+        assert _values(engine) == [2] * ROWS
+
+    def test_forget_without_progress_table(self, engine: Engine) -> None:
+        with revision(engine):
+            online.forget_backfill(NAME)
+        assert not sa.inspect(engine).has_table(online.PROGRESS_TABLE)
+
+
+class TestOfflineSql:
+    """alembic --sql: SQL всех ревизий без соединения с БД."""
+
+    @pytest.mark.parametrize("revisions", ["head", "0003:0002"])
+    def test_render_sql(self, revisions: str, tmp_path: Path) -> None:
+        """0003 на SQLite: batch_alter_table без рефлексии (copy_from).
+
+        Отдельный процесс: модели 04_alembic_demo объявляют ту же таблицу
+        note, что и уже импортированный 02_async_db.
+        """
+        action = "downgrade" if ":" in revisions else "upgrade"
+        result = subprocess.run(
+            [sys.executable, "-m", "alembic", action, revisions, "--sql"],
+            cwd=DEMO_DIR,
+            env={
+                **os.environ,
+                "DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'unused.db'}",
+            },
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        assert "CREATE TABLE _alembic_tmp_note" in result.stdout
+        assert "CREATE INDEX ix_note_created_at_id ON note" in result.stdout
+        assert not (tmp_path / "unused.db").exists()
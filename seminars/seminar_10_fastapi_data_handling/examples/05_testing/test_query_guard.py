@@ -0,0 +1,123 @@
+"""Тесты instrument_session из 04_alembic_demo/db.py: счётчик запросов
+и защита от SELECT без LIMIT.
+
+Модели 04_alembic_demo объявляют ту же таблицу note, что и 02_async_db,
+поэтому здесь — своя таблица в отдельном MetaData на SQLite-файле.
+
+Запуск:
+    pytest seminars/seminar_10_fastapi_data_handling/examples/05_testing/test_query_guard.py -v
+"""
+
+import asyncio
+import importlib
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+demo_db = importlib.import_module(
+    "seminars.seminar_10_fastapi_data_handling.examples.04_alembic_demo.db"
+)
+
+MAX_ROWS = 3
+item = Table("item", MetaData(), Column("id", Integer, primary_key=True))
+
+Scenario = Callable[[AsyncSession], Awaitable[Any]]
+
+
+@pytest.fixture
+def run_instrumented(tmp_path: Path) -> Callable[[int, Scenario], tuple[Any, Any]]:
+    """Выполнить сценарий в инструментированной сессии над rows строками item.
+
+    Возвращает (результат сценария, QueryStats).
+    """
+
+    def runner(rows: int, scenario: Scenario) -> tuple[Any, Any]:
+        async def main() -> tuple[Any, Any]:
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'q.db'}")
+            async with engine.begin() as conn:
+                await conn.run_sync(item.metadata.create_all)
+                await conn.execute(item.insert(), [{"id": i} for i in range(rows)])
+            try:
+                async with AsyncSession(engine) as session:
+                    stats = demo_db.instrument_session(session, MAX_ROWS)
+                    return await scenario(session), stats
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return runner
+
+
+async def _all_ids(session: AsyncSession, statement: Any) -> list[int]:
+    result = await session.execute(statement)
+    return [row[0] for row in result]
+
+
+class TestUnboundedGuard:
+    """SELECT без LIMIT больше MAX_ROWS строк — ошибка, остальное проходит."""
+
+    def test_unbounded_select_over_limit_raises(
+        self, run_instrumented: Callable[..., tuple[Any, Any]]
+    ) -> None:
+        with pytest.raises(demo_db.UnboundedQueryError):
+            run_instrumented(MAX_ROWS + 2, lambda s: _all_ids(s, select(item.c.id)))
+
+    def test_unbounded_select_within_limit_passes(
+        self, run_instrumented: Callable[..., tuple[Any, Any]]
+    ) -> None:
+        ids, stats = run_instrumented(
+            MAX_ROWS, lambda s: _all_ids(s, select(item.c.id).order_by(item.c.id))
+        )
+        assert ids == list(range(MAX_ROWS))
+        assert stats.count == 1
+
+    def test_explicit_limit_passes(
+        self, run_instrumented: Callable[..., tuple[Any, Any]]
+    ) -> None:
+        ids, _ = run_instrumented(
+            10, lambda s: _all_ids(s, select(item.c.id).order_by(item.c.id).limit(5))
+        )
+        assert ids == list(range(5))
+
+    def test_textual_select_passes(
+        self, run_instrumented: Callable[..., tuple[Any, Any]]
+    ) -> None:
+        """text(...).columns(...) нельзя дополнить LIMIT — выполняется как есть."""
+        statement = text("SELECT id FROM item ORDER BY id").columns(column("id"))
+        ids, stats = run_instrumented(10, lambda s: _all_ids(s, statement))
+        assert ids == list(range(10))
+        assert stats.count == 1
+
+    def test_streaming_select_passes(
+        self, run_instrumented: Callable[..., tuple[Any, Any]]
+    ) -> None:
+        """yield_per — потоковая выгрузка, LIMIT не добавляется."""
+
+        async def scenario(session: AsyncSession) -> list[int]:
+            statement = select(item.c.id).execution_options(yield_per=2)
+            result = await session.stream(statement)
+            return [row[0] async for row in result]
+
+        ids, _ = run_instrumented(10, scenario)
+        assert sorted(ids) == list(range(10))
+
+
+class TestQueryStats:
+    """QueryStats считает каждый выполненный запрос сессии."""
+
+    def test_counts_every_statement(
+        self, run_instrumented: Callable[..., tuple[Any, Any]]
+    ) -> None:
+        async def scenario(session: AsyncSession) -> None:
+            await session.execute(select(item.c.id).limit(1))
+            await session.execute(item.delete().where(item.c.id == 0))
+            await session.execute(text("SELECT count(*) FROM item"))
+
+        _, stats = run_instrumented(2, scenario)
+        assert stats.count == 3
+        assert stats.seconds > 0
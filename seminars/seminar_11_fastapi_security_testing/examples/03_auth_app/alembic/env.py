@@ -0,0 +1,76 @@
+"""
+Alembic env.py для auth-приложения (async engine: aiosqlite / asyncpg).
+
+Метаданные — таблицы из sql_storage.py.
+"""
+
+import asyncio
+import importlib
+import os
+import sys
+from logging.config import fileConfig
+from pathlib import Path
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import async_engine_from_config
+
+# ============================================================
+# Импорт метаданных
+# ============================================================
+# sql_storage.py использует относительные импорты, поэтому загружаем его
+# как часть пакета seminars (корень репозитория — в sys.path).
+# Путь: <корень>/seminars/seminar_11_.../examples/03_auth_app/alembic/env.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[5]))
+_sql_storage = importlib.import_module(
+    "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.sql_storage"
+)
+target_metadata = _sql_storage.metadata
+
+# ============================================================
+# Конфигурация Alembic
+# ============================================================
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./auth.db")
+config.set_main_option("sqlalchemy.url", DATABASE_URL)
+
+
+def run_migrations_offline() -> None:
+    """Offline-режим: alembic upgrade head --sql > users.sql"""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    """Выполнить миграции в контексте синхронного соединения."""
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    """Создать async engine и выполнить миграции."""
+    connectable = async_engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_async_migrations())
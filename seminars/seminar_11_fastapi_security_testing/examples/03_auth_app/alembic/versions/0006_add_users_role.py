@@ -0,0 +1,32 @@
+"""add users.role
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: str | None = "0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # server_default: существующие пользователи получают роль user
+    op.add_column(
+        "users",
+        sa.Column("role", sa.String(length=20), server_default="user", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    # batch: SQLite не умеет DROP COLUMN в старых версиях
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("role")
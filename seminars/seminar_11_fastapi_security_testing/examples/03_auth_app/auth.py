@@ -1,16 +1,32 @@
 """Логика аутентификации: хеширование паролей + JWT токены.
 
 Этот модуль — "сердце" системы безопасности:
-- hash_password / verify_password — работа с bcrypt
+- hash_password / verify_password — работа с bcrypt (схемы и стоимость —
+  см. passwords.py)
 - create_access_token / decode_access_token — работа с JWT
+- key_ring — ключи подписи (HS256 по умолчанию, RS256/ES256 — см. keys.py)
+- TokenClaims — sub, exp, jti (идентификатор токена для отзыва),
+  sid (сессия refresh tokens) и scopes (битовая маска, см. scopes.py)
+- TokenCache — LRU-кеш декодированных токенов для get_current_user
 """
 
+import hashlib
 import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
 from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
 
-from jose import JWTError, jwt
+from jose import JWTError
 from passlib.context import CryptContext
 
+from .keys import load_key_ring  # type: ignore[import]
+from .passwords import build_crypt_context  # type: ignore[import]
+from .scopes import parse_scope_claim  # type: ignore[import]
+
 # ============================================================
 # Конфигурация
 # ============================================================
@@ -21,14 +37,22 @@ SECRET_KEY = os.getenv(
     "SECRET_KEY",
     "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7",
 )
-ALGORITHM = "HS256"
+# HS256 — общий секрет; RS256/ES256 — пара ключей и JWKS (см. keys.py)
+ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Сколько декодированных токенов держать в памяти (0 — без кеша)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+# Ключи разбираются один раз при импорте, а не на каждый запрос
+key_ring = load_key_ring(ALGORITHM, SECRET_KEY)
 
 # ============================================================
 # Хеширование паролей (passlib + bcrypt)
 # ============================================================
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Схемы и стоимость — из PASSWORD_SCHEMES / PASSWORD_PROFILE (passwords.py);
+# по умолчанию bcrypt с production-стоимостью
+pwd_context: CryptContext = build_crypt_context()
 
 
 def hash_password(plain_password: str) -> str:
@@ -67,8 +91,12 @@ def create_access_token(
 ) -> str:
     """Создать подписанный JWT access token.
 
+    Каждый токен получает уникальный jti (JWT ID) — по нему токен
+    можно отозвать до истечения exp (см. revocation.py).
+
     Args:
-        data: payload данные (обычно {"sub": username})
+        data: payload данные (обычно {"sub": username, "scope": "..."});
+            без "scope" токен не проходит ни одну проверку RequireScopes
         expires_delta: время жизни; по умолчанию ACCESS_TOKEN_EXPIRE_MINUTES
 
     Returns:
@@ -79,7 +107,8 @@ def create_access_token(
         expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     to_encode["exp"] = expire
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.setdefault("jti", secrets.token_urlsafe(16))
+    return key_ring.sign(to_encode)
 
 
 def decode_access_token(token: str) -> str | None:
@@ -92,9 +121,118 @@ def decode_access_token(token: str) -> str | None:
         username из токена, или None если токен невалиден
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = key_ring.verify(token)
         username: str | None = payload.get("sub")
         return username
     except JWTError:
         # Включает ExpiredSignatureError — истёкший токен тоже невалиден
         return None
+
+
+class TokenClaims(NamedTuple):
+    """Проверенные claims access token."""
+
+    sub: str
+    exp: float  # Unix-время
+    jti: str | None  # None — токен выпущен без идентификатора
+    sid: str | None = None  # сессия refresh tokens (см. refresh.py)
+    scopes: int = 0  # маска claim "scope" (см. scopes.py)
+
+
+def decode_access_token_claims(token: str) -> TokenClaims | None:
+    """Декодировать JWT и вернуть его claims (sub, exp, jti, sid, scopes).
+
+    Claim "scope" разбирается в маску здесь — один раз на токен: дальше
+    claims берутся из TokenCache.
+
+    Returns:
+        TokenClaims или None, если токен невалиден, истёк или без sub/exp
+    """
+    try:
+        payload = key_ring.verify(token)
+    except JWTError:
+        return None
+    username = payload.get("sub")
+    exp = payload.get("exp")
+    if username is None or exp is None:
+        return None
+    return TokenClaims(
+        username,
+        float(exp),
+        payload.get("jti"),
+        payload.get("sid"),
+        parse_scope_claim(payload.get("scope")),
+    )
+
+
+# ============================================================
+# Кеш декодированных токенов
+# ============================================================
+
+
+class TokenCache:
+    """LRU-кеш: sha256(токен) → TokenClaims.
+
+    Клиент шлёт один и тот же токен с каждым запросом, а проверка подписи
+    и разбор JSON в python-jose повторяются каждый раз. Кеш хранит
+    только успешно декодированные токены и удаляет запись, как только
+    наступил exp, — истёкший токен снова проходит полную проверку
+    (и отклоняется). Ключ — хеш токена: сами токены в памяти не лежат.
+
+    Безопасен для вызова из нескольких потоков (sync-эндпоинты).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = TOKEN_CACHE_SIZE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries: OrderedDict[bytes, TokenClaims] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def decode(self, token: str) -> str | None:
+        """Вернуть username из токена (из кеша или после полной проверки)."""
+        claims = self.claims(token)
+        return claims.sub if claims is not None else None
+
+    def claims(self, token: str) -> TokenClaims | None:
+        """Вернуть claims токена (из кеша или после полной проверки)."""
+        key = hashlib.sha256(token.encode()).digest()
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.exp > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                del self._entries[key]  # истёк — вытесняем
+            self.misses += 1
+
+        # Проверка подписи и exp — вне блокировки: другие потоки не ждут
+        claims = decode_access_token_claims(token)
+        if claims is None:
+            return None
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = claims
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return claims
+
+    def clear(self) -> None:
+        """Очистить кеш (например, после смены SECRET_KEY)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Кеш приложения; в эндпоинтах — через dependencies.get_token_cache
+token_cache = TokenCache()
@@ -3,15 +3,44 @@
 Паттерн Dependency Injection:
     get_current_user — зависимость, которая проверяет Bearer токен
     и возвращает текущего пользователя (или 401 если токен невалиден).
+    RequireScopes("items:read") — проверка прав токена (или 403).
+    get_user_repository / get_item_repository / get_password_hasher /
+    get_token_cache / get_revocation_list / get_login_rate_limiter /
+    get_refresh_tokens — хранилища, хешер паролей, кеш токенов, список
+    отозванных токенов, лимитер попыток логина и refresh tokens
+    (в тестах и бенчмарках подменяются через app.dependency_overrides).
 """
 
-from typing import Annotated
+import os
+from typing import TYPE_CHECKING, Annotated
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
-from .auth import decode_access_token  # type: ignore[import]
+from .auth import TokenCache, TokenClaims, token_cache  # type: ignore[import]
+from .hashing import PasswordHasher, password_hasher  # type: ignore[import]
 from .models import UserInDB  # type: ignore[import]
+from .ratelimit import (  # type: ignore[import]
+    InMemoryRateLimitBackend,
+    LoginRateLimiter,
+    RateLimitBackend,
+)
+from .refresh import RefreshTokenService  # type: ignore[import]
+from .repository import (  # type: ignore[import]
+    InMemoryItemRepository,
+    InMemoryRefreshTokenStore,
+    InMemoryRevocationStore,
+    InMemoryUserRepository,
+    ItemRepository,
+    RefreshTokenStore,
+    RevocationStore,
+    UserRepository,
+)
+from .revocation import RevocationList, session_key  # type: ignore[import]
+from .scopes import scope_mask  # type: ignore[import]
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
 
 # ============================================================
 # OAuth2PasswordBearer — схема безопасности
@@ -24,37 +53,201 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
 # ============================================================
-# "База данных" пользователей (in-memory для демонстрации)
+# "База данных" пользователей и элементов (in-memory для демонстрации)
 # ============================================================
 
-# В production: заменить на реальную БД (PostgreSQL + SQLModel/SQLAlchemy)
 # Структура: {username: UserInDB}
 fake_users_db: dict[str, UserInDB] = {}
 
+# Элементы: начальные данные для in-memory режима
+fake_items_db: list[dict] = [
+    {"id": 1, "title": "Секретный документ #1", "owner": "alice"},
+    {"id": 2, "title": "Секретный документ #2", "owner": "alice"},
+    {"id": 3, "title": "Личные заметки", "owner": "bob"},
+]
+
+# В production: DATABASE_URL → SQL-хранилища (общие для всех воркеров,
+# переживают перезапуск). Без него — данные выше (см. repository.py).
+DATABASE_URL = os.getenv("DATABASE_URL")
+engine: "AsyncEngine | None" = None
+user_repository: UserRepository
+item_repository: ItemRepository
+revocation_store: RevocationStore
+# С DATABASE_URL лимиты общие для всех воркеров: иначе каждый воркер
+# пропускал бы свой burst и лимит рос бы с числом воркеров
+rate_limit_backend: RateLimitBackend
+refresh_token_store: RefreshTokenStore
+
+if DATABASE_URL:
+    # sqlalchemy — самый долгий импорт приложения: без DATABASE_URL
+    # он не нужен, поэтому SQL-хранилища загружаются только здесь
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from . import sql_storage  # type: ignore[import]
+
+    engine = create_async_engine(DATABASE_URL)
+    user_repository = sql_storage.SqlUserRepository(engine)
+    item_repository = sql_storage.SqlItemRepository(engine)
+    revocation_store = sql_storage.SqlRevocationStore(engine)
+    rate_limit_backend = sql_storage.SqlRateLimitBackend(engine)
+    refresh_token_store = sql_storage.SqlRefreshTokenStore(engine)
+else:
+    user_repository = InMemoryUserRepository(fake_users_db)
+    item_repository = InMemoryItemRepository(fake_items_db)
+    revocation_store = InMemoryRevocationStore()
+    rate_limit_backend = InMemoryRateLimitBackend()
+    refresh_token_store = InMemoryRefreshTokenStore()
+
+revocation_list = RevocationList(revocation_store)
+login_rate_limiter = LoginRateLimiter(rate_limit_backend)
+refresh_tokens = RefreshTokenService(refresh_token_store, revocations=revocation_list)
+
+
+def get_user_repository() -> UserRepository:
+    """Зависимость: хранилище пользователей приложения."""
+    return user_repository
+
+
+UserRepositoryDep = Annotated[UserRepository, Depends(get_user_repository)]
+
+
+def get_item_repository() -> ItemRepository:
+    """Зависимость: хранилище элементов приложения."""
+    return item_repository
+
+
+ItemRepositoryDep = Annotated[ItemRepository, Depends(get_item_repository)]
+
+
+# ============================================================
+# Dependency: get_password_hasher
+# ============================================================
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Зависимость: хешер паролей приложения (пул процессов bcrypt)."""
+    return password_hasher
+
+
+PasswordHasherDep = Annotated[PasswordHasher, Depends(get_password_hasher)]
+
+
+# ============================================================
+# Dependency: get_token_cache
+# ============================================================
+
+
+def get_token_cache() -> TokenCache:
+    """Зависимость: кеш декодированных JWT (общий для всех запросов)."""
+    return token_cache
+
+
+TokenCacheDep = Annotated[TokenCache, Depends(get_token_cache)]
+
+
+# ============================================================
+# Dependency: get_revocation_list
+# ============================================================
+
+
+def get_revocation_list() -> RevocationList:
+    """Зависимость: отозванные токены (фильтр Блума + хранилище)."""
+    return revocation_list
+
+
+RevocationListDep = Annotated[RevocationList, Depends(get_revocation_list)]
+
+
+# ============================================================
+# Dependency: get_login_rate_limiter
+# ============================================================
+
+
+def get_login_rate_limiter() -> LoginRateLimiter:
+    """Зависимость: лимитер попыток логина (token bucket + окно неудач)."""
+    return login_rate_limiter
+
+
+LoginRateLimiterDep = Annotated[LoginRateLimiter, Depends(get_login_rate_limiter)]
+
+
+# ============================================================
+# Dependency: get_refresh_tokens
+# ============================================================
+
+
+def get_refresh_tokens() -> RefreshTokenService:
+    """Зависимость: выдача и ротация refresh tokens."""
+    return refresh_tokens
+
+
+RefreshTokensDep = Annotated[RefreshTokenService, Depends(get_refresh_tokens)]
+
 
 # ============================================================
 # Dependency: get_current_user
 # ============================================================
 
 
-async def get_current_user(
+async def get_token_claims(
     token: Annotated[str, Depends(oauth2_scheme)],
+    cache: TokenCacheDep,
+    revocations: RevocationListDep,
+) -> TokenClaims:
+    """Зависимость: проверенные claims токена (подпись, exp, отзыв).
+
+    Args:
+        token: JWT токен из Authorization заголовка
+        cache: кеш декодированных токенов (повторный токен — без проверки
+            подписи, пока не наступил exp)
+        revocations: отозванные токены и сессии; для неотозванных jti
+            и sid хватает фильтра Блума, хранилище не запрашивается
+
+    Raises:
+        HTTPException 401: токен истёк, невалиден или отозван
+    """
+    claims = cache.claims(token)
+    # Токен без jti отозвать нельзя — он действует до exp
+    if (
+        claims is None
+        or (claims.jti is not None and await revocations.is_revoked(claims.jti))
+        # Сессия отозвана целиком (refresh token переиспользован)
+        or (
+            claims.sid is not None
+            and await revocations.is_revoked(session_key(claims.sid))
+        )
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return claims
+
+
+TokenClaimsDep = Annotated[TokenClaims, Depends(get_token_claims)]
+
+
+async def get_current_user(
+    claims: TokenClaimsDep,
+    users: UserRepositoryDep,
 ) -> UserInDB:
     """Зависимость: извлечь и валидировать текущего пользователя из токена.
 
     FastAPI автоматически:
     1. Читает заголовок Authorization: Bearer <token>
-    2. Передаёт токен в эту функцию
+    2. Проверяет токен в get_token_claims (подпись, exp, отзыв)
     3. Если функция выбрасывает HTTPException — возвращает 401
 
     Args:
-        token: JWT токен из Authorization заголовка
+        claims: проверенные claims токена
+        users: хранилище пользователей
 
     Returns:
         UserInDB — аутентифицированный пользователь
 
     Raises:
-        HTTPException 401: токен отсутствует, истёк или невалиден
+        HTTPException 401: токен отсутствует, истёк, невалиден или отозван
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -62,13 +255,8 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    # Декодируем токен → получаем username
-    username = decode_access_token(token)
-    if username is None:
-        raise credentials_exception
-
-    # Ищем пользователя в "БД"
-    user = fake_users_db.get(username)
+    # Ищем пользователя в "БД" по username из токена
+    user = await users.get(claims.sub)
     if user is None:
         raise credentials_exception
 
@@ -77,3 +265,39 @@ async def get_current_user(
 
 # Удобный тип-алиас для использования в эндпоинтах
 CurrentUser = Annotated[UserInDB, Depends(get_current_user)]
+
+
+# ============================================================
+# Dependency: RequireScopes
+# ============================================================
+
+
+class RequireScopes:
+    """Зависимость-фабрика: токен должен содержать все указанные scopes.
+
+    Маска требуемых scopes считается в __init__ — при объявлении маршрута,
+    то есть при импорте приложения. На запросе остаётся одно сравнение
+    масок: claim "scope" уже разобран в TokenClaims.scopes.
+
+    Пример:
+        @router.get("/items", dependencies=[Depends(RequireScopes("items:read"))])
+
+    Raises:
+        ValueError: неизвестный scope (при создании)
+        HTTPException 403: у токена нет нужных scopes
+    """
+
+    def __init__(self, *scopes: str) -> None:
+        self.scopes = frozenset(scopes)
+        self.mask = scope_mask(self.scopes)
+        # Заголовок ответа 403 тоже не меняется — собираем один раз
+        self._challenge = f'Bearer scope="{" ".join(sorted(self.scopes))}"'
+
+    async def __call__(self, claims: TokenClaimsDep) -> TokenClaims:
+        if claims.scopes & self.mask != self.mask:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions",
+                headers={"WWW-Authenticate": self._challenge},
+            )
+        return claims
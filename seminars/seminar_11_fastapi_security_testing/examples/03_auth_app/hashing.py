@@ -0,0 +1,205 @@
+"""Хеширование паролей вне event loop: пул процессов + admission control.
+
+bcrypt намеренно медленный (~250 мс на проверку). Вызов в sync-эндпоинте
+занимает поток общего threadpool FastAPI (40 потоков на ВСЕ sync-эндпоинты
+и зависимости), а при всплеске логинов очередь растёт без ограничений.
+
+Этот модуль:
+- выполняет bcrypt в отдельном ограниченном ProcessPoolExecutor
+  (HASH_WORKERS процессов — столько хешей считается одновременно)
+- ограничивает число запросов в работе и в очереди (HASH_QUEUE_LIMIT);
+  сверх лимита — HasherOverloadedError → 503 + Retry-After
+- кеширует УСПЕШНЫЕ проверки пароля на VERIFY_CACHE_TTL секунд:
+  повторный логин тем же паролем не считает bcrypt заново
+- verify_and_update — проверка + новый хеш, если старый устарел
+  (другая схема или стоимость, см. passwords.py)
+
+Использование в эндпоинтах — через зависимость PasswordHasherDep
+(см. dependencies.py), чтобы в тестах подменять хешер.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import BrokenExecutor, Executor
+from typing import Any, TypeVar
+
+from .auth import pwd_context  # type: ignore[import]
+from .passwords import verify_and_update  # type: ignore[import]
+
+T = TypeVar("T")
+
+# ============================================================
+# Конфигурация
+# ============================================================
+
+# Процессов для bcrypt; 0 — считать в threadpool event loop (без пула)
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Максимум запросов хеширования одновременно (в работе + в очереди пула)
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", str(max(HASH_WORKERS, 1) * 8)))
+# Сколько секунд помнить успешную проверку пароля (0 — не кешировать)
+VERIFY_CACHE_TTL = float(os.getenv("VERIFY_CACHE_TTL", "60"))
+VERIFY_CACHE_SIZE = 10_000
+
+
+class HasherOverloadedError(RuntimeError):
+    """Очередь хеширования заполнена — запрос нужно отклонить (503)."""
+
+
+# ============================================================
+# Функции, выполняемые в процессах пула
+# ============================================================
+# Должны быть функциями верхнего уровня модуля: пул передаёт их
+# в дочерний процесс через pickle (по имени модуля и функции).
+
+
+def _hash_in_worker(plain_password: str) -> str:
+    return pwd_context.hash(plain_password)
+
+
+def _verify_and_update_in_worker(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return verify_and_update(pwd_context, plain_password, hashed_password)
+
+
+# ============================================================
+# PasswordHasher
+# ============================================================
+
+
+class PasswordHasher:
+    """Асинхронное хеширование и проверка паролей с ограничением нагрузки.
+
+    Все методы вызываются из event loop: счётчик запросов и кеш
+    меняются только в нём, поэтому блокировки не нужны.
+    """
+
+    def __init__(
+        self,
+        workers: int = HASH_WORKERS,
+        queue_limit: int = HASH_QUEUE_LIMIT,
+        cache_ttl: float = VERIFY_CACHE_TTL,
+        cache_size: int = VERIFY_CACHE_SIZE,
+    ) -> None:
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.stats = {
+            "hashed": 0,
+            "verified": 0,
+            "cache_hits": 0,
+            "rehashed": 0,
+            "rejected": 0,
+        }
+        self._executor: Executor | None = None
+        self._in_flight = 0
+        # Ключ кеша — HMAC(пароль + хеш) с секретом процесса:
+        # пароли в открытом виде в памяти не хранятся
+        self._cache: OrderedDict[bytes, float] = OrderedDict()
+        self._cache_secret = secrets.token_bytes(32)
+
+    def _get_executor(self) -> Executor | None:
+        """Пул процессов (создаётся при первом вызове); None — threadpool.
+
+        multiprocessing импортируется здесь же, при первом хешировании,
+        а не при старте воркера: до первого логина пул не нужен.
+        """
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn: безопасно в процессе с потоками (uvicorn, TestClient)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Выполнить fn в пуле, если есть место в очереди.
+
+        Raises:
+            HasherOverloadedError: уже queue_limit запросов в работе
+        """
+        if self._in_flight >= self.queue_limit:
+            self.stats["rejected"] += 1
+            raise HasherOverloadedError("password hashing queue is full")
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        except BrokenExecutor:  # BrokenProcessPool — без импорта multiprocessing
+            # Процесс пула упал — следующий запрос создаст новый пул
+            self._executor = None
+            raise
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, plain_password: str) -> str:
+        """Захешировать пароль с bcrypt (в пуле процессов)."""
+        hashed = await self._run(_hash_in_worker, plain_password)
+        self.stats["hashed"] += 1
+        return hashed
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Проверить пароль против bcrypt хеша (с кешем успешных проверок)."""
+        ok, _ = await self.verify_and_update(plain_password, hashed_password)
+        return ok
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """Проверить пароль; если хеш устарел — вернуть и новый хеш.
+
+        Ключ кеша включает хеш: после смены пароля старая запись не совпадёт.
+
+        Returns:
+            (пароль верный, новый хеш для сохранения или None)
+        """
+        key = self._cache_key(plain_password, hashed_password)
+        now = time.monotonic()
+        expires = self._cache.get(key)
+        if expires is not None and expires > now:
+            self.stats["cache_hits"] += 1
+            return True, None
+
+        ok, new_hash = await self._run(
+            _verify_and_update_in_worker, plain_password, hashed_password
+        )
+        self.stats["verified"] += 1
+        if new_hash is not None:
+            self.stats["rehashed"] += 1
+            # Следующий логин придёт уже с новым хешем
+            key = self._cache_key(plain_password, new_hash)
+        if ok and self.cache_ttl > 0:
+            self._cache[key] = now + self.cache_ttl
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return ok, new_hash
+
+    def _cache_key(self, plain_password: str, hashed_password: str) -> bytes:
+        return hmac.new(
+            self._cache_secret,
+            f"{hashed_password}\0{plain_password}".encode(),
+            hashlib.sha256,
+        ).digest()
+
+    def shutdown(self) -> None:
+        """Остановить пул процессов (при завершении приложения)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+# Хешер приложения; в эндпоинтах — через dependencies.get_password_hasher
+password_hasher = PasswordHasher()
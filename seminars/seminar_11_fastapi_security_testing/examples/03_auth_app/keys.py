@@ -0,0 +1,202 @@
+"""Ключи подписи JWT: HS256 (общий секрет) или RS256/ES256 (пара ключей).
+
+С HS256 любой сервис, который проверяет токены, должен знать SECRET_KEY —
+а значит, может и выпускать их. С асимметричной подписью токены
+подписывает только auth-сервис (приватный ключ), остальные проверяют
+их публичным ключом из /.well-known/jwks.json.
+
+Содержит:
+- KeyRing — ключ подписи + все ключи проверки по kid; ключи разобраны
+  один раз при загрузке (PEM не парсится на каждый запрос), JWKS
+  сериализован заранее
+- load_key_ring — ключи для алгоритма (переменные окружения
+  JWT_KEYS_DIR, JWT_ACTIVE_KID)
+- generate_key_file — новый приватный ключ в JWT_KEYS_DIR (ротация)
+
+Ротация ключей:
+    1. python -m seminars....03_auth_app.keys generate --dir keys/
+       (новый <kid>.pem рядом со старыми)
+    2. Перезапустить приложение: подписывает новый ключ (последний по
+       имени или JWT_ACTIVE_KID), старые остаются в JWKS и проверяют
+       ранее выданные токены
+    3. Через ACCESS_TOKEN_EXPIRE_MINUTES удалить старый файл
+
+EdDSA (Ed25519) python-jose не поддерживает, поэтому его нет среди
+алгоритмов; для сравнения стоимости подписи см.
+05_benchmarks/jwt_algorithms.py.
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+
+class KeyRing:
+    """Ключи одного алгоритма: подпись активным ключом, проверка — любым.
+
+    Args:
+        algorithm: HS256, RS256 или ES256
+        signing_key: разобранный ключ подписи (для RS/ES — приватный)
+        verification_keys: kid → разобранный ключ проверки (публичный);
+            для HS256 — {None: тот же секрет}
+        signing_kid: kid активного ключа (пишется в заголовок токена)
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        signing_key: Key,
+        verification_keys: dict[str | None, Key],
+        signing_kid: str | None = None,
+    ) -> None:
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.signing_kid = signing_kid
+        self.verification_keys = verification_keys
+        self._headers = {"kid": signing_kid} if signing_kid is not None else None
+        # JWKS не меняется до перезапуска — сериализуем один раз
+        self.jwks: dict[str, list[dict[str, Any]]] = {
+            "keys": [
+                {**key.to_dict(), "kid": kid, "use": "sig"}
+                for kid, key in verification_keys.items()
+                if algorithm in ASYMMETRIC_ALGORITHMS
+            ]
+        }
+        self.jwks_json = json.dumps(self.jwks).encode()
+
+    @classmethod
+    def hmac(cls, secret: str, algorithm: str = "HS256") -> "KeyRing":
+        """Симметричный режим: один секрет и для подписи, и для проверки."""
+        key = jwk.construct(secret, algorithm)
+        return cls(algorithm, key, {None: key})
+
+    @classmethod
+    def from_pems(
+        cls, algorithm: str, pems: dict[str, bytes], active_kid: str | None = None
+    ) -> "KeyRing":
+        """Асимметричный режим из приватных ключей в PEM {kid: pem}.
+
+        Активный ключ — active_kid или последний по сортировке kid.
+        """
+        if not pems:
+            raise ValueError("no signing keys")
+        private = {kid: jwk.construct(pem, algorithm) for kid, pem in pems.items()}
+        active_kid = active_kid or max(private)
+        if active_kid not in private:
+            raise ValueError(f"unknown active kid: {active_kid}")
+        public: dict[str | None, Key] = {
+            kid: key.public_key() for kid, key in sorted(private.items())
+        }
+        return cls(algorithm, private[active_kid], public, active_kid)
+
+    @classmethod
+    def from_directory(
+        cls, algorithm: str, directory: Path, active_kid: str | None = None
+    ) -> "KeyRing":
+        """Асимметричный режим из файлов <kid>.pem в каталоге."""
+        pems = {path.stem: path.read_bytes() for path in directory.glob("*.pem")}
+        return cls.from_pems(algorithm, pems, active_kid)
+
+    @classmethod
+    def generate(cls, algorithm: str, kid: str = "dev") -> "KeyRing":
+        """Асимметричный режим со случайным ключом (тесты, бенчмарки)."""
+        return cls.from_pems(algorithm, {kid: _private_key_pem(algorithm)})
+
+    def sign(self, claims: dict[str, Any]) -> str:
+        """Подписать claims активным ключом."""
+        return jwt.encode(
+            claims, self.signing_key, algorithm=self.algorithm, headers=self._headers
+        )
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """Проверить подпись и exp; вернуть payload.
+
+        Raises:
+            JWTError: подпись/exp невалидны или kid неизвестен
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.verification_keys.get(kid)
+        if key is None:
+            raise JWTError(f"unknown key id: {kid}")
+        # algorithms=[...] — токен с другим alg (например, HS256, подписанный
+        # публичным ключом как секретом) отклоняется
+        return jwt.decode(token, key, algorithms=[self.algorithm])
+
+
+# ============================================================
+# Загрузка и генерация ключей
+# ============================================================
+
+
+def load_key_ring(algorithm: str, secret: str) -> KeyRing:
+    """KeyRing для алгоритма: HS* — из secret, RS256/ES256 — из файлов.
+
+    Файлы — JWT_KEYS_DIR=<каталог с <kid>.pem>; без каталога — временный
+    ключ процесса (только для разработки: у каждого воркера и после
+    перезапуска он свой).
+    """
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        return KeyRing.hmac(secret, algorithm)
+    directory = os.getenv("JWT_KEYS_DIR")
+    if directory is None:
+        logger.warning("JWT_KEYS_DIR is not set: using a temporary %s key", algorithm)
+        return KeyRing.generate(algorithm)
+    return KeyRing.from_directory(
+        algorithm, Path(directory), os.getenv("JWT_ACTIVE_KID")
+    )
+
+
+def _private_key_pem(algorithm: str) -> bytes:
+    private_key: rsa.RSAPrivateKey | ec.EllipticCurvePrivateKey
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        raise ValueError(f"not an asymmetric algorithm: {algorithm}")
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+def generate_key_file(directory: Path, algorithm: str) -> Path:
+    """Создать новый приватный ключ <kid>.pem; kid — время создания.
+
+    kid растут со временем, поэтому новый ключ — последний по имени
+    и становится активным после перезапуска.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{time.strftime('%Y%m%d%H%M%S')}.pem"
+    path.write_bytes(_private_key_pem(algorithm))
+    path.chmod(0o600)
+    return path
+
+
+def main() -> None:
+    import argparse  # только для CLI, не при импорте приложением
+
+    parser = argparse.ArgumentParser(description="Ключи подписи JWT")
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("generate", help="новый ключ для ротации")
+    generate.add_argument("--dir", type=Path, required=True)
+    generate.add_argument("--algorithm", choices=ASYMMETRIC_ALGORITHMS, default="RS256")
+    args = parser.parse_args()
+    print(generate_key_file(args.dir, args.algorithm))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,23 +13,44 @@ Swagger UI: http://127.0.0.1:8000/docs
 Эндпоинты:
     POST /auth/register  — регистрация (публичный)
     POST /auth/login     — логин, возвращает JWT (публичный)
+    POST /auth/refresh   — новая пара токенов по refresh token (публичный)
+    POST /auth/logout    — отозвать текущий токен (защищённый)
     GET  /me             — профиль текущего пользователя (защищённый)
-    GET  /items          — элементы текущего пользователя (защищённый)
+    GET  /items          — элементы текущего пользователя (scope items:read)
+    GET  /admin/stats    — счётчики аутентификации воркера (scope admin)
+    GET  /.well-known/jwks.json — публичные ключи проверки JWT (RS256/ES256)
 """
 
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, Response
+
+from . import auth  # type: ignore[import]
+from .dependencies import engine  # type: ignore[import]
+from .hashing import password_hasher  # type: ignore[import]
 from .routers.protected import router as protected_router  # type: ignore[import]
 from .routers.users import router as auth_router  # type: ignore[import]
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """При остановке — завершить пул хеширования и закрыть соединения с БД."""
+    yield
+    password_hasher.shutdown()
+    if engine is not None:
+        await engine.dispose()
+
+
 app = FastAPI(
     title="Auth Demo API",
     description="Демонстрация JWT аутентификации в FastAPI",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Регистрируем роутеры
-app.include_router(auth_router)  # /auth/register, /auth/login
+app.include_router(auth_router)  # /auth/register, /login, /refresh, /logout
 app.include_router(protected_router)  # /me, /items
 
 
@@ -42,7 +63,25 @@ def root() -> dict:
         "endpoints": {
             "register": "POST /auth/register",
             "login": "POST /auth/login",
+            "refresh": "POST /auth/refresh (refresh token)",
+            "logout": "POST /auth/logout (требует токен)",
             "profile": "GET /me (требует токен)",
-            "items": "GET /items (требует токен)",
+            "items": "GET /items (требует токен со scope items:read)",
+            "jwks": "GET /.well-known/jwks.json",
         },
     }
+
+
+@app.get("/.well-known/jwks.json")
+def read_jwks() -> Response:
+    """Публичные ключи проверки JWT — для сервисов, которые проверяют токены.
+
+    JSON собран один раз при загрузке ключей; клиенты кешируют его
+    (Cache-Control) и перезапрашивают, встретив незнакомый kid.
+    В режиме HS256 список пуст: общий секрет не публикуется.
+    """
+    return Response(
+        content=auth.key_ring.jwks_json,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=300"},
+    )
@@ -23,6 +23,7 @@ class UserInDB(BaseModel):
     username: str
     hashed_password: str
     is_active: bool = True
+    role: str = "user"  # scopes роли — scopes.ROLE_SCOPES
 
 
 class Token(BaseModel):
@@ -30,6 +31,14 @@ class Token(BaseModel):
 
     access_token: str
     token_type: str = "bearer"
+    # Для POST /auth/refresh: новая пара токенов без пароля
+    refresh_token: str | None = None
+
+
+class RefreshRequest(BaseModel):
+    """Тело POST /auth/refresh."""
+
+    refresh_token: str
 
 
 class TokenData(BaseModel):
@@ -0,0 +1,198 @@
+"""Политика хеширования паролей: схемы, профили стоимости, калибровка.
+
+Стоимость bcrypt (rounds) — компромисс: каждый +1 удваивает время и
+для атакующего, и для сервера на каждом логине. Подходящее значение
+зависит от железа, поэтому его подбирают командой calibrate, а не
+угадывают.
+
+Содержит:
+- PASSWORD_PROFILES — наборы стоимости: production и fast (для тестов:
+  минимальная стоимость, хеш в ~1000 раз дешевле)
+- build_crypt_context — CryptContext по PASSWORD_SCHEMES / PASSWORD_PROFILE
+  и переопределениям BCRYPT_ROUNDS, SCRYPT_ROUNDS, ARGON2_TIME_COST
+- verify_and_update — проверка пароля с пересчётом только слабых хешей
+- calibrate — подобрать стоимость под целевое время хеширования
+
+Первая схема в PASSWORD_SCHEMES хеширует новые пароли, остальные только
+проверяются и помечаются устаревшими: при следующем логине такой хеш
+(или хеш с меньшей стоимостью) пересчитывается — см. verify_and_update.
+Хеш дороже текущего профиля не трогается: профиль fast или сниженный
+BCRYPT_ROUNDS не должны ослаблять уже сохранённые пароли.
+
+argon2 требует пакет argon2-cffi (pip install argon2-cffi); scrypt
+работает на hashlib из стандартной библиотеки.
+
+Калибровка (из корня репозитория):
+    python -m seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.passwords --target-ms 250
+"""
+
+import importlib.util
+import os
+import statistics
+import time
+from typing import Any
+
+from passlib.context import CryptContext
+from passlib.registry import get_crypt_handler
+
+# ============================================================
+# Профили стоимости
+# ============================================================
+
+# Параметр стоимости каждой схемы и его допустимый диапазон
+COST_PARAMETERS: dict[str, tuple[str, range]] = {
+    "bcrypt": ("rounds", range(4, 18)),
+    "scrypt": ("rounds", range(1, 21)),  # log2(N)
+    "argon2": ("time_cost", range(1, 11)),
+}
+
+PASSWORD_PROFILES: dict[str, dict[str, int]] = {
+    "production": {
+        "bcrypt__rounds": 12,
+        "scrypt__rounds": 16,
+        "argon2__time_cost": 3,
+        "argon2__memory_cost": 65536,  # КиБ
+    },
+    # Только для тестов: хеши по-прежнему настоящие, но минимальной стоимости
+    "fast": {
+        "bcrypt__rounds": 4,
+        "scrypt__rounds": 1,
+        "argon2__time_cost": 1,
+        "argon2__memory_cost": 8,
+    },
+}
+
+# Переменные окружения, переопределяющие профиль (например, после calibrate)
+COST_OVERRIDES = {
+    "BCRYPT_ROUNDS": "bcrypt__rounds",
+    "SCRYPT_ROUNDS": "scrypt__rounds",
+    "ARGON2_TIME_COST": "argon2__time_cost",
+}
+
+
+def build_crypt_context(
+    schemes: list[str] | None = None, profile: str | None = None
+) -> CryptContext:
+    """CryptContext по списку схем и профилю стоимости.
+
+    Args:
+        schemes: схемы по приоритету; по умолчанию PASSWORD_SCHEMES или bcrypt
+        profile: ключ PASSWORD_PROFILES; по умолчанию PASSWORD_PROFILE
+            или production
+
+    Raises:
+        ValueError: неизвестный профиль
+        RuntimeError: схема argon2 без установленного argon2-cffi
+    """
+    if schemes is None:
+        schemes = os.getenv("PASSWORD_SCHEMES", "bcrypt").split(",")
+    profile = profile or os.getenv("PASSWORD_PROFILE", "production")
+    if profile not in PASSWORD_PROFILES:
+        raise ValueError(f"unknown password profile: {profile}")
+    if "argon2" in schemes and importlib.util.find_spec("argon2") is None:
+        raise RuntimeError("argon2 scheme requires: pip install argon2-cffi")
+
+    settings: dict[str, Any] = {
+        key: value
+        for key, value in PASSWORD_PROFILES[profile].items()
+        if key.split("__")[0] in schemes
+    }
+    for variable, key in COST_OVERRIDES.items():
+        if key.split("__")[0] in schemes and os.getenv(variable):
+            settings[key] = int(os.environ[variable])
+    # deprecated="auto": все схемы, кроме первой, устарели → needs_update
+    return CryptContext(schemes=schemes, deprecated="auto", **settings)
+
+
+def lowers_cost(context: CryptContext, hashed: str) -> bool:
+    """Ослабит ли пересчёт хеш: какая-то его стоимость выше текущей.
+
+    passlib помечает для обновления хеш с любой другой стоимостью,
+    в том числе с большей. Хеш устаревшей схемы не проверяется:
+    его переводят на первую схему в любом случае.
+    """
+    if context.identify(hashed) != context.default_scheme():
+        return False
+    handler = context.identify(hashed, resolve=True)
+    stored = handler.from_string(hashed)
+    configured = {
+        "rounds": getattr(handler, "default_rounds", None),
+        "memory_cost": getattr(handler, "memory_cost", None),  # argon2
+    }
+    return any(
+        value is not None and getattr(stored, name, value) > value
+        for name, value in configured.items()
+    )
+
+
+def verify_and_update(
+    context: CryptContext, secret: str, hashed: str
+) -> tuple[bool, str | None]:
+    """context.verify_and_update, но без пересчёта в более дешёвый хеш.
+
+    Returns:
+        (пароль верный, новый хеш для сохранения или None)
+    """
+    ok, new_hash = context.verify_and_update(secret, hashed)
+    if new_hash is not None and lowers_cost(context, hashed):
+        return ok, None
+    return ok, new_hash
+
+
+# ============================================================
+# Калибровка
+# ============================================================
+
+
+def measure(scheme: str, cost: int, repeat: int = 3) -> float:
+    """Медиана времени одного хеша (секунды) при заданной стоимости."""
+    parameter, _ = COST_PARAMETERS[scheme]
+    handler = get_crypt_handler(scheme).using(**{parameter: cost})
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        handler.hash("calibration-password")
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def calibrate(scheme: str, target: float) -> tuple[int, list[tuple[int, float]]]:
+    """Наибольшая стоимость, при которой хеш не дольше target секунд.
+
+    Returns:
+        (стоимость, [(стоимость, секунды), ...] — все замеры)
+    """
+    _, costs = COST_PARAMETERS[scheme]
+    best = costs[0]
+    timings: list[tuple[int, float]] = []
+    for cost in costs:
+        elapsed = measure(scheme, cost)
+        timings.append((cost, elapsed))
+        if elapsed > target:
+            break  # дальше только дороже
+        best = cost
+    return best, timings
+
+
+def main() -> None:
+    import argparse  # только для CLI, не при импорте приложением
+
+    parser = argparse.ArgumentParser(description="Подбор стоимости хеширования")
+    parser.add_argument("--scheme", choices=COST_PARAMETERS, default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    best, timings = calibrate(args.scheme, args.target_ms / 1000)
+    parameter, _ = COST_PARAMETERS[args.scheme]
+    print(f"{parameter:>10} {'мс':>10}")
+    for cost, elapsed in timings:
+        marker = "  ←" if cost == best else ""
+        print(f"{cost:>10} {elapsed * 1000:>10.1f}{marker}")
+    variable = next(
+        name for name, key in COST_OVERRIDES.items() if key.startswith(args.scheme)
+    )
+    print(f"\n{variable}={best}")
+
+
+if __name__ == "__main__":
+    main()
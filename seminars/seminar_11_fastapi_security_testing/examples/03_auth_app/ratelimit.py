@@ -0,0 +1,241 @@
+"""Ограничение частоты логинов: защита от перебора паролей и перегрузки CPU.
+
+Каждая попытка POST /auth/login стоит проверки bcrypt (~250 мс CPU).
+Без ограничения перебор паролей (или клиент, повторяющий запрос в цикле)
+загружает все процессы хеширования. Лимитер отклоняет запрос с 429 ДО
+поиска пользователя и хеширования.
+
+Содержит:
+- token bucket на IP и на username: разрешает всплеск до burst попыток,
+  дальше — не чаще per_minute в минуту
+- sliding window counter неудачных попыток на пару (username, IP): после
+  LOGIN_MAX_FAILURES неудач за LOGIN_FAILURE_WINDOW секунд пара
+  заблокирована до конца окна (даже с верным паролем). IP в ключе
+  обязателен: иначе любой, отправив неверные пароли, заблокировал бы
+  чужой аккаунт. Перебор одного username с разных IP сдерживает
+  bucket username
+- пара (username, IP), с которой недавно (в пределах окна неудач) был
+  успешный логин, bucket username не расходует: перебор с чужих адресов
+  опустошает его, но не блокирует владельца аккаунта на его устройстве
+- InMemoryRateLimitBackend — счётчики в памяти процесса
+- SqlRateLimitBackend (sql_storage.py) — таблица rate_limits, общая для
+  всех воркеров (атомарный UPDATE: параллельные запросы не проходят оба
+  по одному токену)
+- LoginRateLimiter — проверки для эндпоинта и счётчики stats
+
+IP берётся из request.client. За reverse proxy это адрес прокси —
+нужен uvicorn --proxy-headers (и --forwarded-allow-ips) либо лимит на прокси.
+"""
+
+import math
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Protocol
+
+# ============================================================
+# Конфигурация
+# ============================================================
+
+LOGIN_IP_BURST = int(os.getenv("LOGIN_IP_BURST", "20"))
+LOGIN_IP_PER_MINUTE = float(os.getenv("LOGIN_IP_PER_MINUTE", "60"))
+LOGIN_USER_BURST = int(os.getenv("LOGIN_USER_BURST", "5"))
+LOGIN_USER_PER_MINUTE = float(os.getenv("LOGIN_USER_PER_MINUTE", "10"))
+LOGIN_MAX_FAILURES = int(os.getenv("LOGIN_MAX_FAILURES", "10"))
+LOGIN_FAILURE_WINDOW = float(os.getenv("LOGIN_FAILURE_WINDOW", "900"))
+# Сколько ключей (IP, username) держит in-memory backend; старые вытесняются
+RATE_LIMIT_MAX_KEYS = 100_000
+
+
+@dataclass(frozen=True)
+class Bucket:
+    """Параметры token bucket: ёмкость и скорость пополнения."""
+
+    burst: int
+    per_minute: float
+
+    @property
+    def rate(self) -> float:
+        """Токенов в секунду."""
+        return self.per_minute / 60
+
+
+LOGIN_IP_BUCKET = Bucket(LOGIN_IP_BURST, LOGIN_IP_PER_MINUTE)
+LOGIN_USER_BUCKET = Bucket(LOGIN_USER_BURST, LOGIN_USER_PER_MINUTE)
+
+
+class RateLimitBackend(Protocol):
+    """Хранилище счётчиков лимитера."""
+
+    async def take(self, key: str, bucket: Bucket, now: float) -> float: ...
+
+    async def hit(self, key: str, window: float, now: float) -> None: ...
+
+    async def count(self, key: str, window: float, now: float) -> float: ...
+
+
+def window_estimate(
+    previous: float, current: float, window: float, now: float
+) -> float:
+    """Sliding window counter: текущее окно + взвешенная часть предыдущего.
+
+    Два счётчика вместо журнала всех попыток; ошибка — только в
+    предположении, что попытки прошлого окна шли равномерно.
+    """
+    elapsed = now % window
+    return previous * (1 - elapsed / window) + current
+
+
+# ============================================================
+# In-memory
+# ============================================================
+
+
+class InMemoryRateLimitBackend:
+    """Счётчики в памяти — только для одного процесса.
+
+    Ключей не больше max_keys: при атаке с множества IP память не растёт
+    без границы (вытесненный ключ начинает с полного bucket).
+    Вызывается из event loop, поэтому блокировки не нужны.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS) -> None:
+        self.max_keys = max_keys
+        # key → (токены, время обновления)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        # key → (номер окна, счётчик текущего окна, счётчик предыдущего)
+        self._windows: OrderedDict[str, tuple[int, int, int]] = OrderedDict()
+
+    def _touch(self, entries: OrderedDict, key: str) -> None:
+        entries.move_to_end(key)
+        while len(entries) > self.max_keys:
+            entries.popitem(last=False)
+
+    async def take(self, key: str, bucket: Bucket, now: float) -> float:
+        """Взять токен. Returns: 0 — разрешено, иначе секунд до следующего токена."""
+        tokens, updated = self._buckets.get(key, (bucket.burst, now))
+        tokens = min(bucket.burst, tokens + (now - updated) * bucket.rate)
+        if tokens < 1:
+            return (1 - tokens) / bucket.rate
+        self._buckets[key] = (tokens - 1, now)
+        self._touch(self._buckets, key)
+        return 0.0
+
+    def _window(self, key: str, window: float, now: float) -> tuple[int, int, int]:
+        index = int(now // window)
+        stored, current, previous = self._windows.get(key, (index, 0, 0))
+        if stored == index:
+            return index, current, previous
+        if stored == index - 1:
+            return index, 0, current
+        return index, 0, 0
+
+    async def hit(self, key: str, window: float, now: float) -> None:
+        """Учесть событие (неудачный логин) в текущем окне."""
+        index, current, previous = self._window(key, window, now)
+        self._windows[key] = (index, current + 1, previous)
+        self._touch(self._windows, key)
+
+    async def count(self, key: str, window: float, now: float) -> float:
+        """Оценка числа событий за последние window секунд."""
+        _, current, previous = self._window(key, window, now)
+        return window_estimate(previous, current, window, now)
+
+
+# ============================================================
+# LoginRateLimiter
+# ============================================================
+
+
+def _failures_key(ip: str, username: str) -> str:
+    """Ключ окна неудач: username и IP вместе."""
+    return f"fail:{username}|{ip}"
+
+
+def _success_key(ip: str, username: str) -> str:
+    """Ключ окна успешных логинов пары (username, IP)."""
+    return f"ok:{username}|{ip}"
+
+
+class LoginRateLimiter:
+    """Проверки перед логином: bucket IP, bucket username, неудачные попытки."""
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        per_ip: Bucket = LOGIN_IP_BUCKET,
+        per_username: Bucket = LOGIN_USER_BUCKET,
+        max_failures: int = LOGIN_MAX_FAILURES,
+        failure_window: float = LOGIN_FAILURE_WINDOW,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.backend = backend
+        self.per_ip = per_ip
+        self.per_username = per_username
+        self.max_failures = max_failures
+        self.failure_window = failure_window
+        self.stats = {
+            "allowed": 0,
+            "throttled_ip": 0,
+            "throttled_username": 0,
+            "throttled_failures": 0,
+        }
+        self._clock = clock
+
+    async def check(self, ip: str, username: str | None = None) -> int:
+        """Разрешить попытку или вернуть, через сколько секунд повторить.
+
+        Returns:
+            0 — можно продолжать; иначе значение для Retry-After (секунды)
+        """
+        now = self._clock()
+        if username is not None:
+            username = username.lower()
+            failures = await self.backend.count(
+                _failures_key(ip, username), self.failure_window, now
+            )
+            if failures >= self.max_failures:
+                self.stats["throttled_failures"] += 1
+                # Не раньше конца текущего окна: дальше оценка только убывает
+                return math.ceil(self.failure_window - now % self.failure_window)
+
+        retry_after = await self.backend.take(f"ip:{ip}", self.per_ip, now)
+        if retry_after:
+            self.stats["throttled_ip"] += 1
+            return math.ceil(retry_after)
+
+        if username is not None and not await self._trusted(ip, username, now):
+            retry_after = await self.backend.take(
+                f"user:{username}", self.per_username, now
+            )
+            if retry_after:
+                self.stats["throttled_username"] += 1
+                return math.ceil(retry_after)
+
+        self.stats["allowed"] += 1
+        return 0
+
+    async def _trusted(self, ip: str, username: str, now: float) -> bool:
+        """С этой пары недавно был успешный логин."""
+        successes = await self.backend.count(
+            _success_key(ip, username), self.failure_window, now
+        )
+        return successes > 0
+
+    async def record_success(self, ip: str, username: str) -> None:
+        """Учесть успешный логин: пара освобождается от bucket username."""
+        await self.backend.hit(
+            _success_key(ip, username.lower()), self.failure_window, self._clock()
+        )
+
+    async def record_failure(self, ip: str, username: str) -> None:
+        """Учесть неудачный логин (неверный пароль или нет такого пользователя).
+
+        Неудачи считаются на пару (username, IP): чужие попытки с других
+        адресов не блокируют владельца аккаунта.
+        """
+        await self.backend.hit(
+            _failures_key(ip, username.lower()), self.failure_window, self._clock()
+        )
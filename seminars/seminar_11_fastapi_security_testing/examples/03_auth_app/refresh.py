@@ -0,0 +1,132 @@
+"""Refresh tokens: продление сессии без пароля, с ротацией.
+
+Access token живёт ACCESS_TOKEN_EXPIRE_MINUTES. Без refresh token
+клиент после этого снова шлёт пароль на /auth/login — а это bcrypt
+(~250 мс CPU) и лишний раз пароль в сети. Refresh token обменивается
+на новую пару токенов через POST /auth/refresh: поиск по индексу вместо
+проверки пароля.
+
+Содержит:
+- RefreshTokenService — выдача (issue) и обмен (rotate) refresh tokens,
+  счётчики stats: логины против обновлений
+- InvalidRefreshTokenError — токен неизвестен, истёк или переиспользован
+
+Безопасность:
+- в хранилище только sha256 токена (у токена 256 бит случайности —
+  медленный хеш не нужен, поиск — точное совпадение по индексу)
+- ротация: каждый токен обменивается один раз, взамен выдаётся новый
+  (sliding session: срок отсчитывается заново)
+- reuse detection: повторное предъявление уже обменянного токена
+  означает, что его украли — вся сессия (семейство токенов) отзывается,
+  а с ней и уже выданные access tokens сессии (session_key в
+  RevocationList до истечения последнего из них)
+"""
+
+import hashlib
+import os
+import secrets
+import time
+from collections.abc import Callable
+
+from .auth import ACCESS_TOKEN_EXPIRE_MINUTES  # type: ignore[import]
+from .repository import RefreshTokenRecord, RefreshTokenStore  # type: ignore[import]
+from .revocation import RevocationList, session_key  # type: ignore[import]
+
+# ============================================================
+# Конфигурация
+# ============================================================
+
+REFRESH_TOKEN_EXPIRE_DAYS = float(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+# Раз в столько выданных токенов удаляем истёкшие записи
+REFRESH_PURGE_EVERY = 1000
+
+
+class InvalidRefreshTokenError(Exception):
+    """Refresh token неизвестен, истёк или уже был обменян."""
+
+
+def hash_refresh_token(token: str) -> str:
+    """sha256 токена — ключ записи в хранилище."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RefreshTokenService:
+    """Выдача и ротация refresh tokens поверх RefreshTokenStore.
+
+    revocations — куда отзывать access tokens сессии при logout и reuse
+    detection; без него выданный access token действует до своего exp.
+    """
+
+    def __init__(
+        self,
+        store: RefreshTokenStore,
+        ttl: float = REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+        clock: Callable[[], float] = time.time,
+        revocations: RevocationList | None = None,
+    ) -> None:
+        self.store = store
+        self.ttl = ttl
+        self.revocations = revocations
+        self.stats = {"logins": 0, "refreshes": 0, "reuse_detected": 0, "rejected": 0}
+        self._clock = clock
+        self._issued = 0
+
+    async def issue(
+        self, username: str, family_id: str | None = None
+    ) -> tuple[str, str]:
+        """Выдать refresh token; без family_id — новая сессия (логин).
+
+        Returns:
+            (refresh token, family_id сессии — пишется в access token как sid)
+        """
+        now = self._clock()
+        token = secrets.token_urlsafe(32)
+        if family_id is None:
+            family_id = secrets.token_hex(16)
+            self.stats["logins"] += 1
+        await self.store.add(
+            RefreshTokenRecord(
+                token_hash=hash_refresh_token(token),
+                family_id=family_id,
+                username=username,
+                expires_at=now + self.ttl,
+            )
+        )
+        self._issued += 1
+        if self._issued % REFRESH_PURGE_EVERY == 0:
+            await self.store.purge_expired(now)
+        return token, family_id
+
+    async def rotate(self, token: str) -> RefreshTokenRecord:
+        """Обменять токен: старый помечается использованным.
+
+        Returns:
+            запись старого токена (username и family_id для новой пары)
+
+        Raises:
+            InvalidRefreshTokenError: токен неизвестен, истёк или уже
+                обменян (тогда отозвана вся сессия, включая access tokens)
+        """
+        now = self._clock()
+        token_hash = hash_refresh_token(token)
+        record = await self.store.get(token_hash)
+        if record is None or record.expires_at <= now:
+            self.stats["rejected"] += 1
+            raise InvalidRefreshTokenError
+        if not await self.store.mark_used(token_hash, now):
+            # Уже обменян (в т.ч. параллельным запросом): токен у двоих
+            self.stats["reuse_detected"] += 1
+            await self.revoke_session(record.family_id)
+            raise InvalidRefreshTokenError
+        self.stats["refreshes"] += 1
+        return record
+
+    async def revoke_session(self, family_id: str) -> None:
+        """Отозвать сессию: все её refresh и access tokens (logout, reuse)."""
+        await self.store.revoke_family(family_id)
+        if self.revocations is not None:
+            # Access tokens сессии выданы не позже now — живут до now + TTL
+            await self.revocations.revoke(
+                session_key(family_id),
+                self._clock() + ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            )
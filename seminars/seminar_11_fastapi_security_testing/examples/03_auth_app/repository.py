@@ -0,0 +1,232 @@
+"""Хранилища пользователей и элементов: in-memory или SQL-база.
+
+Содержит:
+- UserRepository — интерфейс (get / add / update_password), которым
+  пользуются эндпоинты
+- InMemoryUserRepository — словарь в памяти процесса (fake_users_db)
+- ItemRepository — элементы владельца постранично (list_for_owner / add)
+- InMemoryItemRepository — индекс owner → элементы в памяти
+- RevocationStore — отозванные токены (jti до exp)
+- RefreshTokenStore — refresh tokens (sha256) с семействами ротации
+- InMemoryRevocationStore, InMemoryRefreshTokenStore — в памяти процесса
+
+SQL-реализации этих интерфейсов и таблицы — в sql_storage.py.
+
+Словарь живёт в одном процессе: с `uvicorn --workers 2` пользователь,
+зарегистрированный в одном воркере, не виден в другом, а после
+перезапуска все пользователи пропадают. Для этого — SQL-хранилища:
+
+    DATABASE_URL=sqlite+aiosqlite:///./auth.db alembic upgrade head
+    DATABASE_URL=sqlite+aiosqlite:///./auth.db uvicorn ...03_auth_app.main:app --workers 2
+"""
+
+import bisect
+import dataclasses
+import itertools
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any, Protocol
+
+from .models import ItemResponse, UserInDB  # type: ignore[import]
+
+
+class UsernameTakenError(Exception):
+    """Пользователь с таким username уже существует."""
+
+
+class UserRepository(Protocol):
+    """Интерфейс хранилища пользователей для эндпоинтов и get_current_user."""
+
+    async def get(self, username: str) -> UserInDB | None: ...
+
+    async def add(self, user: UserInDB) -> None: ...
+
+    async def update_password(self, username: str, hashed_password: str) -> None: ...
+
+
+# ============================================================
+# In-memory
+# ============================================================
+
+
+class InMemoryUserRepository:
+    """Пользователи в словаре {username: UserInDB} — только для одного процесса."""
+
+    def __init__(self, users: dict[str, UserInDB]) -> None:
+        self.users = users
+
+    async def get(self, username: str) -> UserInDB | None:
+        return self.users.get(username)
+
+    async def add(self, user: UserInDB) -> None:
+        """Сохранить пользователя.
+
+        Raises:
+            UsernameTakenError: username уже занят
+        """
+        if user.username in self.users:
+            raise UsernameTakenError(user.username)
+        self.users[user.username] = user
+
+    async def update_password(self, username: str, hashed_password: str) -> None:
+        """Заменить хеш пароля (например, после пересчёта при логине)."""
+        user = self.users.get(username)
+        if user is not None:
+            self.users[username] = user.model_copy(
+                update={"hashed_password": hashed_password}
+            )
+
+
+# ============================================================
+# Элементы (GET /items)
+# ============================================================
+
+
+class ItemRepository(Protocol):
+    """Интерфейс хранилища элементов."""
+
+    async def list_for_owner(
+        self, owner: str, limit: int, after_id: int | None = None
+    ) -> list[ItemResponse]: ...
+
+    async def add(self, owner: str, title: str) -> ItemResponse: ...
+
+
+class InMemoryItemRepository:
+    """Элементы в памяти с индексом по владельцу.
+
+    Вместо прохода по всем элементам — словарь owner → элементы,
+    отсортированные по id: страница владельца стоит O(log n + limit),
+    а не O(всех элементов). ItemResponse создаются один раз при добавлении.
+    """
+
+    def __init__(self, items: Iterable[dict[str, Any]] = ()) -> None:
+        items = list(items)
+        self._by_owner: dict[str, list[ItemResponse]] = defaultdict(list)
+        self._ids: dict[str, list[int]] = defaultdict(list)
+        for item in sorted(items, key=lambda item: item["id"]):
+            self._append(ItemResponse(**item))
+        last_id = max((item["id"] for item in items), default=0)
+        self._next_id = itertools.count(last_id + 1)
+
+    def _append(self, item: ItemResponse) -> None:
+        # id растут монотонно — append сохраняет сортировку
+        self._by_owner[item.owner].append(item)
+        self._ids[item.owner].append(item.id)
+
+    async def list_for_owner(
+        self, owner: str, limit: int, after_id: int | None = None
+    ) -> list[ItemResponse]:
+        """Страница элементов владельца: id > after_id, не больше limit."""
+        items = self._by_owner.get(owner, [])
+        start = 0
+        if after_id is not None:
+            start = bisect.bisect_right(self._ids[owner], after_id) if items else 0
+        return items[start : start + limit]
+
+    async def add(self, owner: str, title: str) -> ItemResponse:
+        item = ItemResponse(id=next(self._next_id), title=title, owner=owner)
+        self._append(item)
+        return item
+
+
+# ============================================================
+# Отозванные токены (logout, принудительный отзыв)
+# ============================================================
+
+
+class RevocationStore(Protocol):
+    """Точное хранилище отозванных jti (см. revocation.RevocationList)."""
+
+    async def revoke(self, jti: str, expires_at: float) -> None: ...
+
+    async def is_revoked(self, jti: str) -> bool: ...
+
+    async def active(self, now: float) -> list[str]: ...
+
+
+class InMemoryRevocationStore:
+    """Отозванные jti в словаре {jti: exp} — только для одного процесса."""
+
+    def __init__(self) -> None:
+        self.revoked: dict[str, float] = {}
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        self.revoked[jti] = expires_at
+
+    async def is_revoked(self, jti: str) -> bool:
+        return jti in self.revoked
+
+    async def active(self, now: float) -> list[str]:
+        """Неистёкшие jti; истёкшие записи заодно удаляются."""
+        self.revoked = {
+            jti: expires_at
+            for jti, expires_at in self.revoked.items()
+            if expires_at > now
+        }
+        return list(self.revoked)
+
+
+# ============================================================
+# Refresh tokens
+# ============================================================
+
+
+@dataclasses.dataclass(frozen=True)
+class RefreshTokenRecord:
+    """Запись о выданном refresh token (сам токен не хранится)."""
+
+    token_hash: str
+    family_id: str
+    username: str
+    expires_at: float
+    used_at: float | None = None
+
+
+class RefreshTokenStore(Protocol):
+    """Хранилище refresh tokens (см. refresh.RefreshTokenService)."""
+
+    async def add(self, record: RefreshTokenRecord) -> None: ...
+
+    async def get(self, token_hash: str) -> RefreshTokenRecord | None: ...
+
+    async def mark_used(self, token_hash: str, now: float) -> bool: ...
+
+    async def revoke_family(self, family_id: str) -> None: ...
+
+    async def purge_expired(self, now: float) -> None: ...
+
+
+class InMemoryRefreshTokenStore:
+    """Refresh tokens в словаре — только для одного процесса."""
+
+    def __init__(self) -> None:
+        self.records: dict[str, RefreshTokenRecord] = {}
+        self._families: dict[str, set[str]] = defaultdict(set)
+
+    async def add(self, record: RefreshTokenRecord) -> None:
+        self.records[record.token_hash] = record
+        self._families[record.family_id].add(record.token_hash)
+
+    async def get(self, token_hash: str) -> RefreshTokenRecord | None:
+        return self.records.get(token_hash)
+
+    async def mark_used(self, token_hash: str, now: float) -> bool:
+        """Пометить токен использованным. Returns: False — уже использован."""
+        record = self.records.get(token_hash)
+        if record is None or record.used_at is not None:
+            return False
+        self.records[token_hash] = dataclasses.replace(record, used_at=now)
+        return True
+
+    async def revoke_family(self, family_id: str) -> None:
+        """Удалить все токены сессии."""
+        for token_hash in self._families.pop(family_id, set()):
+            self.records.pop(token_hash, None)
+
+    async def purge_expired(self, now: float) -> None:
+        for record in [r for r in self.records.values() if r.expires_at <= now]:
+            del self.records[record.token_hash]
+            self._families[record.family_id].discard(record.token_hash)
+            if not self._families[record.family_id]:
+                del self._families[record.family_id]
@@ -0,0 +1,153 @@
+"""Отзыв токенов: фильтр Блума перед точным хранилищем.
+
+JWT проверяется без обращения к БД — поэтому отозвать его (logout,
+скомпрометированный токен) можно только списком отозванных jti.
+Запрос в хранилище на КАЖДЫЙ защищённый запрос добавил бы задержку
+ко всем эндпоинтам, хотя отозвана ничтожная доля токенов.
+
+Содержит:
+- BloomFilter — компактное множество без ложноотрицательных ответов:
+  «точно нет» или «возможно, да» (ложноположительно с вероятностью error_rate)
+- RevocationList — сначала фильтр; хранилище (repository.RevocationStore)
+  спрашивается только при «возможно, да». Фильтр перестраивается из
+  хранилища раз в REVOCATION_REBUILD_SECONDS: так до процесса доходят
+  отзывы из других воркеров, а истёкшие jti из фильтра уходят.
+- session_key — ключ отзыва всех access tokens сессии (claim sid)
+
+Свои отзывы процесс видит сразу; отзыв в другом воркере — не позже
+чем через REVOCATION_REBUILD_SECONDS.
+"""
+
+import hashlib
+import math
+import os
+import time
+from collections.abc import Callable
+
+from .repository import RevocationStore  # type: ignore[import]
+
+# ============================================================
+# Конфигурация
+# ============================================================
+
+REVOCATION_REBUILD_SECONDS = float(os.getenv("REVOCATION_REBUILD_SECONDS", "30"))
+# На сколько отозванных (неистёкших) токенов рассчитан фильтр; при
+# перестройке размер растёт, если отозвано больше
+REVOCATION_FILTER_CAPACITY = int(os.getenv("REVOCATION_FILTER_CAPACITY", "100000"))
+REVOCATION_FILTER_ERROR_RATE = 0.01
+
+
+def session_key(sid: str) -> str:
+    """Ключ отзыва сессии целиком: все access tokens с этим sid.
+
+    jti — token_urlsafe (без «:»), поэтому ключ с префиксом с ним
+    не совпадёт.
+    """
+    return f"sid:{sid}"
+
+
+# ============================================================
+# Фильтр Блума
+# ============================================================
+
+
+class BloomFilter:
+    """Битовый массив из m бит и k хеш-функций.
+
+    add ставит k бит; проверка смотрит, стоят ли все k. Добавленный
+    элемент всегда найдётся, чужой — лишь с вероятностью error_rate
+    (пока элементов не больше capacity). 100 000 jti при 1% — ~117 КБ.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(capacity, 1)
+        # Оптимальные m и k для заданных n и p
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> list[int]:
+        # Двойное хеширование: k позиций из двух 64-битных половин одного хеша
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+# ============================================================
+# RevocationList
+# ============================================================
+
+
+class RevocationList:
+    """Проверка отзыва jti: фильтр Блума + точное хранилище.
+
+    Все методы вызываются из event loop, поэтому блокировки не нужны.
+    """
+
+    def __init__(
+        self,
+        store: RevocationStore,
+        rebuild_interval: float = REVOCATION_REBUILD_SECONDS,
+        capacity: int = REVOCATION_FILTER_CAPACITY,
+        error_rate: float = REVOCATION_FILTER_ERROR_RATE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.store = store
+        self.rebuild_interval = rebuild_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.stats = {
+            "filter_negatives": 0,
+            "store_lookups": 0,
+            "false_positives": 0,
+            "rebuilds": 0,
+        }
+        self._clock = clock
+        self._filter = BloomFilter(capacity, error_rate)
+        self._next_rebuild = 0.0  # первая проверка построит фильтр
+        # jti, отозванные этим процессом с начала последней перестройки
+        self._recent: list[str] = []
+
+    async def is_revoked(self, jti: str) -> bool:
+        """Отозван ли токен: хранилище — только если фильтр сказал «возможно»."""
+        if self._clock() >= self._next_rebuild:
+            await self.rebuild()
+        if jti not in self._filter:
+            self.stats["filter_negatives"] += 1
+            return False
+        self.stats["store_lookups"] += 1
+        revoked = await self.store.is_revoked(jti)
+        if not revoked:
+            self.stats["false_positives"] += 1
+        return revoked
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        """Отозвать токен до его exp (logout или принудительный отзыв)."""
+        await self.store.revoke(jti, expires_at)
+        self._filter.add(jti)
+        self._recent.append(jti)
+
+    async def rebuild(self) -> None:
+        """Построить фильтр заново из неистёкших jti хранилища."""
+        now = self._clock()
+        # Сдвигаем срок до await: параллельные запросы не перестраивают повторно
+        self._next_rebuild = now + self.rebuild_interval
+        self._recent = []
+        active = await self.store.active(now)
+        bloom = BloomFilter(max(self.capacity, 2 * len(active)), self.error_rate)
+        # + отозванные, пока читали хранилище: их могло не быть в выборке
+        for jti in [*active, *self._recent]:
+            bloom.add(jti)
+        self._filter = bloom
+        self.stats["rebuilds"] += 1
@@ -1,18 +1,30 @@
-"""Защищённые роутеры — доступны только аутентифицированным пользователям."""
+"""Защищённые роутеры — доступны только аутентифицированным пользователям.
 
-from fastapi import APIRouter
+Кроме аутентификации, маршруты проверяют права токена: RequireScopes
+(см. scopes.py) — items:read для /items, admin для /admin/stats.
+"""
 
-from ..dependencies import CurrentUser  # type: ignore[import]
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+
+from ..dependencies import (  # type: ignore[import]
+    CurrentUser,
+    ItemRepositoryDep,
+    LoginRateLimiterDep,
+    PasswordHasherDep,
+    RefreshTokensDep,
+    RequireScopes,
+    RevocationListDep,
+    TokenCacheDep,
+)
 from ..models import ItemResponse, UserResponse  # type: ignore[import]
 
 router = APIRouter(tags=["protected"])
 
-# "База данных" элементов (in-memory)
-fake_items_db: list[dict] = [
-    {"id": 1, "title": "Секретный документ #1", "owner": "alice"},
-    {"id": 2, "title": "Секретный документ #2", "owner": "alice"},
-    {"id": 3, "title": "Личные заметки", "owner": "bob"},
-]
+# Размер страницы GET /items
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
 
 
 @router.get("/me", response_model=UserResponse)
@@ -29,14 +41,45 @@ def read_current_user(current_user: CurrentUser) -> UserResponse:
     )
 
 
-@router.get("/items", response_model=list[ItemResponse])
-def read_items(current_user: CurrentUser) -> list[ItemResponse]:
-    """Получить список элементов текущего пользователя.
+@router.get(
+    "/items",
+    response_model=list[ItemResponse],
+    dependencies=[Depends(RequireScopes("items:read"))],
+)
+async def read_items(
+    current_user: CurrentUser,
+    items: ItemRepositoryDep,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    after_id: Annotated[
+        int | None, Query(description="id последнего элемента предыдущей страницы")
+    ] = None,
+) -> list[ItemResponse]:
+    """Получить страницу элементов текущего пользователя.
 
-    Каждый пользователь видит только свои элементы (авторизация).
+    Нужен scope items:read; каждый пользователь видит только свои
+    элементы (авторизация на уровне данных).
+    Следующая страница: ?after_id=<id последнего элемента>.
     """
-    # Фильтрация по владельцу — простая авторизация
-    user_items = [
-        item for item in fake_items_db if item["owner"] == current_user.username
-    ]
-    return [ItemResponse(**item) for item in user_items]
+    # Выборка по владельцу — простая авторизация. Хранилище ищет по индексу
+    # owner, а не перебирает элементы всех пользователей
+    return await items.list_for_owner(
+        current_user.username, limit=limit, after_id=after_id
+    )
+
+
+@router.get("/admin/stats", dependencies=[Depends(RequireScopes("admin"))])
+def read_stats(
+    hasher: PasswordHasherDep,
+    cache: TokenCacheDep,
+    revocations: RevocationListDep,
+    limiter: LoginRateLimiterDep,
+    refresh_tokens: RefreshTokensDep,
+) -> dict[str, dict[str, int]]:
+    """Счётчики компонентов аутентификации этого воркера (только admin)."""
+    return {
+        "password_hasher": hasher.stats,
+        "token_cache": {"hits": cache.hits, "misses": cache.misses},
+        "revocations": revocations.stats,
+        "login_rate_limiter": limiter.stats,
+        "refresh_tokens": refresh_tokens.stats,
+    }
@@ -1,85 +1,244 @@
-"""Роутер аутентификации: регистрация и логин."""
+"""Роутер аутентификации: регистрация, логин, обновление токенов и выход."""
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 
-from ..auth import (  # type: ignore[import]
-    create_access_token,
-    hash_password,
-    verify_password,
+from ..auth import create_access_token  # type: ignore[import]
+from ..dependencies import (  # type: ignore[import]
+    CurrentUser,
+    LoginRateLimiterDep,
+    PasswordHasherDep,
+    RefreshTokensDep,
+    RevocationListDep,
+    TokenClaimsDep,
+    UserRepositoryDep,
 )
-from ..dependencies import fake_users_db  # type: ignore[import]
-from ..models import Token, UserCreate, UserInDB, UserResponse  # type: ignore[import]
+from ..hashing import HasherOverloadedError  # type: ignore[import]
+from ..models import (  # type: ignore[import]
+    RefreshRequest,
+    Token,
+    UserCreate,
+    UserInDB,
+    UserResponse,
+)
+from ..refresh import InvalidRefreshTokenError  # type: ignore[import]
+from ..repository import UsernameTakenError  # type: ignore[import]
+from ..scopes import scopes_for_role  # type: ignore[import]
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _overloaded() -> HTTPException:
+    """503: очередь хеширования заполнена — клиенту стоит повторить позже."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, retry later",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _too_many_attempts(retry_after: int) -> HTTPException:
+    """429: лимит попыток исчерпан — повторить через retry_after секунд."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts, retry later",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client is not None else "unknown"
+
+
+def _username_taken() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Username already registered",
+    )
+
+
 @router.post(
     "/register",
     response_model=UserResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def register(user_data: UserCreate) -> UserResponse:
+async def register(
+    user_data: UserCreate,
+    request: Request,
+    hasher: PasswordHasherDep,
+    users: UserRepositoryDep,
+    limiter: LoginRateLimiterDep,
+) -> UserResponse:
     """Зарегистрировать нового пользователя.
 
+    - Ограничивает частоту запросов с одного IP (регистрация тоже хеширует)
     - Проверяет, что username не занят
-    - Хеширует пароль (НИКОГДА не сохраняем plain text!)
+    - Хеширует пароль (НИКОГДА не сохраняем plain text!) — в пуле процессов,
+      event loop не блокируется
     - Сохраняет UserInDB в "базу данных"
     """
-    # Проверяем уникальность username
-    if user_data.username in fake_users_db:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered",
-        )
+    retry_after = await limiter.check(_client_ip(request))
+    if retry_after:
+        raise _too_many_attempts(retry_after)
+
+    # Проверяем уникальность username (до дорогого хеширования)
+    if await users.get(user_data.username) is not None:
+        raise _username_taken()
 
     # Хешируем пароль перед сохранением
-    hashed = hash_password(user_data.password)
+    try:
+        hashed = await hasher.hash(user_data.password)
+    except HasherOverloadedError:
+        raise _overloaded() from None
 
-    # Сохраняем в "БД"
+    # Сохраняем в "БД". Пока считался хеш, username мог занять параллельный
+    # запрос — тогда сработает уникальность в хранилище
     new_user = UserInDB(
         username=user_data.username,
         hashed_password=hashed,
         is_active=True,
     )
-    fake_users_db[user_data.username] = new_user
+    try:
+        await users.add(new_user)
+    except UsernameTakenError:
+        raise _username_taken() from None
 
     return UserResponse(username=new_user.username, is_active=new_user.is_active)
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+    request: Request,
+    hasher: PasswordHasherDep,
+    users: UserRepositoryDep,
+    limiter: LoginRateLimiterDep,
+    refresh_tokens: RefreshTokensDep,
 ) -> Token:
-    """Выдать JWT access token при успешном логине.
+    """Выдать JWT access token и refresh token при успешном логине.
 
     OAuth2PasswordRequestForm ожидает form-encoded тело:
         username=alice&password=secret
 
     Swagger UI автоматически создаёт форму для этого эндпоинта
     (потому что он указан в OAuth2PasswordBearer(tokenUrl=...)).
+
+    Частые попытки (с одного IP, на один username) и серия неудач
+    получают 429 раньше, чем запрос дойдёт до bcrypt.
     """
+    # Лимиты — до поиска пользователя и хеширования
+    retry_after = await limiter.check(_client_ip(request), form_data.username)
+    if retry_after:
+        raise _too_many_attempts(retry_after)
+
     # Ищем пользователя
-    user = fake_users_db.get(form_data.username)
+    user = await users.get(form_data.username)
     if user is None:
+        await limiter.record_failure(_client_ip(request), form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Проверяем пароль против хеша из "БД"
-    if not verify_password(form_data.password, user.hashed_password):
+    # Проверяем пароль против хеша из "БД" (bcrypt — в пуле процессов)
+    try:
+        password_ok, new_hash = await hasher.verify_and_update(
+            form_data.password, user.hashed_password
+        )
+    except HasherOverloadedError:
+        raise _overloaded() from None
+    if not password_ok:
+        await limiter.record_failure(_client_ip(request), form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    await limiter.record_success(_client_ip(request), form_data.username)
+
+    # Хеш устаревшей схемы или стоимости — пересчитан при проверке,
+    # сохраняем: пароль в открытом виде есть только сейчас
+    if new_hash is not None:
+        await users.update_password(user.username, new_hash)
+
+    # Новая сессия: refresh token продлевает её без пароля
+    refresh_token, session_id = await refresh_tokens.issue(user.username)
+
     # Создаём JWT токен
-    # "sub" (subject) — стандартный claim для идентификатора пользователя
-    access_token = create_access_token(data={"sub": user.username})
+    # "sub" (subject) — стандартный claim для идентификатора пользователя,
+    # "scope" — права роли через пробел (проверяет RequireScopes)
+    access_token = create_access_token(
+        data={
+            "sub": user.username,
+            "sid": session_id,
+            "scope": scopes_for_role(user.role),
+        }
+    )
+
+    return Token(
+        access_token=access_token, token_type="bearer", refresh_token=refresh_token
+    )
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(
+    body: RefreshRequest,
+    users: UserRepositoryDep,
+    refresh_tokens: RefreshTokensDep,
+) -> Token:
+    """Обменять refresh token на новую пару токенов — без пароля и bcrypt.
 
-    return Token(access_token=access_token, token_type="bearer")
+    Каждый refresh token действует один раз. Повторное предъявление
+    уже обменянного токена отзывает всю сессию (токен украден).
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+    )
+    try:
+        used = await refresh_tokens.rotate(body.refresh_token)
+    except InvalidRefreshTokenError:
+        raise invalid from None
+
+    # Пользователь мог быть удалён или заблокирован после логина
+    user = await users.get(used.username)
+    if user is None or not user.is_active:
+        await refresh_tokens.revoke_session(used.family_id)
+        raise invalid
+
+    refresh_token, session_id = await refresh_tokens.issue(
+        user.username, used.family_id
+    )
+    # Scopes — по текущей роли: смена роли действует с ближайшего обновления
+    access_token = create_access_token(
+        data={
+            "sub": user.username,
+            "sid": session_id,
+            "scope": scopes_for_role(user.role),
+        }
+    )
+    return Token(
+        access_token=access_token, token_type="bearer", refresh_token=refresh_token
+    )
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    current_user: CurrentUser,
+    claims: TokenClaimsDep,
+    revocations: RevocationListDep,
+    refresh_tokens: RefreshTokensDep,
+) -> Response:
+    """Отозвать текущий токен и всю его сессию (refresh и access tokens).
+
+    Другие сессии пользователя (другие устройства) продолжают работать.
+    """
+    if claims.jti is not None:
+        await revocations.revoke(claims.jti, claims.exp)
+    if claims.sid is not None:
+        await refresh_tokens.revoke_session(claims.sid)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,63 @@
+"""Права доступа: роли пользователей и scopes в access token.
+
+При логине роль пользователя превращается в список scopes, который
+пишется в токен (claim "scope", через пробел — как в OAuth2). Эндпоинт
+объявляет, какие scopes ему нужны: RequireScopes("items:read") в
+dependencies.py.
+
+Содержит:
+- SCOPES — все известные scopes; позиция задаёт бит в маске
+- ROLE_SCOPES — роль → её scopes
+- scope_mask — имена scopes → битовая маска (неизвестное имя — ошибка)
+- parse_scope_claim — claim "scope" из токена → маска (чужие scopes
+  игнорируются)
+
+Маска требуемых scopes считается один раз, при объявлении маршрута;
+маска токена — один раз при декодировании (дальше TokenClaims лежит в
+TokenCache). Проверка на запросе — одна операция над int:
+(granted & required) == required.
+"""
+
+from collections.abc import Iterable
+
+# Порядок не менять: бит scope в маске — его индекс (маски живут только
+# в памяти процесса, в токен пишутся имена)
+SCOPES = ("items:read", "items:write", "admin")
+SCOPE_BITS = {name: 1 << index for index, name in enumerate(SCOPES)}
+
+ROLE_SCOPES: dict[str, tuple[str, ...]] = {
+    "user": ("items:read", "items:write"),
+    "admin": SCOPES,
+}
+DEFAULT_ROLE = "user"
+
+
+def scope_mask(scopes: Iterable[str]) -> int:
+    """Битовая маска для имён scopes.
+
+    Raises:
+        ValueError: неизвестный scope (опечатка в RequireScopes видна
+            при импорте приложения, а не на первом запросе)
+    """
+    mask = 0
+    for name in scopes:
+        bit = SCOPE_BITS.get(name)
+        if bit is None:
+            raise ValueError(f"unknown scope: {name}")
+        mask |= bit
+    return mask
+
+
+def parse_scope_claim(claim: str | None) -> int:
+    """Маска из claim "scope" токена; неизвестные scopes пропускаются."""
+    if not claim:
+        return 0
+    mask = 0
+    for name in claim.split():
+        mask |= SCOPE_BITS.get(name, 0)
+    return mask
+
+
+def scopes_for_role(role: str) -> str:
+    """Значение claim "scope" для роли (неизвестная роль — без scopes)."""
+    return " ".join(ROLE_SCOPES.get(role, ()))
@@ -0,0 +1,478 @@
+"""SQL-хранилища auth-приложения (SQLAlchemy async): общие для всех воркеров.
+
+Содержит:
+- metadata и таблицы: users_table, items_table, revoked_tokens_table,
+  refresh_tokens_table, rate_limits_table (миграции: alembic/versions/)
+- SqlUserRepository — уникальный индекс на username, кеш чтения в процессе
+- SqlItemRepository — таблица items с индексом (owner, id)
+- SqlRevocationStore — отозванные jti
+- SqlRefreshTokenStore — refresh tokens с семействами ротации
+- SqlRateLimitBackend — счётчики лимитера логинов
+
+Интерфейсы и in-memory реализации — в repository.py и ratelimit.py.
+Модуль отдельный, потому что импорт sqlalchemy — самая дорогая часть
+холодного старта приложения, а без DATABASE_URL он не нужен:
+dependencies.py импортирует этот модуль только с DATABASE_URL.
+"""
+
+import dataclasses
+import os
+import time
+from collections import OrderedDict
+
+import sqlalchemy as sa
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from .models import ItemResponse, UserInDB  # type: ignore[import]
+from .ratelimit import Bucket, window_estimate  # type: ignore[import]
+from .repository import RefreshTokenRecord, UsernameTakenError  # type: ignore[import]
+
+# ============================================================
+# Конфигурация
+# ============================================================
+
+# Сколько секунд доверять закешированному пользователю. Свои записи
+# процесс инвалидирует сразу; TTL ограничивает устаревание данных,
+# изменённых ДРУГИМИ воркерами (например, is_active=False).
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
+
+# ============================================================
+# Пользователи
+# ============================================================
+
+metadata = sa.MetaData()
+
+users_table = sa.Table(
+    "users",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("username", sa.String(50), nullable=False),
+    sa.Column("hashed_password", sa.String(255), nullable=False),
+    sa.Column("is_active", sa.Boolean, nullable=False, server_default=sa.true()),
+    sa.Column("role", sa.String(20), nullable=False, server_default="user"),
+    # Уникальный индекс: поиск пользователя на каждый защищённый запрос —
+    # по B-tree, а два параллельных register с одним именем не пройдут оба
+    sa.Index("ux_users_username", "username", unique=True),
+)
+
+
+class SqlUserRepository:
+    """Пользователи в SQL-базе с кешем чтения в памяти процесса.
+
+    Кеш хранит только найденных пользователей (не промахи: пользователь,
+    зарегистрированный в другом воркере, должен быть виден сразу).
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        cache_ttl: float = USER_CACHE_TTL,
+        cache_size: int = USER_CACHE_SIZE,
+    ) -> None:
+        self.engine = engine
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, tuple[UserInDB, float]] = OrderedDict()
+
+    async def create_schema(self) -> None:
+        """Создать таблицу (для тестов и бенчмарков; в проекте — Alembic)."""
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+    async def get(self, username: str) -> UserInDB | None:
+        """Найти пользователя: сначала в кеше, затем по индексу username."""
+        cached = self._cache.get(username)
+        if cached is not None and cached[1] > time.monotonic():
+            self._cache.move_to_end(username)
+            return cached[0]
+
+        async with self.engine.connect() as conn:
+            row = (
+                await conn.execute(
+                    sa.select(
+                        users_table.c.username,
+                        users_table.c.hashed_password,
+                        users_table.c.is_active,
+                        users_table.c.role,
+                    ).where(users_table.c.username == username)
+                )
+            ).first()
+        if row is None:
+            self._cache.pop(username, None)
+            return None
+
+        user = UserInDB(
+            username=row.username,
+            hashed_password=row.hashed_password,
+            is_active=row.is_active,
+            role=row.role,
+        )
+        if self.cache_ttl > 0:
+            self._cache[username] = (user, time.monotonic() + self.cache_ttl)
+            self._cache.move_to_end(username)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return user
+
+    async def add(self, user: UserInDB) -> None:
+        """Сохранить пользователя (INSERT).
+
+        Raises:
+            UsernameTakenError: нарушен уникальный индекс на username
+        """
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(
+                    users_table.insert().values(
+                        username=user.username,
+                        hashed_password=user.hashed_password,
+                        is_active=user.is_active,
+                        role=user.role,
+                    )
+                )
+        except IntegrityError:
+            raise UsernameTakenError(user.username) from None
+        finally:
+            self.invalidate(user.username)
+
+    async def update_password(self, username: str, hashed_password: str) -> None:
+        """Заменить хеш пароля (UPDATE по индексу username)."""
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(
+                    users_table.update()
+                    .where(users_table.c.username == username)
+                    .values(hashed_password=hashed_password)
+                )
+        finally:
+            self.invalidate(username)
+
+    def invalidate(self, username: str) -> None:
+        """Удалить пользователя из кеша (после любой записи в users)."""
+        self._cache.pop(username, None)
+
+
+# ============================================================
+# Элементы (GET /items)
+# ============================================================
+
+items_table = sa.Table(
+    "items",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("title", sa.String(200), nullable=False),
+    sa.Column("owner", sa.String(50), nullable=False),
+    # (owner, id): элементы владельца — диапазон индекса, уже в порядке id;
+    # страница after_id — продолжение того же диапазона, без OFFSET
+    sa.Index("ix_items_owner_id", "owner", "id"),
+)
+
+
+class SqlItemRepository:
+    """Элементы в SQL-базе: страница владельца — range scan по ix_items_owner_id."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+
+    async def list_for_owner(
+        self, owner: str, limit: int, after_id: int | None = None
+    ) -> list[ItemResponse]:
+        """Страница элементов владельца: id > after_id, не больше limit."""
+        statement = (
+            sa.select(items_table.c.id, items_table.c.title, items_table.c.owner)
+            .where(items_table.c.owner == owner)
+            .order_by(items_table.c.id)
+            .limit(limit)
+        )
+        if after_id is not None:
+            statement = statement.where(items_table.c.id > after_id)
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(statement)).all()
+        return [
+            ItemResponse(id=row.id, title=row.title, owner=row.owner) for row in rows
+        ]
+
+    async def add(self, owner: str, title: str) -> ItemResponse:
+        async with self.engine.begin() as conn:
+            item_id = (
+                await conn.execute(
+                    items_table.insert()
+                    .values(title=title, owner=owner)
+                    .returning(items_table.c.id)
+                )
+            ).scalar_one()
+        return ItemResponse(id=item_id, title=title, owner=owner)
+
+
+# ============================================================
+# Отозванные токены (logout, принудительный отзыв)
+# ============================================================
+
+revoked_tokens_table = sa.Table(
+    "revoked_tokens",
+    metadata,
+    sa.Column("jti", sa.String(64), primary_key=True),
+    # Unix-время exp токена: после него запись не нужна — токен и так
+    # не пройдёт проверку подписи/exp
+    sa.Column("expires_at", sa.Float, nullable=False),
+    sa.Index("ix_revoked_tokens_expires_at", "expires_at"),
+)
+
+
+class SqlRevocationStore:
+    """Отозванные jti в SQL-базе — общие для всех воркеров."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        """Отозвать токен (повторный отзыв того же jti — не ошибка)."""
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(
+                    revoked_tokens_table.insert().values(jti=jti, expires_at=expires_at)
+                )
+        except IntegrityError:
+            pass
+
+    async def is_revoked(self, jti: str) -> bool:
+        async with self.engine.connect() as conn:
+            row = (
+                await conn.execute(
+                    sa.select(revoked_tokens_table.c.jti).where(
+                        revoked_tokens_table.c.jti == jti
+                    )
+                )
+            ).first()
+        return row is not None
+
+    async def active(self, now: float) -> list[str]:
+        """Неистёкшие jti; истёкшие записи заодно удаляются."""
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                revoked_tokens_table.delete().where(
+                    revoked_tokens_table.c.expires_at <= now
+                )
+            )
+            rows = await conn.execute(sa.select(revoked_tokens_table.c.jti))
+            return list(rows.scalars())
+
+
+# ============================================================
+# Refresh tokens
+# ============================================================
+
+refresh_tokens_table = sa.Table(
+    "refresh_tokens",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    # sha256 токена: утечка таблицы не даёт рабочих токенов, а поиск —
+    # точное совпадение по уникальному индексу
+    sa.Column("token_hash", sa.String(64), nullable=False),
+    # Все токены одной сессии: цепочка ротаций от одного логина
+    sa.Column("family_id", sa.String(32), nullable=False),
+    sa.Column("username", sa.String(50), nullable=False),
+    sa.Column("expires_at", sa.Float, nullable=False),
+    # Когда токен обменяли на новый; повторное предъявление — кража
+    sa.Column("used_at", sa.Float, nullable=True),
+    sa.Index("ux_refresh_tokens_token_hash", "token_hash", unique=True),
+    sa.Index("ix_refresh_tokens_family_id", "family_id"),
+    sa.Index("ix_refresh_tokens_expires_at", "expires_at"),
+)
+
+
+class SqlRefreshTokenStore:
+    """Refresh tokens в SQL-базе — общие для всех воркеров."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+
+    async def add(self, record: RefreshTokenRecord) -> None:
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                refresh_tokens_table.insert().values(**dataclasses.asdict(record))
+            )
+
+    async def get(self, token_hash: str) -> RefreshTokenRecord | None:
+        t = refresh_tokens_table
+        async with self.engine.connect() as conn:
+            row = (
+                await conn.execute(
+                    sa.select(
+                        t.c.token_hash,
+                        t.c.family_id,
+                        t.c.username,
+                        t.c.expires_at,
+                        t.c.used_at,
+                    ).where(t.c.token_hash == token_hash)
+                )
+            ).first()
+        return RefreshTokenRecord(**row._mapping) if row is not None else None
+
+    async def mark_used(self, token_hash: str, now: float) -> bool:
+        """Пометить токен использованным. Returns: False — уже использован.
+
+        Условный UPDATE атомарен: из двух параллельных обменов одного
+        токена успешен ровно один.
+        """
+        t = refresh_tokens_table
+        async with self.engine.begin() as conn:
+            result = await conn.execute(
+                t.update()
+                .where(t.c.token_hash == token_hash, t.c.used_at.is_(None))
+                .values(used_at=now)
+            )
+        return result.rowcount == 1
+
+    async def revoke_family(self, family_id: str) -> None:
+        """Удалить все токены сессии (по индексу family_id)."""
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                refresh_tokens_table.delete().where(
+                    refresh_tokens_table.c.family_id == family_id
+                )
+            )
+
+    async def purge_expired(self, now: float) -> None:
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                refresh_tokens_table.delete().where(
+                    refresh_tokens_table.c.expires_at <= now
+                )
+            )
+
+
+# ============================================================
+# Лимитер логинов
+# ============================================================
+
+rate_limits_table = sa.Table(
+    "rate_limits",
+    metadata,
+    # bucket: "<ключ>", окно: "<ключ>#<номер окна>"
+    sa.Column("key", sa.String(200), primary_key=True),
+    sa.Column("value", sa.Float, nullable=False),  # токены или счётчик окна
+    sa.Column("updated_at", sa.Float, nullable=False),
+    # После expires_at строка не влияет на решения (bucket снова полон,
+    # окно устарело) — её можно удалить
+    sa.Column("expires_at", sa.Float, nullable=False),
+    sa.Index("ix_rate_limits_expires_at", "expires_at"),
+)
+
+
+class SqlRateLimitBackend:
+    """Счётчики в SQL-базе: лимит общий для всех воркеров и процессов.
+
+    Списание токена — один условный UPDATE: база сама сериализует
+    параллельные запросы к одной строке, поэтому два воркера не могут
+    потратить один и тот же последний токен.
+    """
+
+    # Раз в столько вставок новых строк удаляем истёкшие
+    PURGE_EVERY = 1000
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self._inserts = 0
+
+    async def take(self, key: str, bucket: Bucket, now: float) -> float:
+        """Взять токен. Returns: 0 — разрешено, иначе секунд до следующего токена."""
+        t = rate_limits_table
+        level = t.c.value + (now - t.c.updated_at) * bucket.rate
+        refilled = sa.case((level > bucket.burst, bucket.burst), else_=level)
+        # Строку могла вставить параллельная транзакция — тогда повторяем
+        for _ in range(2):
+            try:
+                async with self.engine.begin() as conn:
+                    updated = await conn.execute(
+                        t.update()
+                        .where(t.c.key == key, refilled >= 1)
+                        .values(
+                            value=refilled - 1,
+                            updated_at=now,
+                            expires_at=now
+                            + (bucket.burst - refilled + 1) / bucket.rate,
+                        )
+                    )
+                    if updated.rowcount == 1:
+                        return 0.0
+                    row = (
+                        await conn.execute(
+                            sa.select(t.c.value, t.c.updated_at).where(t.c.key == key)
+                        )
+                    ).first()
+                    if row is not None:
+                        tokens = min(
+                            bucket.burst,
+                            row.value + (now - row.updated_at) * bucket.rate,
+                        )
+                        return (1 - tokens) / bucket.rate
+                    await self._insert(
+                        conn, key, bucket.burst - 1, now, now + 1 / bucket.rate
+                    )
+                    return 0.0
+            except IntegrityError:
+                continue
+        return 1 / bucket.rate
+
+    async def hit(self, key: str, window: float, now: float) -> None:
+        """Учесть событие (неудачный логин) в текущем окне."""
+        t = rate_limits_table
+        index = int(now // window)
+        window_key = f"{key}#{index}"
+        for _ in range(2):
+            try:
+                async with self.engine.begin() as conn:
+                    updated = await conn.execute(
+                        t.update()
+                        .where(t.c.key == window_key)
+                        .values(value=t.c.value + 1, updated_at=now)
+                    )
+                    if updated.rowcount == 0:
+                        await self._insert(
+                            conn, window_key, 1, now, (index + 2) * window
+                        )
+                    return
+            except IntegrityError:
+                continue
+
+    async def count(self, key: str, window: float, now: float) -> float:
+        """Оценка числа событий за последние window секунд."""
+        t = rate_limits_table
+        index = int(now // window)
+        current_key, previous_key = f"{key}#{index}", f"{key}#{index - 1}"
+        async with self.engine.connect() as conn:
+            rows = dict(
+                (
+                    await conn.execute(
+                        sa.select(t.c.key, t.c.value).where(
+                            t.c.key.in_([current_key, previous_key])
+                        )
+                    )
+                ).all()
+            )
+        return window_estimate(
+            rows.get(previous_key, 0), rows.get(current_key, 0), window, now
+        )
+
+    async def _insert(
+        self,
+        conn: AsyncConnection,
+        key: str,
+        value: float,
+        now: float,
+        expires_at: float,
+    ) -> None:
+        await conn.execute(
+            rate_limits_table.insert().values(
+                key=key, value=value, updated_at=now, expires_at=expires_at
+            )
+        )
+        self._inserts += 1
+        if self._inserts % self.PURGE_EVERY == 0:
+            await conn.execute(
+                rate_limits_table.delete().where(rate_limits_table.c.expires_at < now)
+            )
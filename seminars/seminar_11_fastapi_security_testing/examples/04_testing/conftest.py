@@ -2,22 +2,54 @@
 
 conftest.py автоматически загружается pytest перед тестами.
 Здесь определяем fixtures, которые используются во всех тестах.
+
+Быстрый режим:
+- bcrypt с минимальной стоимостью (профиль fast) и хешер без пула
+  процессов — тесты не ждут запуска процессов и 250 мс на хеш
+- registered_user / auth_token не ходят через API: хеш пароля
+  считается один раз за сессию, токен подписывается напрямую
+  (регистрацию и логин проверяют их собственные тесты)
+
+Всё состояние тестов — объекты модулей внутри процесса, файлы —
+только в tmp_path: тесты не зависят друг от друга и от порядка запуска.
 """
 
+import asyncio
 import importlib
-from collections.abc import Generator
+import os
+from collections.abc import AsyncIterator, Generator
+from pathlib import Path
+from typing import Any
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+# Минимальная стоимость bcrypt: хеши настоящие, но в ~1000 раз дешевле.
+# До импорта приложения — pwd_context создаётся при импорте auth.py
+os.environ.setdefault("PASSWORD_PROFILE", "fast")
 
 # Загружаем auth_app через importlib (имя папки начинается с цифры)
 _BASE = "seminars.seminar_11_fastapi_security_testing.examples"
 _main = importlib.import_module(f"{_BASE}.03_auth_app.main")
+_auth = importlib.import_module(f"{_BASE}.03_auth_app.auth")
+_hashing = importlib.import_module(f"{_BASE}.03_auth_app.hashing")
+_models = importlib.import_module(f"{_BASE}.03_auth_app.models")
 _deps = importlib.import_module(f"{_BASE}.03_auth_app.dependencies")
+_repository = importlib.import_module(f"{_BASE}.03_auth_app.repository")
+_sql_storage = importlib.import_module(f"{_BASE}.03_auth_app.sql_storage")
+_revocation = importlib.import_module(f"{_BASE}.03_auth_app.revocation")
+_ratelimit = importlib.import_module(f"{_BASE}.03_auth_app.ratelimit")
+_refresh = importlib.import_module(f"{_BASE}.03_auth_app.refresh")
+_scopes = importlib.import_module(f"{_BASE}.03_auth_app.scopes")
 
 app = _main.app
 fake_users_db: dict = _deps.fake_users_db
 
+TEST_USER = {"username": "testuser", "password": "testpass123"}
+
 
 @pytest.fixture
 def client() -> TestClient:
@@ -29,6 +61,37 @@ def client() -> TestClient:
     return TestClient(app)
 
 
+@pytest.fixture
+async def async_client() -> AsyncIterator[httpx.AsyncClient]:
+    """httpx.AsyncClient поверх ASGI — для async-тестов.
+
+    В отличие от TestClient, запросы можно выполнять параллельно
+    (asyncio.gather) в одном event loop с приложением.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def fast_password_hasher() -> Generator[Any, None, None]:
+    """Хешер без пула процессов: bcrypt считается в threadpool.
+
+    Пул процессов (spawn) запускается сотни миллисекунд — для тестов
+    с дешёвым профилем это дороже самого хеширования.
+    """
+    hasher = _hashing.PasswordHasher(workers=0)
+    app.dependency_overrides[_deps.get_password_hasher] = lambda: hasher
+    yield hasher
+    app.dependency_overrides.pop(_deps.get_password_hasher, None)
+
+
+@pytest.fixture(scope="session")
+def test_user_password_hash() -> str:
+    """Хеш пароля TEST_USER — один раз на всю сессию."""
+    return str(_auth.hash_password(TEST_USER["password"]))
+
+
 @pytest.fixture(autouse=True)
 def clean_users_db() -> Generator[None, None, None]:
     """Очистить базу пользователей перед каждым тестом.
@@ -37,43 +100,82 @@ def clean_users_db() -> Generator[None, None, None]:
     автоматически — не нужно явно указывать его в параметрах.
 
     Это обеспечивает ИЗОЛЯЦИЮ тестов: каждый тест начинает
-    с чистой "базой данных".
+    с чистой "базой данных". Приложение явно переключаем на in-memory
+    хранилища (пустой список отозванных токенов, свежие лимиты логина
+    и refresh tokens) —
+    даже если в окружении задан DATABASE_URL.
     """
     fake_users_db.clear()
+    users = _repository.InMemoryUserRepository(fake_users_db)
+    items = _repository.InMemoryItemRepository(_deps.fake_items_db)
+    app.dependency_overrides[_deps.get_user_repository] = lambda: users
+    revocations = _revocation.RevocationList(_repository.InMemoryRevocationStore())
+    app.dependency_overrides[_deps.get_item_repository] = lambda: items
+    app.dependency_overrides[_deps.get_revocation_list] = lambda: revocations
+    limiter = _ratelimit.LoginRateLimiter(_ratelimit.InMemoryRateLimitBackend())
+    app.dependency_overrides[_deps.get_login_rate_limiter] = lambda: limiter
+    refresh_tokens = _refresh.RefreshTokenService(
+        _repository.InMemoryRefreshTokenStore(), revocations=revocations
+    )
+    app.dependency_overrides[_deps.get_refresh_tokens] = lambda: refresh_tokens
     yield
     # После теста тоже чистим
+    app.dependency_overrides.pop(_deps.get_user_repository, None)
+    app.dependency_overrides.pop(_deps.get_item_repository, None)
+    app.dependency_overrides.pop(_deps.get_revocation_list, None)
+    app.dependency_overrides.pop(_deps.get_login_rate_limiter, None)
+    app.dependency_overrides.pop(_deps.get_refresh_tokens, None)
     fake_users_db.clear()
 
 
 @pytest.fixture
-def registered_user(client: TestClient) -> dict:
+def sql_users(tmp_path: Path) -> Any:
+    """SqlUserRepository на временной SQLite-базе (со схемой).
+
+    NullPool: соединение не переживает event loop, в котором открыто —
+    репозиторий можно использовать и из async-тестов, и через TestClient.
+    """
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'auth.db'}", poolclass=NullPool
+    )
+    repository = _sql_storage.SqlUserRepository(engine)
+    asyncio.run(repository.create_schema())
+    return repository
+
+
+@pytest.fixture
+def registered_user(test_user_password_hash: str) -> dict:
     """Зарегистрировать тестового пользователя.
 
+    Пользователь сразу кладётся в "БД" с заранее посчитанным хешем —
+    как после POST /auth/register, но без хеширования в каждом тесте.
+
     Returns:
         словарь с username и password для использования в тестах
     """
-    user_data = {"username": "testuser", "password": "testpass123"}
-    response = client.post("/auth/register", json=user_data)
-    assert response.status_code == 201
-    return user_data
+    fake_users_db[TEST_USER["username"]] = _models.UserInDB(
+        username=TEST_USER["username"], hashed_password=test_user_password_hash
+    )
+    return dict(TEST_USER)
 
 
 @pytest.fixture
-def auth_token(client: TestClient, registered_user: dict) -> str:
+def auth_token(registered_user: dict) -> str:
     """Получить JWT токен для тестового пользователя.
 
+    Токен подписывается напрямую — тот же, что выдал бы POST /auth/login.
+
     Returns:
         JWT access token в виде строки
     """
-    response = client.post(
-        "/auth/login",
-        data={  # form-encoded, не JSON!
-            "username": registered_user["username"],
-            "password": registered_user["password"],
-        },
+    return str(
+        _auth.create_access_token(
+            {
+                "sub": registered_user["username"],
+                "scope": _scopes.scopes_for_role("user"),
+            }
+        )
     )
-    assert response.status_code == 200
-    return str(response.json()["access_token"])
 
 
 @pytest.fixture
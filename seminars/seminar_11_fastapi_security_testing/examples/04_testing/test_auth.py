@@ -7,16 +7,53 @@
     pytest seminars/seminar_11_fastapi_security_testing/examples/04_testing/ --cov -v
 """
 
+import asyncio
 import importlib
+import time
+from collections.abc import Generator
 from datetime import timedelta
+from typing import Any
 
+import pytest
 from fastapi.testclient import TestClient
+from jose import JWTError, jwt
+from sqlalchemy import event
 
 # Загружаем auth модуль через importlib (имя папки начинается с цифры)
 _auth = importlib.import_module(
     "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.auth"
 )
 create_access_token = _auth.create_access_token
+_hashing = importlib.import_module(
+    "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.hashing"
+)
+_deps = importlib.import_module(
+    "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.dependencies"
+)
+_repository = importlib.import_module(
+    "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.repository"
+)
+_sql_storage = importlib.import_module(
+    "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.sql_storage"
+)
+_revocation = importlib.import_module(
+    "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.revocation"
+)
+_ratelimit = importlib.import_module(
+    "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.ratelimit"
+)
+_keys = importlib.import_module(
+    "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.keys"
+)
+_passwords = importlib.import_module(
+    "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.passwords"
+)
+_refresh = importlib.import_module(
+    "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.refresh"
+)
+_scopes = importlib.import_module(
+    "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app.scopes"
+)
 
 
 # ============================================================
@@ -206,6 +243,21 @@ class TestFullAuthFlow:
         assert me_response.status_code == 200
         assert me_response.json()["username"] == "newuser"
 
+    async def test_concurrent_requests(
+        self, async_client: Any, registered_user: dict
+    ) -> None:
+        """Параллельные логины и запросы к /me через httpx.AsyncClient."""
+        logins = await asyncio.gather(
+            *(async_client.post("/auth/login", data=registered_user) for _ in range(3))
+        )
+        assert [response.status_code for response in logins] == [200] * 3
+
+        headers = {"Authorization": f"Bearer {logins[0].json()['access_token']}"}
+        responses = await asyncio.gather(
+            *(async_client.get("/me", headers=headers) for _ in range(20))
+        )
+        assert {response.status_code for response in responses} == {200}
+
 
 # ============================================================
 # Тесты с истёкшим токеном
@@ -240,3 +292,767 @@ class TestExpiredToken:
         )
         # FastAPI вернёт 403 (нет корректной схемы Bearer)
         assert response.status_code in (401, 403)
+
+
+# ============================================================
+# Тесты хешера паролей (пул, admission control, кеш)
+# ============================================================
+
+
+class TestPasswordHasher:
+    """Тесты ограничения нагрузки и кеша проверок пароля."""
+
+    @pytest.fixture
+    def hasher(self, client: TestClient) -> Generator[Any, None, None]:
+        """Хешер без пула процессов (threadpool), подставленный в приложение."""
+        hasher = _hashing.PasswordHasher(workers=0, queue_limit=4)
+        client.app.dependency_overrides[_deps.get_password_hasher] = lambda: hasher
+        yield hasher
+        client.app.dependency_overrides.pop(_deps.get_password_hasher)
+
+    def test_queue_full_returns_503(self, client: TestClient, hasher: Any) -> None:
+        """Если очередь хеширования заполнена — 503 и Retry-After."""
+        hasher.queue_limit = 0
+        response = client.post(
+            "/auth/register",
+            json={"username": "alice", "password": "secret123"},
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert hasher.stats["rejected"] == 1
+
+    def test_successful_verify_is_cached(self, client: TestClient, hasher: Any) -> None:
+        """Повторный логин с тем же паролем не считает bcrypt заново."""
+        user = {"username": "alice", "password": "secret123"}
+        client.post("/auth/register", json=user)
+        for _ in range(3):
+            assert client.post("/auth/login", data=user).status_code == 200
+        assert hasher.stats["verified"] == 1
+        assert hasher.stats["cache_hits"] == 2
+
+    def test_wrong_password_is_not_cached(
+        self, client: TestClient, hasher: Any
+    ) -> None:
+        """Неудачная проверка не кешируется — каждая попытка считает bcrypt."""
+        client.post(
+            "/auth/register", json={"username": "alice", "password": "secret123"}
+        )
+        wrong = {"username": "alice", "password": "wrong-pass"}
+        for _ in range(2):
+            assert client.post("/auth/login", data=wrong).status_code == 401
+        assert hasher.stats["verified"] == 2
+        assert hasher.stats["cache_hits"] == 0
+
+
+# ============================================================
+# Тесты кеша декодированных токенов
+# ============================================================
+
+
+class TestTokenCache:
+    """Тесты LRU-кеша JWT в get_current_user."""
+
+    def test_repeated_token_served_from_cache(
+        self, client: TestClient, auth_headers: dict
+    ) -> None:
+        """Повторные запросы с тем же токеном не декодируют JWT заново."""
+        cache = _auth.TokenCache(maxsize=10)
+        client.app.dependency_overrides[_deps.get_token_cache] = lambda: cache
+        try:
+            for _ in range(3):
+                assert client.get("/me", headers=auth_headers).status_code == 200
+        finally:
+            client.app.dependency_overrides.pop(_deps.get_token_cache)
+        assert (cache.misses, cache.hits) == (1, 2)
+
+    def test_expired_entry_is_evicted(self) -> None:
+        """Когда наступил exp, запись удаляется и токен проверяется заново."""
+        now = [time.time()]
+        cache = _auth.TokenCache(maxsize=10, clock=lambda: now[0])
+        token = create_access_token({"sub": "alice"}, timedelta(minutes=5))
+
+        assert cache.decode(token) == "alice"
+        now[0] += 10 * 60  # часы кеша ушли за exp
+        cache.decode(token)
+        assert (cache.misses, cache.hits) == (2, 0)
+
+    def test_lru_bound(self) -> None:
+        """В кеше не больше maxsize токенов — вытесняется самый старый."""
+        cache = _auth.TokenCache(maxsize=2)
+        tokens = [create_access_token({"sub": f"user{i}"}) for i in range(3)]
+        for token in tokens:
+            cache.decode(token)
+        assert len(cache) == 2
+
+        cache.decode(tokens[0])  # вытеснен → снова промах
+        assert cache.misses == 4
+
+    def test_invalid_token_not_cached(self) -> None:
+        """Невалидный токен возвращает None и не попадает в кеш."""
+        cache = _auth.TokenCache(maxsize=10)
+        assert cache.decode("not.a.jwt") is None
+        assert len(cache) == 0
+
+
+# ============================================================
+# Тесты SQL-хранилища пользователей
+# ============================================================
+
+
+class TestSqlUserRepository:
+    """Тесты SqlUserRepository: уникальность, кеш чтения, общий доступ."""
+
+    async def test_add_and_get(self, sql_users: Any) -> None:
+        """Сохранённый пользователь находится по username."""
+        await sql_users.add(_make_user("alice"))
+        user = await sql_users.get("alice")
+        assert user is not None
+        assert user.username == "alice"
+        assert await sql_users.get("bob") is None
+
+    async def test_duplicate_username_rejected(self, sql_users: Any) -> None:
+        """Уникальный индекс не даёт сохранить второго alice."""
+        await sql_users.add(_make_user("alice"))
+        with pytest.raises(_repository.UsernameTakenError):
+            await sql_users.add(_make_user("alice"))
+
+    async def test_cached_lookup_skips_database(self, sql_users: Any) -> None:
+        """Повторный get берёт пользователя из кеша — без запроса к БД."""
+        await sql_users.add(_make_user("alice"))
+        statements: list[str] = []
+        event.listen(
+            sql_users.engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+        for _ in range(3):
+            await sql_users.get("alice")
+        assert len(statements) == 1
+
+    async def test_miss_is_not_cached(self, sql_users: Any) -> None:
+        """Промах не кешируется: пользователь виден сразу после add."""
+        assert await sql_users.get("alice") is None
+        await sql_users.add(_make_user("alice"))
+        assert await sql_users.get("alice") is not None
+
+    def test_api_flow_shared_between_workers(
+        self, client: TestClient, sql_users: Any
+    ) -> None:
+        """Пользователь из API виден другому процессу с той же БД."""
+        client.app.dependency_overrides[_deps.get_user_repository] = lambda: sql_users
+        user = {"username": "alice", "password": "secret123"}
+        assert client.post("/auth/register", json=user).status_code == 201
+        assert client.post("/auth/register", json=user).status_code == 400
+        token = client.post("/auth/login", data=user).json()["access_token"]
+        me = client.get("/me", headers={"Authorization": f"Bearer {token}"})
+        assert me.json()["username"] == "alice"
+
+        # "Другой воркер" — отдельный репозиторий на той же базе
+        other_worker = _sql_storage.SqlUserRepository(sql_users.engine)
+        assert asyncio.run(other_worker.get("alice")) is not None
+
+    async def test_update_password_invalidates_cache(self, sql_users: Any) -> None:
+        """После update_password get возвращает новый хеш, а не кешированный."""
+        await sql_users.add(_make_user("alice"))
+        await sql_users.get("alice")
+        await sql_users.update_password("alice", "new-hash")
+        user = await sql_users.get("alice")
+        assert user is not None
+        assert user.hashed_password == "new-hash"
+
+
+# ============================================================
+# Тесты GET /items: индекс по владельцу и страницы
+# ============================================================
+
+
+class TestItems:
+    """Тесты хранилищ элементов и постраничного GET /items."""
+
+    def test_owner_sees_only_own_items(self, client: TestClient) -> None:
+        """alice получает только свои элементы из начальных данных."""
+        user = {"username": "alice", "password": "secret123"}
+        client.post("/auth/register", json=user)
+        token = client.post("/auth/login", data=user).json()["access_token"]
+        response = client.get("/items", headers={"Authorization": f"Bearer {token}"})
+        assert [item["id"] for item in response.json()] == [1, 2]
+        assert {item["owner"] for item in response.json()} == {"alice"}
+
+    async def test_in_memory_pages(self) -> None:
+        """Страницы after_id проходят все элементы владельца ровно один раз."""
+        items = _repository.InMemoryItemRepository()
+        for i in range(25):
+            await items.add("alice" if i % 5 else "bob", f"item {i}")
+
+        seen: list[int] = []
+        after_id = None
+        while page := await items.list_for_owner("alice", limit=7, after_id=after_id):
+            seen.extend(item.id for item in page)
+            after_id = page[-1].id
+        assert len(seen) == 20
+        assert seen == sorted(seen)
+        assert await items.list_for_owner("nobody", limit=10) == []
+
+    async def test_sql_pages(self, sql_users: Any) -> None:
+        """SqlItemRepository: те же страницы по индексу (owner, id)."""
+        items = _sql_storage.SqlItemRepository(sql_users.engine)
+        for i in range(10):
+            await items.add("alice" if i % 2 else "bob", f"item {i}")
+
+        first = await items.list_for_owner("alice", limit=3)
+        rest = await items.list_for_owner("alice", limit=10, after_id=first[-1].id)
+        assert len(first) == 3
+        assert len(rest) == 2
+        assert {item.owner for item in first + rest} == {"alice"}
+
+    def test_page_size_limit(self, client: TestClient, auth_headers: dict) -> None:
+        """limit больше MAX_PAGE_SIZE → 422."""
+        response = client.get("/items?limit=100000", headers=auth_headers)
+        assert response.status_code == 422
+
+
+# ============================================================
+# Тесты отзыва токенов (POST /auth/logout, фильтр Блума)
+# ============================================================
+
+
+class TestRevocation:
+    """Тесты отзыва токенов по jti."""
+
+    def test_logout_revokes_only_current_token(
+        self, client: TestClient, registered_user: dict
+    ) -> None:
+        """После logout токен получает 401, второй токен того же пользователя — нет."""
+        tokens = [
+            client.post("/auth/login", data=registered_user).json()["access_token"]
+            for _ in range(2)
+        ]
+        headers = [{"Authorization": f"Bearer {token}"} for token in tokens]
+
+        response = client.post("/auth/logout", headers=headers[0])
+        assert response.status_code == 204
+        assert client.get("/me", headers=headers[0]).status_code == 401
+        assert client.get("/me", headers=headers[1]).status_code == 200
+
+    def test_bloom_filter_has_no_false_negatives(self) -> None:
+        """Добавленные элементы находятся всегда, чужие — редко."""
+        bloom = _revocation.BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"revoked-{i}")
+
+        assert all(f"revoked-{i}" in bloom for i in range(1000))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+        assert false_positives < 300  # ~1%, с запасом
+
+    async def test_store_consulted_only_on_filter_match(self) -> None:
+        """Неотозванные jti отсекает фильтр — хранилище почти не спрашивают."""
+        revocations = _revocation.RevocationList(
+            _repository.InMemoryRevocationStore(), capacity=1000
+        )
+        await revocations.revoke("revoked", time.time() + 60)
+
+        assert await revocations.is_revoked("revoked")
+        for i in range(1000):
+            assert not await revocations.is_revoked(f"jti-{i}")
+        stats = revocations.stats
+        assert stats["store_lookups"] == 1 + stats["false_positives"]
+        assert stats["filter_negatives"] > 950
+
+    async def test_rebuild_picks_up_other_workers(self) -> None:
+        """Отзыв в другом воркере виден после перестройки; истёкший — уходит."""
+        now = [1000.0]
+        store = _repository.InMemoryRevocationStore()
+        worker_a = _revocation.RevocationList(store, rebuild_interval=30)
+        worker_b = _revocation.RevocationList(
+            store, rebuild_interval=30, clock=lambda: now[0]
+        )
+        assert not await worker_b.is_revoked("jti")  # строит пустой фильтр
+
+        await worker_a.revoke("jti", expires_at=now[0] + 60)
+        assert not await worker_b.is_revoked("jti")  # фильтр B ещё старый
+        now[0] += 30
+        assert await worker_b.is_revoked("jti")
+
+        now[0] += 60  # токен истёк — при перестройке jti удаляется
+        assert not await worker_b.is_revoked("jti")
+        assert store.revoked == {}
+
+    async def test_sql_store(self, sql_users: Any) -> None:
+        """SqlRevocationStore: отзыв идемпотентен, истёкшие записи удаляются."""
+        store = _sql_storage.SqlRevocationStore(sql_users.engine)
+        await store.revoke("old", expires_at=10.0)
+        await store.revoke("new", expires_at=100.0)
+        await store.revoke("new", expires_at=100.0)
+
+        assert await store.is_revoked("new")
+        assert not await store.is_revoked("unknown")
+        assert await store.active(now=50.0) == ["new"]
+        assert not await store.is_revoked("old")
+
+
+# ============================================================
+# Тесты лимита попыток логина
+# ============================================================
+
+
+class TestLoginRateLimit:
+    """Тесты token bucket и окна неудачных попыток на /auth/login."""
+
+    @pytest.fixture
+    def hasher(self, client: TestClient) -> Generator[Any, None, None]:
+        """Хешер без пула процессов — чтобы считать вызовы bcrypt."""
+        hasher = _hashing.PasswordHasher(workers=0)
+        client.app.dependency_overrides[_deps.get_password_hasher] = lambda: hasher
+        yield hasher
+        client.app.dependency_overrides.pop(_deps.get_password_hasher)
+
+    def _use_limiter(self, client: TestClient, **options: Any) -> Any:
+        limiter = _ratelimit.LoginRateLimiter(
+            _ratelimit.InMemoryRateLimitBackend(), **options
+        )
+        client.app.dependency_overrides[_deps.get_login_rate_limiter] = lambda: limiter
+        return limiter
+
+    def test_username_throttled_before_hashing(
+        self, client: TestClient, hasher: Any
+    ) -> None:
+        """Сверх burst на username — 429 с Retry-After, bcrypt не вызывается."""
+        limiter = self._use_limiter(
+            client, per_username=_ratelimit.Bucket(burst=3, per_minute=1)
+        )
+        client.post(
+            "/auth/register", json={"username": "alice", "password": "secret123"}
+        )
+        wrong = {"username": "alice", "password": "wrong-pass"}
+        for _ in range(3):
+            assert client.post("/auth/login", data=wrong).status_code == 401
+
+        response = client.post("/auth/login", data=wrong)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+        assert hasher.stats["verified"] == 3
+        assert limiter.stats["throttled_username"] == 1
+
+    def test_other_ip_does_not_lock_owner(
+        self, client: TestClient, hasher: Any
+    ) -> None:
+        """Перебор с чужого IP опустошает bucket, владелец всё равно входит."""
+        limiter = self._use_limiter(
+            client, per_username=_ratelimit.Bucket(burst=3, per_minute=1)
+        )
+        user = {"username": "alice", "password": "secret123"}
+        client.post("/auth/register", json=user)
+        assert client.post("/auth/login", data=user).status_code == 200
+
+        attacker = TestClient(client.app, client=("203.0.113.7", 50000))
+        wrong = {"username": "alice", "password": "wrong-pass"}
+        statuses = [
+            attacker.post("/auth/login", data=wrong).status_code for _ in range(3)
+        ]
+        assert statuses == [401, 401, 429]
+
+        for _ in range(3):
+            assert client.post("/auth/login", data=user).status_code == 200
+        assert limiter.stats["throttled_username"] == 1
+
+    def test_failures_lock_username(self, client: TestClient, hasher: Any) -> None:
+        """После max_failures неудач с IP даже верный пароль получает 429."""
+        limiter = self._use_limiter(client, max_failures=3)
+        user = {"username": "alice", "password": "secret123"}
+        client.post("/auth/register", json=user)
+        wrong = {"username": "alice", "password": "wrong-pass"}
+        for _ in range(3):
+            assert client.post("/auth/login", data=wrong).status_code == 401
+
+        assert client.post("/auth/login", data=user).status_code == 429
+        assert hasher.stats["verified"] == 3
+        assert limiter.stats["throttled_failures"] == 1
+
+    async def test_ip_bucket_refills(self) -> None:
+        """Bucket пополняется со временем; другие IP не затронуты."""
+        now = [1000.0]
+        limiter = _ratelimit.LoginRateLimiter(
+            _ratelimit.InMemoryRateLimitBackend(),
+            per_ip=_ratelimit.Bucket(burst=2, per_minute=60),
+            clock=lambda: now[0],
+        )
+        assert await limiter.check("10.0.0.1") == 0
+        assert await limiter.check("10.0.0.1") == 0
+        assert await limiter.check("10.0.0.1") == 1
+        assert await limiter.check("10.0.0.2") == 0
+
+        now[0] += 1  # 60 в минуту → один токен в секунду
+        assert await limiter.check("10.0.0.1") == 0
+        assert limiter.stats["throttled_ip"] == 1
+
+    async def test_sliding_window_counter(self) -> None:
+        """Предыдущее окно учитывается с весом, убывающим к его концу."""
+        backend = _ratelimit.InMemoryRateLimitBackend()
+        for _ in range(10):
+            await backend.hit("key", window=100, now=1000)
+
+        assert await backend.count("key", window=100, now=1100) == 10
+        assert await backend.count("key", window=100, now=1150) == 5
+        assert await backend.count("key", window=100, now=1200) == 0
+
+    async def test_sql_backend_shared_between_workers(self, sql_users: Any) -> None:
+        """Два воркера с общей таблицей rate_limits делят один bucket и окно."""
+        now = [1000.0]
+        workers = [
+            _ratelimit.LoginRateLimiter(
+                _sql_storage.SqlRateLimitBackend(sql_users.engine),
+                per_username=_ratelimit.Bucket(burst=2, per_minute=1),
+                max_failures=2,
+                clock=lambda: now[0],
+            )
+            for _ in range(2)
+        ]
+        assert await workers[0].check("10.0.0.1", "alice") == 0
+        assert await workers[1].check("10.0.0.2", "Alice") == 0
+        assert await workers[0].check("10.0.0.3", "alice") == 60
+
+        await workers[0].record_failure("10.0.0.4", "bob")
+        await workers[1].record_failure("10.0.0.4", "bob")
+        assert await workers[1].check("10.0.0.4", "bob") > 0
+        assert workers[1].stats["throttled_failures"] == 1
+
+    async def test_failures_do_not_lock_other_ips(self) -> None:
+        """Неудачи с одного IP не блокируют тот же username с другого."""
+        limiter = _ratelimit.LoginRateLimiter(
+            _ratelimit.InMemoryRateLimitBackend(), max_failures=2
+        )
+        for _ in range(2):
+            await limiter.record_failure("203.0.113.7", "alice")
+
+        assert await limiter.check("203.0.113.7", "Alice") > 0
+        assert await limiter.check("10.0.0.1", "alice") == 0
+        assert limiter.stats["throttled_failures"] == 1
+
+
+# ============================================================
+# Тесты асимметричной подписи (RS256/ES256, JWKS, ротация)
+# ============================================================
+
+
+class TestSigningKeys:
+    """Тесты KeyRing и эндпоинта /.well-known/jwks.json."""
+
+    def test_hs256_jwks_is_empty(self, client: TestClient) -> None:
+        """В режиме HS256 публиковать нечего — секрет общий."""
+        response = client.get("/.well-known/jwks.json")
+        assert response.status_code == 200
+        assert response.json() == {"keys": []}
+
+    def test_rs256_flow_verifiable_with_jwks(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Токен RS256 проверяется публичным ключом из JWKS (без секрета)."""
+        monkeypatch.setattr(_auth, "key_ring", _keys.KeyRing.generate("RS256"))
+        user = {"username": "alice", "password": "secret123"}
+        client.post("/auth/register", json=user)
+        token = client.post("/auth/login", data=user).json()["access_token"]
+        assert jwt.get_unverified_header(token)["alg"] == "RS256"
+        headers = {"Authorization": f"Bearer {token}"}
+        assert client.get("/me", headers=headers).status_code == 200
+
+        jwks = client.get("/.well-known/jwks.json").json()
+        assert [key["kid"] for key in jwks["keys"]] == ["dev"]
+        assert "d" not in jwks["keys"][0]  # приватной части нет
+        claims = jwt.decode(token, jwks["keys"][0], algorithms=["RS256"])
+        assert claims["sub"] == "alice"
+
+    def test_rotation_keeps_old_tokens_valid(self, tmp_path: Any) -> None:
+        """Новый ключ подписывает, старый ещё проверяет; удалённый — нет."""
+        (tmp_path / "2026a.pem").write_bytes(_keys._private_key_pem("ES256"))
+        old_ring = _keys.KeyRing.from_directory("ES256", tmp_path)
+        old_token = old_ring.sign({"sub": "alice"})
+
+        (tmp_path / "2026b.pem").write_bytes(_keys._private_key_pem("ES256"))
+        ring = _keys.KeyRing.from_directory("ES256", tmp_path)
+        assert ring.signing_kid == "2026b"
+        assert ring.verify(old_token)["sub"] == "alice"
+
+        (tmp_path / "2026a.pem").unlink()
+        with pytest.raises(JWTError):
+            _keys.KeyRing.from_directory("ES256", tmp_path).verify(old_token)
+
+    def test_other_algorithm_rejected(self) -> None:
+        """Токен HS256 с подходящим kid не принимается кольцом RS256."""
+        ring = _keys.KeyRing.generate("RS256")
+        forged = jwt.encode(
+            {"sub": "admin"}, "guess", algorithm="HS256", headers={"kid": "dev"}
+        )
+        with pytest.raises(JWTError):
+            ring.verify(forged)
+
+
+# ============================================================
+# Тесты политики паролей (профили, пересчёт хеша при логине)
+# ============================================================
+
+
+class TestPasswordPolicy:
+    """Тесты профилей стоимости, rehash-on-login и калибровки."""
+
+    def test_fast_profile_in_tests(self) -> None:
+        """conftest включает профиль fast: bcrypt с минимальной стоимостью."""
+        assert _auth.hash_password("secret123").startswith("$2b$04$")
+
+    def test_rehash_on_login(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Стоимость выросла — хеш пересчитывается при успешном логине."""
+        hasher = _hashing.PasswordHasher(workers=0)
+        client.app.dependency_overrides[_deps.get_password_hasher] = lambda: hasher
+        user = {"username": "alice", "password": "secret123"}
+        client.post("/auth/register", json=user)
+
+        monkeypatch.setenv("BCRYPT_ROUNDS", "5")
+        monkeypatch.setattr(
+            _hashing, "pwd_context", _passwords.build_crypt_context(["bcrypt"])
+        )
+        try:
+            for _ in range(2):
+                assert client.post("/auth/login", data=user).status_code == 200
+        finally:
+            client.app.dependency_overrides.pop(_deps.get_password_hasher)
+
+        assert _deps.fake_users_db["alice"].hashed_password.startswith("$2b$05$")
+        assert hasher.stats["rehashed"] == 1
+        assert hasher.stats["cache_hits"] == 1  # второй логин — уже по новому хешу
+
+    def test_stronger_hash_not_downgraded(self, client: TestClient) -> None:
+        """Хеш с 12 раундами переживает логин под профилем fast."""
+        hasher = _hashing.PasswordHasher(workers=0)
+        client.app.dependency_overrides[_deps.get_password_hasher] = lambda: hasher
+        user = {"username": "alice", "password": "secret123"}
+        client.post("/auth/register", json=user)
+        strong = _passwords.build_crypt_context(["bcrypt"], "production").hash(
+            user["password"]
+        )
+        _deps.fake_users_db["alice"].hashed_password = strong
+        try:
+            assert client.post("/auth/login", data=user).status_code == 200
+        finally:
+            client.app.dependency_overrides.pop(_deps.get_password_hasher)
+
+        assert _deps.fake_users_db["alice"].hashed_password == strong
+        assert hasher.stats["rehashed"] == 0
+
+    def test_deprecated_scheme_migrates(self) -> None:
+        """Хеш старой схемы проверяется и заменяется хешем первой схемы."""
+        old_hash = _passwords.build_crypt_context(["bcrypt"], "fast").hash("pw")
+        context = _passwords.build_crypt_context(["scrypt", "bcrypt"], "fast")
+
+        ok, new_hash = context.verify_and_update("pw", old_hash)
+        assert ok
+        assert new_hash is not None
+        assert new_hash.startswith("$scrypt$")
+        assert not context.needs_update(new_hash)
+
+    def test_unknown_profile_rejected(self) -> None:
+        """Неизвестный профиль — ошибка при создании контекста."""
+        with pytest.raises(ValueError):
+            _passwords.build_crypt_context(["bcrypt"], "paranoid")
+
+    def test_calibrate_stops_at_target(self) -> None:
+        """Калибровка не идёт дальше первой стоимости, превысившей цель."""
+        best, timings = _passwords.calibrate("bcrypt", target=0)
+        assert best == 4
+        assert [cost for cost, _ in timings] == [4]
+
+
+# ============================================================
+# Тесты refresh tokens (POST /auth/refresh)
+# ============================================================
+
+
+class TestRefreshTokens:
+    """Тесты ротации refresh tokens и обнаружения повторного использования."""
+
+    def test_refresh_skips_password_check(
+        self, client: TestClient, registered_user: dict
+    ) -> None:
+        """Обмен refresh token даёт рабочую пару токенов без проверки пароля."""
+        hasher = _hashing.PasswordHasher(workers=0)
+        client.app.dependency_overrides[_deps.get_password_hasher] = lambda: hasher
+        try:
+            login = client.post("/auth/login", data=registered_user).json()
+            verified = hasher.stats["verified"]
+            response = client.post(
+                "/auth/refresh", json={"refresh_token": login["refresh_token"]}
+            )
+        finally:
+            client.app.dependency_overrides.pop(_deps.get_password_hasher)
+
+        assert response.status_code == 200
+        tokens = response.json()
+        assert tokens["refresh_token"] != login["refresh_token"]
+        assert hasher.stats["verified"] == verified
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        assert client.get("/me", headers=headers).json()["username"] == "testuser"
+
+    def test_reuse_revokes_session(
+        self, client: TestClient, registered_user: dict
+    ) -> None:
+        """Повторный обмен старого токена отзывает и токен-преемник."""
+        first = client.post("/auth/login", data=registered_user).json()
+        body = {"refresh_token": first["refresh_token"]}
+        second = client.post("/auth/refresh", json=body).json()
+
+        assert client.post("/auth/refresh", json=body).status_code == 401
+        successor = {"refresh_token": second["refresh_token"]}
+        assert client.post("/auth/refresh", json=successor).status_code == 401
+
+    def test_reuse_revokes_issued_access_tokens(
+        self, client: TestClient, registered_user: dict
+    ) -> None:
+        """Access tokens сессии перестают действовать сразу, не по exp."""
+        first = client.post("/auth/login", data=registered_user).json()
+        other = client.post("/auth/login", data=registered_user).json()
+        body = {"refresh_token": first["refresh_token"]}
+        second = client.post("/auth/refresh", json=body).json()
+        client.post("/auth/refresh", json=body)
+
+        for tokens in (first, second):
+            headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+            assert client.get("/me", headers=headers).status_code == 401
+        # Другая сессия того же пользователя не затронута
+        headers = {"Authorization": f"Bearer {other['access_token']}"}
+        assert client.get("/me", headers=headers).status_code == 200
+
+    def test_logout_revokes_session(
+        self, client: TestClient, registered_user: dict
+    ) -> None:
+        """После logout refresh token той же сессии не обменивается."""
+        tokens = client.post("/auth/login", data=registered_user).json()
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        client.post("/auth/logout", headers=headers)
+
+        body = {"refresh_token": tokens["refresh_token"]}
+        assert client.post("/auth/refresh", json=body).status_code == 401
+
+    def test_logout_revokes_earlier_access_tokens(
+        self, client: TestClient, registered_user: dict
+    ) -> None:
+        """Logout отзывает и access token, выданный сессии до refresh."""
+        first = client.post("/auth/login", data=registered_user).json()
+        other = client.post("/auth/login", data=registered_user).json()
+        body = {"refresh_token": first["refresh_token"]}
+        second = client.post("/auth/refresh", json=body).json()
+        headers = {"Authorization": f"Bearer {second['access_token']}"}
+        assert client.post("/auth/logout", headers=headers).status_code == 204
+
+        headers = {"Authorization": f"Bearer {first['access_token']}"}
+        assert client.get("/me", headers=headers).status_code == 401
+        # Другая сессия того же пользователя не затронута
+        headers = {"Authorization": f"Bearer {other['access_token']}"}
+        assert client.get("/me", headers=headers).status_code == 200
+
+    async def test_expired_and_unknown_rejected(self) -> None:
+        """Истёкший и неизвестный токены отклоняются; stats считают логины."""
+        now = [1000.0]
+        service = _refresh.RefreshTokenService(
+            _repository.InMemoryRefreshTokenStore(), ttl=60, clock=lambda: now[0]
+        )
+        token, _ = await service.issue("alice")
+        fresh, _ = await service.issue("alice")
+        now[0] += 60
+
+        for candidate in (token, "unknown"):
+            with pytest.raises(_refresh.InvalidRefreshTokenError):
+                await service.rotate(candidate)
+        assert service.stats["logins"] == 2
+        assert service.stats["rejected"] == 2
+        assert fresh != token
+
+    async def test_sql_store_marks_used_once(self, sql_users: Any) -> None:
+        """SqlRefreshTokenStore: токен помечается использованным один раз."""
+        store = _sql_storage.SqlRefreshTokenStore(sql_users.engine)
+        service = _refresh.RefreshTokenService(store)
+        token, family_id = await service.issue("alice")
+        record = await service.rotate(token)
+        assert record.family_id == family_id
+
+        token_hash = _refresh.hash_refresh_token(token)
+        assert not await store.mark_used(token_hash, 0.0)
+        with pytest.raises(_refresh.InvalidRefreshTokenError):
+            await service.rotate(token)
+        assert service.stats == {
+            "logins": 1,
+            "refreshes": 1,
+            "reuse_detected": 1,
+            "rejected": 0,
+        }
+        assert await store.get(token_hash) is None  # семейство отозвано
+
+
+# ============================================================
+# Тесты прав доступа (scopes, RequireScopes)
+# ============================================================
+
+
+class TestScopes:
+    """Тесты scopes в токене и проверки RequireScopes."""
+
+    def test_token_without_scope_forbidden(
+        self, client: TestClient, registered_user: dict
+    ) -> None:
+        """Аутентифицирован, но без items:read → 403 с нужным scope в заголовке."""
+        token = create_access_token({"sub": registered_user["username"]})
+        headers = {"Authorization": f"Bearer {token}"}
+
+        assert client.get("/me", headers=headers).status_code == 200
+        response = client.get("/items", headers=headers)
+        assert response.status_code == 403
+        assert response.headers["WWW-Authenticate"] == 'Bearer scope="items:read"'
+
+    def test_admin_route_requires_admin_role(
+        self, client: TestClient, registered_user: dict, test_user_password_hash: str
+    ) -> None:
+        """/admin/stats: роль user → 403, роль admin → счётчики."""
+        user_token = client.post("/auth/login", data=registered_user).json()
+        headers = {"Authorization": f"Bearer {user_token['access_token']}"}
+        assert client.get("/admin/stats", headers=headers).status_code == 403
+
+        _deps.fake_users_db["root"] = _repository.UserInDB(
+            username="root", hashed_password=test_user_password_hash, role="admin"
+        )
+        admin = {"username": "root", "password": registered_user["password"]}
+        admin_token = client.post("/auth/login", data=admin).json()["access_token"]
+        response = client.get(
+            "/admin/stats", headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        assert response.status_code == 200
+        assert response.json()["refresh_tokens"]["logins"] == 2
+
+    def test_masks(self) -> None:
+        """Нужны все требуемые scopes; чужие scopes в claim игнорируются."""
+        granted = _scopes.parse_scope_claim("items:read legacy:scope")
+        read = _deps.RequireScopes("items:read")
+        read_write = _deps.RequireScopes("items:read", "items:write")
+
+        assert granted & read.mask == read.mask
+        assert granted & read_write.mask != read_write.mask
+        assert _scopes.parse_scope_claim(None) == 0
+
+    def test_unknown_scope_rejected_at_declaration(self) -> None:
+        """Опечатка в RequireScopes — ошибка при объявлении маршрута."""
+        with pytest.raises(ValueError):
+            _deps.RequireScopes("items:raed")
+
+    async def test_sql_repository_stores_role(self, sql_users: Any) -> None:
+        """SqlUserRepository сохраняет и читает роль."""
+        await sql_users.add(
+            _repository.UserInDB(username="root", hashed_password="-", role="admin")
+        )
+        await sql_users.add(_make_user("alice"))
+        sql_users.invalidate("root")
+
+        assert (await sql_users.get("root")).role == "admin"
+        assert (await sql_users.get("alice")).role == "user"
+
+
+def _make_user(username: str) -> Any:
+    """UserInDB с фиктивным хешем — bcrypt в тестах хранилища не нужен."""
+    return _repository.UserInDB(username=username, hashed_password="-")
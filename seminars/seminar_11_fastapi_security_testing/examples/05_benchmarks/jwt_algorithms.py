@@ -0,0 +1,94 @@
+"""Бенчмарк: стоимость подписи и проверки JWT для HS256, RS256, ES256 и EdDSA.
+
+Для каждого алгоритма (см. 03_auth_app/keys.py):
+- sign            — KeyRing.sign (выдача токена при логине)
+- verify          — KeyRing.verify с заранее разобранным ключом
+- verify + PEM    — разбор PEM на каждый вызов (как без кеша ключей)
+- размер токена
+
+EdDSA python-jose не поддерживает: для него замеряется только примитив
+Ed25519 из cryptography на тех же байтах (header.payload), без разбора
+JWT, — это нижняя граница стоимости, а не готовый режим приложения.
+
+Запуск (из корня репозитория):
+    python -m seminars.seminar_11_fastapi_security_testing.examples.05_benchmarks.jwt_algorithms
+    python -m ...jwt_algorithms --number 2000
+"""
+
+import argparse
+import importlib
+import time
+import timeit
+from collections.abc import Callable
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from jose import jwt
+
+_BASE = "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app"
+_keys = importlib.import_module(f"{_BASE}.keys")
+
+CLAIMS = {"sub": "bench", "jti": "x" * 22}
+
+
+def per_call_us(fn: Callable[[], object], number: int) -> float:
+    """Среднее время одного вызова, мкс."""
+    return timeit.timeit(fn, number=number) / number * 1e6
+
+
+def bench_jose(algorithm: str, number: int) -> None:
+    """Замер KeyRing для алгоритма, поддерживаемого python-jose."""
+    if algorithm == "HS256":
+        ring = _keys.KeyRing.hmac("bench-secret-" + "0" * 51)
+        pem: bytes | str = "bench-secret-" + "0" * 51
+        public: bytes | str = pem
+    else:
+        pem = _keys._private_key_pem(algorithm)
+        ring = _keys.KeyRing.from_pems(algorithm, {"bench": pem})
+        public = ring.verification_keys["bench"].to_pem()
+
+    claims = {**CLAIMS, "exp": int(time.time()) + 3600}
+    token = ring.sign(claims)
+    sign = per_call_us(lambda: ring.sign(claims), number)
+    verify = per_call_us(lambda: ring.verify(token), number)
+    verify_pem = per_call_us(
+        lambda: jwt.decode(token, public, algorithms=[algorithm]), number
+    )
+    print(
+        f"{algorithm:<8} {sign:>10.1f} {verify:>10.1f} {verify_pem:>14.1f} "
+        f"{len(token):>8}"
+    )
+
+
+def bench_ed25519(number: int) -> None:
+    """Только примитив Ed25519 (подпись 64 байта → +86 символов base64url)."""
+    private_key = Ed25519PrivateKey.generate()
+    public_key = private_key.public_key()
+    token = _keys.KeyRing.hmac("x" * 64).sign({**CLAIMS, "exp": 0})
+    signing_input = token.rsplit(".", 1)[0].encode()
+    signature = private_key.sign(signing_input)
+
+    sign = per_call_us(lambda: private_key.sign(signing_input), number)
+    verify = per_call_us(lambda: public_key.verify(signature, signing_input), number)
+    print(
+        f"{'EdDSA*':<8} {sign:>10.1f} {verify:>10.1f} {'—':>14} "
+        f"{len(signing_input) + 87:>8}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=1_000, help="вызовов на замер")
+    args = parser.parse_args()
+
+    print(
+        f"{'alg':<8} {'sign, мкс':>10} {'verify, мкс':>10} {'verify+PEM, мкс':>14} "
+        f"{'токен, B':>8}"
+    )
+    for algorithm in ("HS256", "RS256", "ES256"):
+        bench_jose(algorithm, args.number)
+    bench_ed25519(args.number)
+    print("* EdDSA: только подпись/проверка cryptography, без разбора JWT")
+
+
+if __name__ == "__main__":
+    main()
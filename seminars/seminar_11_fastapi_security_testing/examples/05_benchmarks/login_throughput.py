@@ -0,0 +1,130 @@
+"""Бенчмарк: пропускная способность /auth/login при растущей конкурентности.
+
+Сравнивает режимы хеширования паролей (см. 03_auth_app/hashing.py):
+- threadpool — bcrypt в потоках event loop (как прежний sync-эндпоинт)
+- processes  — отдельный пул процессов с admission control
+- cached     — пул процессов + кеш успешных проверок
+
+Запросы идут в приложение напрямую (httpx.ASGITransport, без сети),
+поэтому измеряется именно стоимость обработки логина.
+
+Запуск (из корня репозитория):
+    python -m seminars.seminar_11_fastapi_security_testing.examples.05_benchmarks.login_throughput
+    python -m ...login_throughput --levels 1 8 32 --workers 8
+"""
+
+import argparse
+import asyncio
+import importlib
+import statistics
+import time
+
+import httpx
+
+_BASE = "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app"
+_main = importlib.import_module(f"{_BASE}.main")
+_deps = importlib.import_module(f"{_BASE}.dependencies")
+_hashing = importlib.import_module(f"{_BASE}.hashing")
+_ratelimit = importlib.import_module(f"{_BASE}.ratelimit")
+
+USER = {"username": "bench", "password": "bench-password"}
+
+
+# ============================================================
+# Один прогон: N логинов с заданной конкурентностью
+# ============================================================
+
+
+async def run_level(
+    client: httpx.AsyncClient, concurrency: int, requests: int
+) -> dict[str, float]:
+    """Выполнить requests логинов, не больше concurrency одновременно."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/auth/login", data=USER)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": statuses.get(200, 0) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "rejected": statuses.get(503, 0),
+    }
+
+
+async def bench_mode(
+    name: str, hasher: object, levels: list[int], per_level: int
+) -> None:
+    """Прогнать все уровни конкурентности для одного режима хешера."""
+    app = _main.app
+    app.dependency_overrides[_deps.get_password_hasher] = lambda: hasher
+    # Замеряем хеширование, поэтому лимит попыток логина снимаем
+    unlimited = _ratelimit.Bucket(burst=10**9, per_minute=10**9)
+    limiter = _ratelimit.LoginRateLimiter(
+        _ratelimit.InMemoryRateLimitBackend(),
+        per_ip=unlimited,
+        per_username=unlimited,
+    )
+    app.dependency_overrides[_deps.get_login_rate_limiter] = lambda: limiter
+    _deps.fake_users_db.clear()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        response = await client.post("/auth/register", json=USER)
+        assert response.status_code == 201, response.text
+        # Прогрев: запуск процессов пула не должен попасть в замер
+        await client.post("/auth/login", data=USER)
+        for concurrency in levels:
+            result = await run_level(
+                client, concurrency, max(per_level, concurrency * 2)
+            )
+            print(
+                f"{name:<11} {concurrency:>5} {result['rps']:>10.1f} "
+                f"{result['p50']:>9.0f} {result['p95']:>9.0f} {result['rejected']:>6}"
+            )
+    app.dependency_overrides.clear()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=16, help="логинов на уровень")
+    parser.add_argument("--workers", type=int, default=_hashing.HASH_WORKERS)
+    parser.add_argument("--queue-limit", type=int, default=_hashing.HASH_QUEUE_LIMIT)
+    args = parser.parse_args()
+
+    modes = {
+        "threadpool": _hashing.PasswordHasher(
+            workers=0, queue_limit=10**9, cache_ttl=0
+        ),
+        "processes": _hashing.PasswordHasher(
+            workers=args.workers, queue_limit=args.queue_limit, cache_ttl=0
+        ),
+        "cached": _hashing.PasswordHasher(
+            workers=args.workers, queue_limit=args.queue_limit
+        ),
+    }
+    print(f"workers={args.workers} queue_limit={args.queue_limit}")
+    print(
+        f"{'mode':<11} {'conc':>5} {'logins/s':>10} {'p50, ms':>9} {'p95, ms':>9} {'503':>6}"
+    )
+    for name, hasher in modes.items():
+        try:
+            await bench_mode(name, hasher, args.levels, args.requests)
+        finally:
+            hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""Бенчмарк: проверка scopes — разбор claim на запросе vs заранее собранные маски.
+
+Два замера на --routes маршрутах со случайными наборами требуемых scopes:
+- check — только проверка прав на всех маршрутах:
+    claim         — set(claim.split()) на каждый запрос (как без прекомпиляции)
+    frozenset     — требуемые frozenset собраны заранее, granted — один раз
+    bitmask       — RequireScopes: (granted & required) == required
+- запросы — приложение с --routes маршрутами через httpx.ASGITransport:
+  зависимость, заново разбирающая payload и claim "scope" на каждый
+  запрос, против RequireScopes (проверка токена в обоих — та же)
+
+Запуск (из корня репозитория):
+    python -m seminars.seminar_11_fastapi_security_testing.examples.05_benchmarks.scope_checks
+    python -m ...scope_checks --routes 500
+"""
+
+import argparse
+import asyncio
+import importlib
+import random
+import time
+import timeit
+from collections.abc import Awaitable, Callable
+from typing import Annotated
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from jose import jwt
+
+_BASE = "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app"
+_auth = importlib.import_module(f"{_BASE}.auth")
+_deps = importlib.import_module(f"{_BASE}.dependencies")
+_scopes = importlib.import_module(f"{_BASE}.scopes")
+
+GRANTED = _scopes.scopes_for_role("admin")
+
+
+def route_requirements(routes: int, seed: int = 0) -> list[tuple[str, ...]]:
+    """Случайные непустые наборы scopes для каждого маршрута."""
+    rng = random.Random(seed)
+    return [
+        tuple(rng.sample(_scopes.SCOPES, rng.randint(1, len(_scopes.SCOPES))))
+        for _ in range(routes)
+    ]
+
+
+def bench_checks(requirements: list[tuple[str, ...]], number: int) -> None:
+    """Стоимость проверки прав на одном маршруте, мкс."""
+    sets = [frozenset(scopes) for scopes in requirements]
+    masks = [_scopes.scope_mask(scopes) for scopes in requirements]
+    granted_set = frozenset(GRANTED.split())
+    granted_mask = _scopes.parse_scope_claim(GRANTED)
+
+    def claim() -> None:
+        for required in sets:
+            assert required <= set(GRANTED.split())
+
+    def frozen() -> None:
+        for required in sets:
+            assert required <= granted_set
+
+    def bitmask() -> None:
+        for required in masks:
+            assert granted_mask & required == required
+
+    checks = number * len(requirements)
+    print(f"{'проверка':<12} {'мкс/маршрут':>12}")
+    for name, fn in (("claim", claim), ("frozenset", frozen), ("bitmask", bitmask)):
+        print(f"{name:<12} {timeit.timeit(fn, number=number) / checks * 1e6:>12.3f}")
+
+
+def build_app(requirements: list[tuple[str, ...]], precompiled: bool) -> FastAPI:
+    """Приложение с маршрутом /r{i} на каждый набор требуемых scopes."""
+    app = FastAPI()
+
+    def parse_claim(required: frozenset[str]) -> Callable[..., Awaitable[None]]:
+        async def check(
+            _: _deps.TokenClaimsDep,
+            token: Annotated[str, Depends(_deps.oauth2_scheme)],
+        ) -> None:
+            # Токен проверен так же, как в RequireScopes (TokenClaimsDep);
+            # сверху — разбор payload и claim "scope" на каждый запрос
+            granted = set(jwt.get_unverified_claims(token).get("scope", "").split())
+            if not required <= granted:
+                raise HTTPException(status_code=403)
+
+        return check
+
+    for index, scopes in enumerate(requirements):
+        dependency = (
+            _deps.RequireScopes(*scopes)
+            if precompiled
+            else parse_claim(frozenset(scopes))
+        )
+
+        async def endpoint() -> dict[str, bool]:
+            return {"ok": True}
+
+        app.add_api_route(f"/r{index}", endpoint, dependencies=[Depends(dependency)])
+    return app
+
+
+async def bench_requests(
+    name: str, app: FastAPI, routes: int, requests: int, concurrency: int
+) -> None:
+    """requests запросов по всем маршрутам по кругу."""
+    token = _auth.create_access_token({"sub": "bench", "scope": GRANTED})
+    headers = {"Authorization": f"Bearer {token}"}
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def one(index: int) -> None:
+            async with semaphore:
+                response = await client.get(f"/r{index % routes}", headers=headers)
+                assert response.status_code == 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+    print(f"{name:<12} {requests / elapsed:>12.0f} запросов/с")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", type=int, default=200)
+    parser.add_argument("--number", type=int, default=1_000, help="проходов check")
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    requirements = route_requirements(args.routes)
+    bench_checks(requirements, args.number)
+    print()
+    for name, precompiled in (("claim", False), ("bitmask", True)):
+        app = build_app(requirements, precompiled)
+        await bench_requests(name, app, args.routes, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
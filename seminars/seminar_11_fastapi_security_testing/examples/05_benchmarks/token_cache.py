@@ -0,0 +1,85 @@
+"""Бенчмарк: защищённый эндпоинт с кешем декодированных JWT и без него.
+
+Два замера:
+- decode — только проверка токена: jose.jwt.decode vs TokenCache.decode
+- GET /me — полный запрос через приложение (httpx.ASGITransport)
+
+Запуск (из корня репозитория):
+    python -m seminars.seminar_11_fastapi_security_testing.examples.05_benchmarks.token_cache
+"""
+
+import argparse
+import asyncio
+import importlib
+import time
+import timeit
+
+import httpx
+
+_BASE = "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app"
+_main = importlib.import_module(f"{_BASE}.main")
+_auth = importlib.import_module(f"{_BASE}.auth")
+_deps = importlib.import_module(f"{_BASE}.dependencies")
+_models = importlib.import_module(f"{_BASE}.models")
+
+
+def bench_decode(number: int) -> None:
+    """Стоимость одной проверки токена: полная vs из кеша."""
+    token = _auth.create_access_token({"sub": "bench"})
+    cache = _auth.TokenCache(maxsize=100)
+    cache.decode(token)  # прогрев: токен в кеше
+
+    full = timeit.timeit(lambda: _auth.decode_access_token(token), number=number)
+    cached = timeit.timeit(lambda: cache.decode(token), number=number)
+    print(f"decode_access_token:  {full / number * 1e6:8.1f} мкс")
+    print(f"TokenCache.decode:    {cached / number * 1e6:8.1f} мкс")
+    print(f"ускорение:            {full / cached:8.1f}x")
+
+
+async def bench_endpoint(
+    name: str, cache: object, requests: int, concurrency: int
+) -> None:
+    """requests запросов GET /me, не больше concurrency одновременно."""
+    app = _main.app
+    app.dependency_overrides[_deps.get_token_cache] = lambda: cache
+    # Пользователь напрямую в "БД" — bcrypt в этом замере не нужен
+    _deps.fake_users_db["bench"] = _models.UserInDB(
+        username="bench", hashed_password="-"
+    )
+    headers = {"Authorization": f"Bearer {_auth.create_access_token({'sub': 'bench'})}"}
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def one() -> None:
+            async with semaphore:
+                response = await client.get("/me", headers=headers)
+                assert response.status_code == 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+    app.dependency_overrides.clear()
+    print(f"GET /me {name:<10} {requests / elapsed:10.0f} запросов/с")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20_000, help="итераций decode")
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    bench_decode(args.number)
+    print()
+    for name, cache in (
+        ("без кеша", _auth.TokenCache(maxsize=0)),
+        ("с кешем", _auth.TokenCache()),
+    ):
+        await bench_endpoint(name, cache, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""Бенчмарк: стоимость поиска пользователя на каждый защищённый запрос.
+
+get_current_user на каждый запрос вызывает repository.get(username).
+Сравниваются хранилища (см. 03_auth_app/repository.py):
+- memory    — словарь в памяти процесса
+- sql       — SQL без кеша: запрос по уникальному индексу
+- sql+cache — SQL с кешем чтения в процессе
+
+База — временный SQLite-файл или DATABASE_URL (например, PostgreSQL):
+    python -m seminars.seminar_11_fastapi_security_testing.examples.05_benchmarks.user_lookup
+    DATABASE_URL=postgresql+asyncpg://... python -m ...user_lookup
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy.ext.asyncio import create_async_engine
+
+_BASE = "seminars.seminar_11_fastapi_security_testing.examples.03_auth_app"
+_main = importlib.import_module(f"{_BASE}.main")
+_auth = importlib.import_module(f"{_BASE}.auth")
+_deps = importlib.import_module(f"{_BASE}.dependencies")
+_models = importlib.import_module(f"{_BASE}.models")
+_repository = importlib.import_module(f"{_BASE}.repository")
+_sql_storage = importlib.import_module(f"{_BASE}.sql_storage")
+
+
+async def bench_get(repository: object, number: int) -> float:
+    """Среднее время repository.get() в микросекундах."""
+    await repository.get("bench")  # прогрев (соединение, кеш)
+    started = time.perf_counter()
+    for _ in range(number):
+        await repository.get("bench")
+    return (time.perf_counter() - started) / number * 1e6
+
+
+async def bench_endpoint(repository: object, requests: int) -> float:
+    """GET /me запросов в секунду с этим хранилищем."""
+    app = _main.app
+    app.dependency_overrides[_deps.get_user_repository] = lambda: repository
+    headers = {"Authorization": f"Bearer {_auth.create_access_token({'sub': 'bench'})}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get("/me", headers=headers)
+            assert response.status_code == 200
+        elapsed = time.perf_counter() - started
+    app.dependency_overrides.pop(_deps.get_user_repository)
+    return requests / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=5_000, help="вызовов get()")
+    parser.add_argument("--requests", type=int, default=2_000, help="запросов GET /me")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = os.getenv("DATABASE_URL") or f"sqlite+aiosqlite:///{Path(tmp) / 'a.db'}"
+        engine = create_async_engine(url)
+        sql = _sql_storage.SqlUserRepository(engine, cache_ttl=0)
+        await sql.create_schema()
+        if await sql.get("bench") is None:
+            await sql.add(_models.UserInDB(username="bench", hashed_password="-"))
+
+        repositories = {
+            "memory": _repository.InMemoryUserRepository(
+                {"bench": _models.UserInDB(username="bench", hashed_password="-")}
+            ),
+            "sql": sql,
+            "sql+cache": _sql_storage.SqlUserRepository(engine),
+        }
+        print(f"БД: {engine.url.render_as_string(hide_password=True)}")
+        print(f"{'хранилище':<10} {'get(), мкс':>11} {'GET /me, /с':>12}")
+        for name, repository in repositories.items():
+            per_get = await bench_get(repository, args.number)
+            rps = await bench_endpoint(repository, args.requests)
+            print(f"{name:<10} {per_get:>11.1f} {rps:>12.0f}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
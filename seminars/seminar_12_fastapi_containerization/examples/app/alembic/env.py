@@ -30,6 +30,8 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 # ВАЖНО: все модели должны быть импортированы ДО вызова
 # Base.metadata — иначе Alembic не увидит их таблицы
 # при автогенерации миграций (--autogenerate).
+from app.alembic.migration_report import MIGRATION_DRY_RUN, MigrationReport  # noqa: E402
+from app.alembic.online_migrations import PROGRESS_TABLE  # noqa: E402
 from app.database import Base  # noqa: E402
 from app.models import Task  # noqa: E402, F401
 
@@ -45,6 +47,13 @@ if config.config_file_name is not None:
 # ============================================================
 target_metadata = Base.metadata
 
+
+def include_name(name: str | None, type_: str, parent_names: object) -> bool:
+    """Служебная таблица прогресса backfill не описана в моделях —
+    autogenerate не должен предлагать её удалить."""
+    return not (type_ == "table" and name == PROGRESS_TABLE)
+
+
 # ============================================================
 # Читаем DATABASE_URL из переменной окружения
 # ============================================================
@@ -79,19 +88,31 @@ def run_migrations_online() -> None:
     """Запуск миграций в online-режиме (прямое подключение к БД).
 
     Стандартный режим при запуске: alembic upgrade head
+
+    Время, строки и блокировки каждой ревизии пишутся в отчёт
+    (MIGRATION_REPORT); MIGRATION_DRY_RUN=1 — только оценка по размерам
+    таблиц, без изменений в БД (см. migration_report.py).
     """
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
+    report = MigrationReport(dry_run=MIGRATION_DRY_RUN)
+    report.attach(connectable)
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_name=include_name,
+            # Каждая ревизия — в своей транзакции: долгий backfill не держит
+            # блокировки всех предыдущих ревизий (см. online_migrations.py)
+            transaction_per_migration=True,
+            **report.context_options(connection),
         )
         with context.begin_transaction():
             context.run_migrations()
+    report.finish()
 
 
 # ============================================================
@@ -0,0 +1,412 @@
+"""
+Отчёт о миграциях: время, строки и блокировки каждой ревизии.
+
+Содержит:
+- MigrationReport — подписывается на события движка и on_version_apply
+  Alembic; для каждой ревизии и каждого SQL-запроса записывает длительность,
+  число затронутых строк и блокировки (pg_locks на PostgreSQL)
+- dry-run: ревизии не выполняются, SQL генерируется как в `--sql`,
+  а стоимость оценивается по размерам затронутых таблиц
+
+Подключается в env.py. Управление через переменные окружения:
+
+    MIGRATION_REPORT=migration_report.json   # JSON-отчёт (по умолчанию — только лог)
+    MIGRATION_DRY_RUN=1                      # только оценка, без изменений в БД
+    MIGRATION_ROWS_PER_SECOND=50000          # скорость для оценки в dry-run
+
+Пример (docker compose):
+
+    docker compose run --rm -e MIGRATION_DRY_RUN=1 web alembic upgrade head
+"""
+
+import io
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger("alembic.report")
+
+# Пусто — отчёт только в лог: alembic upgrade не оставляет файлов в рабочей директории
+MIGRATION_REPORT: str = os.getenv("MIGRATION_REPORT", "")
+MIGRATION_DRY_RUN: bool = os.getenv("MIGRATION_DRY_RUN", "") not in ("", "0")
+MIGRATION_ROWS_PER_SECOND: int = int(os.getenv("MIGRATION_ROWS_PER_SECOND", "50000"))
+
+# Режимы блокировок PostgreSQL от слабого к сильному.
+# AccessExclusiveLock блокирует даже SELECT — его видно в отчёте первым.
+LOCK_LEVELS: tuple[str, ...] = (
+    "AccessShareLock",
+    "RowShareLock",
+    "RowExclusiveLock",
+    "ShareUpdateExclusiveLock",
+    "ShareLock",
+    "ShareRowExclusiveLock",
+    "ExclusiveLock",
+    "AccessExclusiveLock",
+)
+
+# Блокировки на таблицах текущего соединения (без системных каталогов)
+_PG_LOCKS_SQL = """
+SELECT c.relname, l.mode
+FROM pg_locks l
+JOIN pg_class c ON c.oid = l.relation
+WHERE l.pid = pg_backend_pid()
+  AND l.granted
+  AND l.locktype = 'relation'
+  AND c.relnamespace <> 'pg_catalog'::regnamespace
+"""
+
+
+# ============================================================
+# Данные отчёта
+# ============================================================
+
+
+@dataclass
+class StatementStats:
+    """Один SQL-запрос ревизии.
+
+    В dry-run duration и rows — оценки, а locks — ожидаемый режим.
+    """
+
+    sql: str
+    duration: float
+    rows: int | None = None
+    locks: dict[str, str] = field(default_factory=dict)
+    table_bytes: int | None = None
+
+
+@dataclass
+class RevisionStats:
+    """Одна ревизия: суммарное время и самые сильные блокировки по таблицам."""
+
+    revision: str
+    direction: str
+    description: str
+    duration: float
+    statements: list[StatementStats]
+    locks: dict[str, str]
+    estimated: bool = False
+
+
+def _strongest(current: str | None, mode: str) -> str:
+    """Вернуть более сильный из двух режимов блокировки."""
+    if current is None:
+        return mode
+    return max(current, mode, key=lambda m: LOCK_LEVELS.index(m))
+
+
+def _merge_locks(statements: list[StatementStats]) -> dict[str, str]:
+    """Самый сильный режим блокировки по каждой таблице ревизии."""
+    merged: dict[str, str] = {}
+    for statement in statements:
+        for table, mode in statement.locks.items():
+            merged[table] = _strongest(merged.get(table), mode)
+    return merged
+
+
+def _short(sql: str, limit: int = 300) -> str:
+    """SQL в одну строку, обрезанный до limit символов."""
+    flat = " ".join(sql.split())
+    return flat if len(flat) <= limit else flat[: limit - 3] + "..."
+
+
+# ============================================================
+# Оценка стоимости (dry-run)
+# ============================================================
+# (шаблон запроса, ожидаемая блокировка, читает ли запрос всю таблицу)
+_COST_RULES: tuple[tuple[re.Pattern[str], str, bool], ...] = tuple(
+    (re.compile(pattern, re.IGNORECASE | re.DOTALL), mode, scans)
+    for pattern, mode, scans in (
+        (
+            r"^CREATE\s+(UNIQUE\s+)?INDEX\s+CONCURRENTLY",
+            "ShareUpdateExclusiveLock",
+            True,
+        ),
+        (r"^CREATE\s+(UNIQUE\s+)?INDEX", "ShareLock", True),
+        (
+            r"^ALTER\s+TABLE.*\b(TYPE|SET\s+NOT\s+NULL|ADD\s+CONSTRAINT)\b",
+            "AccessExclusiveLock",
+            True,
+        ),
+        (r"^(ALTER|DROP)\s+TABLE", "AccessExclusiveLock", False),
+        (r"^(UPDATE|DELETE)\b", "RowExclusiveLock", True),
+        (r"^-- backfill_in_batches", "RowExclusiveLock", True),
+        (r"^INSERT\b", "RowExclusiveLock", False),
+    )
+)
+_TABLE_RE = re.compile(
+    r"\b(?:TABLE|ON|UPDATE|FROM|INTO)\s+(?:ONLY\s+)?(?:IF\s+(?:NOT\s+)?EXISTS\s+)?"
+    r'"?(\w+)"?',
+    re.IGNORECASE,
+)
+
+
+class _TableSizes:
+    """Кеш размеров таблиц: (строк, байт) по имени таблицы."""
+
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+        self._cache: dict[str, tuple[int, int | None]] = {}
+
+    def get(self, table: str) -> tuple[int, int | None]:
+        """Число строк и размер таблицы (0 — если таблицы ещё нет).
+
+        PostgreSQL: reltuples из статистики (без полного прохода по таблице).
+        Другие СУБД: COUNT(*), размер в байтах неизвестен.
+        """
+        if table in self._cache:
+            return self._cache[table]
+        size: tuple[int, int | None] = (0, None)
+        if inspect(self.connection).has_table(table):
+            if self.connection.dialect.name == "postgresql":
+                row = self.connection.execute(
+                    text(
+                        "SELECT greatest(reltuples, 0)::bigint, "
+                        "pg_total_relation_size(oid) "
+                        "FROM pg_class WHERE relname = :t AND relkind = 'r'"
+                    ),
+                    {"t": table},
+                ).first()
+                if row is not None:
+                    size = (int(row[0]), int(row[1]))
+            else:
+                count = self.connection.execute(
+                    text(f'SELECT COUNT(*) FROM "{table}"')
+                ).scalar_one()
+                size = (int(count), None)
+        self._cache[table] = size
+        return size
+
+
+def estimate_statement(sql: str, sizes: _TableSizes) -> StatementStats:
+    """Оценить запрос: ожидаемая блокировка и время по размеру таблицы."""
+    stats = StatementStats(sql=_short(sql), duration=0.0)
+    for pattern, mode, scans in _COST_RULES:
+        if not pattern.search(sql):
+            continue
+        match = _TABLE_RE.search(sql)
+        if match is None:
+            break
+        table = match.group(1)
+        rows, stats.table_bytes = sizes.get(table)
+        stats.locks = {table: mode}
+        if scans:
+            stats.rows = rows
+            stats.duration = rows / MIGRATION_ROWS_PER_SECOND
+        break
+    return stats
+
+
+def split_sql(output: str) -> list[str]:
+    """Разбить вывод `--sql` на отдельные запросы (без служебных комментариев)."""
+    statements = []
+    for chunk in re.split(r";\s*\n", output):
+        lines = [
+            line
+            for line in chunk.splitlines()
+            if line.strip()
+            and (
+                not line.startswith("-- ") or line.startswith("-- backfill_in_batches")
+            )
+        ]
+        if lines and lines[0].upper() not in ("BEGIN", "COMMIT"):
+            statements.append("\n".join(lines))
+    return statements
+
+
+# ============================================================
+# Сбор статистики
+# ============================================================
+
+
+class MigrationReport:
+    """Собирает статистику миграций и пишет отчёт.
+
+    Использование в env.py:
+
+        report = MigrationReport(dry_run=MIGRATION_DRY_RUN)
+        report.attach(engine)
+        with engine.connect() as connection:
+            context.configure(connection=connection, ...,
+                              **report.context_options(connection))
+            ...
+        report.finish()
+    """
+
+    def __init__(self, dry_run: bool = False) -> None:
+        self.dry_run = dry_run
+        self.revisions: list[RevisionStats] = []
+        # dry-run: Alembic пишет SQL сюда вместо выполнения
+        self.sql_buffer = io.StringIO()
+        self._sizes: _TableSizes | None = None
+        self._statements: list[StatementStats] = []
+        self._started = time.perf_counter()
+
+    def attach(self, engine: Engine) -> None:
+        """Подписаться на запросы всех соединений движка (до connect()).
+
+        Подписка на движок, а не на соединение, — чтобы учитывать запросы
+        backfill_in_batches, которые идут через отдельное соединение.
+        В dry-run запросы к БД — только служебные, их не записываем.
+        """
+        if self.dry_run:
+            return
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    def context_options(self, connection: Connection) -> dict[str, Any]:
+        """Аргументы для context.configure(): callback и, в dry-run, режим SQL.
+
+        В dry-run Alembic генерирует SQL (as_sql) начиная с текущей ревизии
+        БД, а соединение используется только для чтения размеров таблиц.
+        """
+        options: dict[str, Any] = {"on_version_apply": self.on_version_apply}
+        if self.dry_run:
+            self._sizes = _TableSizes(connection)
+            heads = MigrationContext.configure(connection).get_current_heads()
+            options.update(
+                as_sql=True,
+                output_buffer=self.sql_buffer,
+                starting_rev=heads or "base",
+            )
+        return options
+
+    def _before_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        conn.info.setdefault("report_started", []).append(time.perf_counter())
+
+    def _after_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        duration = time.perf_counter() - conn.info["report_started"].pop()
+        rowcount = cursor.rowcount
+        self._statements.append(
+            StatementStats(
+                sql=_short(statement),
+                duration=duration,
+                rows=rowcount if rowcount is not None and rowcount >= 0 else None,
+                locks=self._held_locks(conn),
+            )
+        )
+
+    @staticmethod
+    def _held_locks(conn: Connection) -> dict[str, str]:
+        """Блокировки, которые соединение держит после запроса (PostgreSQL).
+
+        Отдельный DBAPI-курсор: результат основного запроса ещё не прочитан.
+        Блокировки держатся до конца транзакции — поэтому каждая следующая
+        строка отчёта включает и блокировки предыдущих запросов ревизии.
+        """
+        if conn.dialect.name != "postgresql":
+            return {}
+        locks: dict[str, str] = {}
+        cursor = conn.connection.dbapi_connection.cursor()  # type: ignore[union-attr]
+        try:
+            cursor.execute(_PG_LOCKS_SQL)
+            for table, mode in cursor.fetchall():
+                locks[table] = _strongest(locks.get(table), mode)
+        finally:
+            cursor.close()
+        return locks
+
+    def on_version_apply(self, *, ctx: Any, step: Any, **kwargs: Any) -> None:
+        """Callback Alembic: ревизия применена — закрыть её статистику."""
+        now = time.perf_counter()
+        if self.dry_run:
+            assert self._sizes is not None, "dry-run: нужен context_options()"
+            output = self.sql_buffer.getvalue()
+            self.sql_buffer.seek(0)
+            self.sql_buffer.truncate()
+            statements = [
+                estimate_statement(sql, self._sizes) for sql in split_sql(output)
+            ]
+            duration = sum(s.duration for s in statements)
+        else:
+            statements, self._statements = self._statements, []
+            duration = now - self._started
+        self._started = now
+        stats = RevisionStats(
+            revision=", ".join(step.up_revision_ids),
+            direction="upgrade" if step.is_upgrade else "downgrade",
+            description=step.up_revision.doc if step.up_revision else "",
+            duration=duration,
+            statements=statements,
+            locks=_merge_locks(statements),
+            estimated=self.dry_run,
+        )
+        self.revisions.append(stats)
+        self._log(stats)
+
+    def _log(self, stats: RevisionStats) -> None:
+        prefix = "~" if stats.estimated else ""
+        locks = ", ".join(f"{t}={m}" for t, m in sorted(stats.locks.items()))
+        logger.info(
+            "%s %s (%s): %s%.1f мс, %d запросов, блокировки: %s",
+            stats.direction,
+            stats.revision,
+            stats.description,
+            prefix,
+            stats.duration * 1000,
+            len(stats.statements),
+            locks or "—",
+        )
+        slowest = max(stats.statements, key=lambda s: s.duration, default=None)
+        if slowest is not None and slowest.duration > 0:
+            logger.info(
+                "  самый долгий: %s%.1f мс, %s строк — %s",
+                prefix,
+                slowest.duration * 1000,
+                "?" if slowest.rows is None else slowest.rows,
+                slowest.sql[:120],
+            )
+
+    def finish(self, path: str | None = None) -> None:
+        """Вывести итог в лог и записать отчёт в JSON, если задан путь.
+
+        path=None — взять путь из MIGRATION_REPORT ("" — файл не писать).
+
+        Команды без применения ревизий (current, history, пустой upgrade)
+        отчёт не перезаписывают.
+        """
+        if not self.revisions:
+            return
+        total = sum(r.duration for r in self.revisions)
+        logger.info(
+            "Итого%s: %d ревизий, %.1f мс",
+            " (оценка, dry-run)" if self.dry_run else "",
+            len(self.revisions),
+            total * 1000,
+        )
+        if path is None:
+            path = MIGRATION_REPORT
+        if not path:
+            return
+        payload = {
+            "dry_run": self.dry_run,
+            "total_duration": total,
+            "revisions": [asdict(r) for r in self.revisions],
+        }
+        Path(path).write_text(json.dumps(payload, ensure_ascii=False, indent=2))
+        logger.info("Отчёт о миграциях: %s", path)
@@ -0,0 +1,254 @@
+"""Тесты вспомогательных модулей Alembic из app/alembic на SQLite.
+
+Функции online_migrations вызываются так же, как из ревизии: внутри
+MigrationContext и Operations.context (это и есть `op` в versions/).
+Отчёт о миграциях проверяется настоящим `alembic upgrade head` через
+alembic.command. Каталог tests/ не попадает в образ (.dockerignore).
+
+Запуск (из корня репозитория):
+    pytest seminars/seminar_12_fastapi_containerization/examples/tests/ -v
+"""
+
+import json
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy.engine import Connection, Engine
+
+# Пакет app импортируется из examples/ — так же, как в контейнере
+EXAMPLES = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(EXAMPLES))
+
+from app.alembic import migration_report  # noqa: E402
+from app.alembic import online_migrations as online  # noqa: E402
+
+ROWS = 10
+BATCH = 3
+NAME = "0099_bump_item_value"
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Iterator[Engine]:
+    """SQLite-файл с таблицей item(id, value): ROWS строк, value = 0."""
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    with engine.begin() as conn:
+        conn.execute(sa.text("CREATE TABLE item (id INTEGER PRIMARY KEY, value INT)"))
+        conn.execute(
+            sa.text("INSERT INTO item (id, value) VALUES (:id, 0)"),
+            [{"id": i} for i in range(1, ROWS + 1)],
+        )
+    yield engine
+    engine.dispose()
+
+
+@contextmanager
+def revision(engine: Engine) -> Iterator[None]:
+    """Окружение ревизии: транзакция миграции и `op`, как в alembic upgrade.
+
+    transactional_ddl=True — как на PostgreSQL: ревизия выполняется
+    в транзакции, которая фиксируется при выходе из блока.
+    """
+    with engine.connect() as conn:
+        context = MigrationContext.configure(conn, opts={"transactional_ddl": True})
+        with context.begin_transaction(), Operations.context(context):
+            yield
+
+
+def _values(engine: Engine) -> list[int]:
+    with engine.connect() as conn:
+        return list(
+            conn.execute(sa.text("SELECT value FROM item ORDER BY id")).scalars()
+        )
+
+
+def _progress(engine: Engine) -> sa.Row | None:
+    with engine.connect() as conn:
+        return conn.execute(
+            sa.select(online.progress_table).where(online.progress_table.c.name == NAME)
+        ).first()
+
+
+def _bump(conn: Connection, lower: int, upper: int) -> int:
+    return conn.execute(
+        sa.text("UPDATE item SET value = value + 1 WHERE id > :lower AND id <= :upper"),
+        {"lower": lower, "upper": upper},
+    ).rowcount
+
+
+# ============================================================
+# online_migrations: backfill_in_batches / forget_backfill
+# ============================================================
+
+
+class TestBackfillInBatches:
+    """Порции с COMMIT, прогресс в data_migration_progress, продолжение после сбоя."""
+
+    def test_resume_after_failure(self, engine: Engine) -> None:
+        """Сбой на второй порции: первая зафиксирована, повтор начинает со второй."""
+        calls = 0
+
+        def failing(conn: Connection, lower: int, upper: int) -> int:
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                raise RuntimeError("обрыв соединения")
+            return _bump(conn, lower, upper)
+
+        with pytest.raises(RuntimeError), revision(engine):
+            online.backfill_in_batches(NAME, "item", failing, batch_size=BATCH)
+
+        assert _values(engine) == [1] * BATCH + [0] * (ROWS - BATCH)
+        progress = _progress(engine)
+        assert progress is not None
+        assert (progress.last_pk, progress.finished) == (BATCH, False)
+
+        with revision(engine):
+            done = online.backfill_in_batches(NAME, "item", _bump, batch_size=BATCH)
+        assert done == ROWS
+        assert _values(engine) == [1] * ROWS  # ни одна порция не применена дважды
+
+    def test_finished_backfill_is_skipped(self, engine: Engine) -> None:
+        with revision(engine):
+            online.backfill_in_batches(NAME, "item", _bump, batch_size=BATCH)
+        with revision(engine):
+            done = online.backfill_in_batches(NAME, "item", _bump, batch_size=BATCH)
+
+        assert done == ROWS
+        assert _values(engine) == [1] * ROWS
+
+
+class TestForgetBackfill:
+    """forget_backfill удаляет прогресс вместе с коммитом ревизии."""
+
+    def test_forget_allows_rerun(self, engine: Engine) -> None:
+        with revision(engine):
+            online.backfill_in_batches(NAME, "item", _bump, batch_size=BATCH)
+            online.forget_backfill(NAME)
+        assert _progress(engine) is None
+
+        with revision(engine):
+            online.backfill_in_batches(NAME, "item", _bump, batch_size=BATCH)
+        assert _values(engine) == [2] * ROWS
+
+    def test_forget_without_progress_table(self, engine: Engine) -> None:
+        with revision(engine):
+            online.forget_backfill(NAME)
+        assert not sa.inspect(engine).has_table(online.PROGRESS_TABLE)
+
+
+# ============================================================
+# migration_report: отчёт и dry-run
+# ============================================================
+
+
+@pytest.fixture
+def upgrade(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[tuple[Engine, Config]]:
+    """Пустая SQLite-база и конфигурация Alembic для неё (без alembic.ini).
+
+    Рабочая директория — tmp_path: так видно, оставляет ли upgrade файлы.
+    """
+    database = tmp_path / "tasks.db"
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{database}")
+    monkeypatch.chdir(tmp_path)
+    config = Config()
+    config.set_main_option("script_location", str(EXAMPLES / "app" / "alembic"))
+    engine = sa.create_engine(f"sqlite:///{database}")
+    yield engine, config
+    engine.dispose()
+
+
+class TestMigrationReport:
+    """env.py пишет отчёт только по запросу; dry-run не меняет БД."""
+
+    def test_no_report_file_by_default(
+        self, upgrade: tuple[Engine, Config], tmp_path: Path
+    ) -> None:
+        engine, config = upgrade
+        command.upgrade(config, "head")
+
+        assert sa.inspect(engine).has_table("tasks")
+        assert list(tmp_path.iterdir()) == [tmp_path / "tasks.db"]
+
+    def test_report_written_when_configured(
+        self,
+        upgrade: tuple[Engine, Config],
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        engine, config = upgrade
+        path = tmp_path / "report.json"
+        monkeypatch.setattr(migration_report, "MIGRATION_REPORT", str(path))
+        command.upgrade(config, "head")
+
+        report = json.loads(path.read_text())
+        assert report["dry_run"] is False
+        (revision,) = report["revisions"]
+        assert revision["direction"] == "upgrade"
+        assert revision["estimated"] is False
+        assert any(
+            s["sql"].startswith("CREATE TABLE tasks") for s in revision["statements"]
+        )
+        assert report["total_duration"] >= revision["duration"] > 0
+
+    def test_dry_run_estimates_without_changes(
+        self,
+        upgrade: tuple[Engine, Config],
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        engine, config = upgrade
+        path = tmp_path / "report.json"
+        monkeypatch.setattr(migration_report, "MIGRATION_REPORT", str(path))
+        monkeypatch.setattr(migration_report, "MIGRATION_DRY_RUN", True)
+        command.upgrade(config, "head")
+
+        assert sa.inspect(engine).get_table_names() == []
+        report = json.loads(path.read_text())
+        assert report["dry_run"] is True
+        (revision,) = report["revisions"]
+        assert revision["estimated"] is True
+        sql = [s["sql"] for s in revision["statements"]]
+        assert any(statement.startswith("CREATE TABLE tasks") for statement in sql)
+        assert revision["locks"]["tasks"] == "ShareLock"  # CREATE INDEX ON tasks
+
+
+class TestEstimateStatement:
+    """Оценка блокировки и времени запроса по размеру таблицы."""
+
+    def test_update_scans_table(self, engine: Engine) -> None:
+        with engine.connect() as conn:
+            stats = migration_report.estimate_statement(
+                "UPDATE item SET value = 1", migration_report._TableSizes(conn)
+            )
+        assert stats.locks == {"item": "RowExclusiveLock"}
+        assert stats.rows == ROWS
+        assert stats.duration == ROWS / migration_report.MIGRATION_ROWS_PER_SECOND
+
+    def test_alter_type_takes_access_exclusive(self, engine: Engine) -> None:
+        with engine.connect() as conn:
+            stats = migration_report.estimate_statement(
+                "ALTER TABLE item ALTER COLUMN value TYPE BIGINT",
+                migration_report._TableSizes(conn),
+            )
+        assert stats.locks == {"item": "AccessExclusiveLock"}
+        assert stats.rows == ROWS
+
+    def test_split_sql_keeps_backfill_marker(self) -> None:
+        output = (
+            "BEGIN;\n\n-- Running upgrade  -> 0001\n\nCREATE TABLE t (id INT);\n\n"
+            "-- backfill_in_batches: fill ON t (1000/commit);\n\nCOMMIT;\n"
+        )
+        assert migration_report.split_sql(output) == [
+            "CREATE TABLE t (id INT)",
+            "-- backfill_in_batches: fill ON t (1000/commit)",
+        ]